@@ -0,0 +1,43 @@
+"""Store the region (voivodeship) of each price row
+
+Existing rows were all scraped for Silesia and are backfilled accordingly.
+The offer unique constraint gains ``region`` so that the same pharmacy chain
+seen in several regions within one second is not rejected as a duplicate.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_add_price_region"
+down_revision = "0003_enhance_product_models"
+branch_labels = None
+depends_on = None
+
+OFFER_COLUMNS = ["product_id", "pharmacy_name", "price", "expiration", "fetched_at"]
+# SQLite reflects the unnamed constraint from 0001 without a name
+NAMING = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+
+
+def _offer_constraint_name(columns):
+    for constraint in sa.inspect(op.get_bind()).get_unique_constraints("pharmacy_prices"):
+        if constraint["column_names"] == columns and constraint["name"]:
+            return constraint["name"]
+    return NAMING["uq"] % {"table_name": "pharmacy_prices", "column_0_name": columns[0]}
+
+
+def upgrade():
+    op.add_column("pharmacy_prices", sa.Column("region", sa.String(length=50), nullable=True))
+    op.execute("UPDATE pharmacy_prices SET region = 'w-slaskim' WHERE region IS NULL")
+    old_name = _offer_constraint_name(OFFER_COLUMNS)
+    with op.batch_alter_table("pharmacy_prices", naming_convention=NAMING) as batch:
+        batch.drop_constraint(old_name, type_="unique")
+        batch.create_unique_constraint("uq_pharmacy_prices_offer_region", OFFER_COLUMNS + ["region"])
+    op.create_index("ix_pharmacy_prices_product_region", "pharmacy_prices", ["product_id", "region"])
+
+
+def downgrade():
+    op.drop_index("ix_pharmacy_prices_product_region", table_name="pharmacy_prices")
+    with op.batch_alter_table("pharmacy_prices", naming_convention=NAMING) as batch:
+        batch.drop_constraint("uq_pharmacy_prices_offer_region", type_="unique")
+        batch.create_unique_constraint("uq_pharmacy_prices_product_id", OFFER_COLUMNS)
+        batch.drop_column("region")
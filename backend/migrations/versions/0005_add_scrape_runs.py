@@ -0,0 +1,52 @@
+"""Journal of scrape runs and the outcome of each product
+
+``scrape_runs`` holds one row per run and ``scrape_run_items`` the final
+status of every task, written as the run progresses, so an interrupted run
+can be resumed and every run leaves an exact history.  ``scrape_all`` may
+already have created the tables in a SQLite file (``RunJournal.ensure_tables``).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005_add_scrape_runs"
+down_revision = "0004_add_price_region"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table("scrape_runs"):
+        return
+    op.create_table(
+        "scrape_runs",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("started_at", sa.DateTime, nullable=False),
+        sa.Column("finished_at", sa.DateTime, nullable=True),
+        sa.Column("total", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("succeeded", sa.Integer, nullable=True),
+        sa.Column("failed", sa.Integer, nullable=True),
+        sa.Column("resumed", sa.Integer, nullable=False, server_default="0"),
+    )
+    op.create_index("ix_scrape_runs_kind_started", "scrape_runs", ["kind", "started_at"])
+    op.create_table(
+        "scrape_run_items",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("run_id", sa.Integer, nullable=False),
+        sa.Column("task", sa.String(length=255), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="1"),
+        sa.Column("error", sa.Text, nullable=True),
+        sa.Column("updated_at", sa.DateTime, nullable=False),
+        sa.UniqueConstraint("run_id", "task", name="uq_scrape_run_items_run_task"),
+    )
+    op.create_index("ix_scrape_run_items_run_id", "scrape_run_items", ["run_id"])
+
+
+def downgrade():
+    op.drop_index("ix_scrape_run_items_run_id", table_name="scrape_run_items")
+    op.drop_table("scrape_run_items")
+    op.drop_index("ix_scrape_runs_kind_started", table_name="scrape_runs")
+    op.drop_table("scrape_runs")
@@ -0,0 +1,134 @@
+"""Store price per gram, package size and a typed expiration date
+
+The API derived these from ``unit`` and ``PACKAGE_SIZES`` on every request;
+they are now written at ingest (``insert_prices``) and existing rows are
+backfilled here in batches.  The index lets offers be sorted and filtered by
+price per gram in SQL.
+
+The backfill uses a frozen copy of :mod:`scraper.utils.price_units` and of
+``PACKAGE_SIZES`` as they were at this revision, so the migration gives the
+same result however the application code changes later.
+"""
+
+import re
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_add_normalized_price"
+down_revision = "0005_add_scrape_runs"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Kopia PACKAGE_SIZES (scraper/core/config/urls.py) z chwili tej migracji
+PACKAGE_SIZES = {
+    "100241": 10,
+    "100242": 1,
+    "119767": 10,
+    "119768": 10,
+    "100243": 10,
+    "115101": 10,
+    "115281": 10,
+    "117668": 10,
+    "117669": 10,
+    "118793": 10,
+    "119464": 10,
+    "120136": 10,
+    "121591": 10,
+    "126179": 10,
+    "129653": 10,
+    "130323": 10,
+    "130324": 10,
+    "98013": 10,
+}
+
+_GRAMS = re.compile(r"(\d+(?:[.,]\d+)?)\s*g")
+
+
+def _package_grams(unit, product_id):
+    match = _GRAMS.search(unit or "")
+    if match:
+        grams = float(match.group(1).replace(",", "."))
+        return grams or None
+    pkg = PACKAGE_SIZES.get(str(product_id))
+    return float(pkg) if pkg else None
+
+
+def _expiration_date(expiration):
+    if not expiration:
+        return None
+    if isinstance(expiration, datetime):
+        return expiration.date()
+    if isinstance(expiration, date):
+        return expiration
+    try:
+        return datetime.fromisoformat(str(expiration)).date()
+    except ValueError:
+        return None
+
+
+def _backfill(bind):
+    prices = sa.table(
+        "pharmacy_prices",
+        sa.column("id", sa.Integer),
+        sa.column("product_id", sa.Integer),
+        sa.column("price", sa.Float),
+        sa.column("unit", sa.String),
+        sa.column("expiration", sa.String),
+        sa.column("package_grams", sa.Float),
+        sa.column("price_per_g", sa.Float),
+        sa.column("expiration_date", sa.Date),
+    )
+    update = (
+        prices.update()
+        .where(prices.c.id == sa.bindparam("row_id"))
+        .values(
+            package_grams=sa.bindparam("package_grams"),
+            price_per_g=sa.bindparam("price_per_g"),
+            expiration_date=sa.bindparam("expiration_date"),
+        )
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(prices.c.id, prices.c.product_id, prices.c.price, prices.c.unit, prices.c.expiration)
+            .where(prices.c.id > last_id)
+            .order_by(prices.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        params = []
+        for row_id, product_id, price, unit, expiration in rows:
+            grams = _package_grams(unit, product_id)
+            params.append(
+                {
+                    "row_id": row_id,
+                    "package_grams": grams,
+                    "price_per_g": float(price) / grams if price is not None and grams else None,
+                    "expiration_date": _expiration_date(expiration),
+                }
+            )
+        bind.execute(update, params)
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    op.add_column("pharmacy_prices", sa.Column("package_grams", sa.Float, nullable=True))
+    op.add_column("pharmacy_prices", sa.Column("price_per_g", sa.Float, nullable=True))
+    op.add_column("pharmacy_prices", sa.Column("expiration_date", sa.Date, nullable=True))
+    _backfill(op.get_bind())
+    op.create_index(
+        "ix_pharmacy_prices_product_price_per_g", "pharmacy_prices", ["product_id", "price_per_g"]
+    )
+
+
+def downgrade():
+    op.drop_index("ix_pharmacy_prices_product_price_per_g", table_name="pharmacy_prices")
+    with op.batch_alter_table("pharmacy_prices") as batch:
+        batch.drop_column("expiration_date")
+        batch.drop_column("price_per_g")
+        batch.drop_column("package_grams")
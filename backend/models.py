@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, Float, text
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, String, Text, Float, Index, UniqueConstraint, text
 from sqlalchemy.orm import declarative_base
 
 # shared declarative base for ORM models
@@ -49,6 +49,11 @@ class PharmacyPrice(Base):
     availability = Column(String(50), nullable=True)
     updated = Column(String(50), nullable=True)
     map_url = Column(String(255), nullable=True)
+    region = Column(String(50), nullable=True)  # województwo, np. "w-slaskim"
+    # computed at ingest by scraper.utils.price_units
+    package_grams = Column(Float, nullable=True)
+    price_per_g = Column(Float, nullable=True)
+    expiration_date = Column(Date, nullable=True)
     pharmacy_lat = Column(Float, nullable=True)
     pharmacy_lon = Column(Float, nullable=True)
     
@@ -72,3 +77,35 @@ class NotificationFailure(Base):
     payload = Column(Text, nullable=True)
     error = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ScrapeRun(Base):
+    """One scraping run; interrupted runs stay ``running`` until resumed."""
+
+    __tablename__ = "scrape_runs"
+    __table_args__ = (Index("ix_scrape_runs_kind_started", "kind", "started_at"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(50), nullable=False)  # scrape_all, main
+    status = Column(String(20), nullable=False, default="running")  # running, partial, finished
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    total = Column(Integer, nullable=False, default=0)
+    succeeded = Column(Integer, nullable=True)
+    failed = Column(Integer, nullable=True)
+    resumed = Column(Integer, nullable=False, default=0)  # how many times the run was resumed
+
+
+class ScrapeRunItem(Base):
+    """Outcome of one task (product, or ``product@region``) within a run."""
+
+    __tablename__ = "scrape_run_items"
+    __table_args__ = (UniqueConstraint("run_id", "task", name="uq_scrape_run_items_run_task"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(Integer, nullable=False, index=True)
+    task = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False)  # done, empty, skipped, failed
+    attempts = Column(Integer, nullable=False, default=1)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
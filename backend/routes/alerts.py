@@ -12,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncConnection
 
 from scraper.utils.crypto import encrypt, decrypt
 from backend.db import get_connection
-from .utils import compute_price_info, CITY_REGEX
+from .utils import price_info_for_row, CITY_REGEX
 from backend.utils import (
     send_confirmation_sms,
     send_confirmation_email,
@@ -65,13 +65,9 @@ async def get_price_alerts(conn: AsyncConnection = Depends(get_connection)):
     alerts = []
     now = datetime.now()
     for row in rows:
-        price = float(row["price"])
         expiration = row["expiration"]
         fetched_at = row["fetched_at"]
-        unit = row["unit"]
-        price_per_g, display_price, short_expiry = compute_price_info(
-            price, unit, row["product_id"], expiration, now
-        )
+        price_per_g, display_price, short_expiry = price_info_for_row(row, now)
         offer = {
             "product_id": row["product_id"],
             "product": row["product_id"],
@@ -137,10 +133,7 @@ async def get_filtered_alerts(conn: AsyncConnection = Depends(get_connection)):
             continue
         expiration = row["expiration"]
         fetched_at = row["fetched_at"]
-        unit = row["unit"]
-        price_per_g, display_price, short_expiry = compute_price_info(
-            price, unit, row["product_id"], expiration, now
-        )
+        price_per_g, display_price, short_expiry = price_info_for_row(row, now)
         offer = {
             "product_id": row["product_id"],
             "product": row["product_id"],
@@ -210,10 +203,7 @@ async def get_grouped_alerts(
             continue
         expiration = row["expiration"]
         fetched_at = row["fetched_at"]
-        unit = row["unit"]
-        price_per_g, display_price, short_expiry = compute_price_info(
-            price, unit, row["product_id"], expiration, now
-        )
+        price_per_g, display_price, short_expiry = price_info_for_row(row, now)
         address = row["address"] or ""
         city_match = address.split(",")[-1].strip() if "," in address else address
         city_clean = re.sub(r"^\d{2}-\d{3}\s*", "", city_match) if city_match else ""
@@ -11,7 +11,7 @@ from backend.config import settings
 from ..schemas import ProductOffersResponse
 from .utils import (
     haversine,
-    compute_price_info,
+    price_info_for_row,
     get_price_thresholds,
     classify_price_bucket,
     get_historical_low,
@@ -24,6 +24,8 @@ router = APIRouter()
 
 ALLOWED_SORT_FIELDS = {
     "price": lambda conn: "price",
+    # stored at ingest; rows without package size sort by their raw price
+    "price_per_g": lambda conn: "COALESCE(price_per_g, price)",
     "expiration": lambda conn: date_cast("expiration", conn),
     "fetched_at": lambda conn: timestamp_cast("fetched_at", conn),
 }
@@ -78,7 +80,7 @@ async def get_product_by_name(
     ),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    sort: str = Query("price", pattern=r"^(price|expiration|fetched_at)$"),
+    sort: str = Query("price", pattern=r"^(price|price_per_g|expiration|fetched_at)$"),
     order: str = Query("asc", pattern=r"^(asc|desc)$"),
     city: Optional[str] = Query(
         None, min_length=1, max_length=50, pattern=CITY_REGEX
@@ -99,7 +101,8 @@ async def get_product_by_name(
     offset : int, optional
         Number of offers to skip for pagination. Default is 0.
     sort : str, optional
-        Field used for sorting (``price``, ``expiration`` or ``fetched_at``).
+        Field used for sorting (``price``, ``price_per_g``, ``expiration`` or
+        ``fetched_at``).
     order : str, optional
         Sort order, either ``asc`` or ``desc``.
     city : str, optional
@@ -195,9 +198,7 @@ async def get_product_by_name(
         expiration = row["expiration"]
         fetched_at = row["fetched_at"]
         unit = row["unit"]
-        price_per_g, display_price, short_expiry = compute_price_info(
-            price, unit, product_id, expiration, now
-        )
+        price_per_g, display_price, short_expiry = price_info_for_row(row, now)
         offer = {
             "pharmacy": row["pharmacy_name"],
             "address": row["address"],
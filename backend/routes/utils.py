@@ -1,9 +1,10 @@
 import logging
 import re
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timezone
 from math import radians, cos, sin, asin, sqrt
 from sqlalchemy import text
 from scraper.core.config.urls import PACKAGE_SIZES
+from scraper.utils.price_units import package_grams, price_per_gram
 from backend.config import settings
 
 CITY_REGEX = r"^[A-Za-ząćęłńóśźżĄĆĘŁŃÓŚŹŻ\s-]+$"
@@ -31,21 +32,28 @@ def haversine(lat1, lon1, lat2, lon2):
     return R * c
 
 
+def _utc(now):
+    if now is None:
+        return datetime.now(timezone.utc)
+    if now.tzinfo is None:
+        return now.replace(tzinfo=timezone.utc)
+    return now
+
+
+def _is_short_expiry(exp_dt, now):
+    if exp_dt.tzinfo is None:
+        exp_dt = exp_dt.replace(tzinfo=timezone.utc)
+    return (exp_dt - now).days <= int(settings.short_expiry_days)
+
+
 def compute_price_info(price, unit, product_id, expiration, now=None):
     """Compute helper values for price information."""
-    if now is None:
-        now = datetime.now(timezone.utc)
-    elif now.tzinfo is None:
-        now = now.replace(tzinfo=timezone.utc)
+    now = _utc(now)
 
     short_expiry = False
     if expiration:
         try:
-            exp_dt = datetime.fromisoformat(expiration)
-            if exp_dt.tzinfo is None:
-                exp_dt = exp_dt.replace(tzinfo=timezone.utc)
-            days_left = (exp_dt - now).days
-            short_expiry = days_left <= int(settings.short_expiry_days)
+            short_expiry = _is_short_expiry(datetime.fromisoformat(expiration), now)
         except ValueError as exc:
             logger.warning(
                 "Failed to parse expiration '%s' for product %s: %s",
@@ -54,21 +62,36 @@ def compute_price_info(price, unit, product_id, expiration, now=None):
                 exc,
             )
 
-    price_per_g = None
-    match = re.search(r"(\d+(?:[.,]\d+)?)\s*g", unit or "")
-    if match:
-        grams = float(match.group(1).replace(",", "."))
-        if grams:
-            price_per_g = price / grams
-    else:
-        pkg = PACKAGE_SIZES.get(str(product_id))
-        if pkg:
-            price_per_g = price / pkg
-
+    price_per_g = price_per_gram(price, package_grams(unit, product_id, PACKAGE_SIZES))
     display_price = price_per_g if price_per_g is not None else price
     return price_per_g, display_price, short_expiry
 
 
+def price_info_for_row(row, now=None):
+    """Return :func:`compute_price_info` values for a ``pharmacy_prices`` row.
+
+    ``price_per_g`` and ``expiration_date`` written at ingest are used as
+    stored.  Rows with a NULL ``price_per_g`` are still computed: after the
+    ``0006`` backfill these are rows whose size was unknown when stored
+    (a ``PACKAGE_SIZES`` entry added later applies to them at once) and rows
+    written outside ``insert_prices`` (manual imports, fixtures).  With
+    known sizes that is a small share of the rows, so the per-row regex
+    stays off the common path.
+    """
+    price = float(row["price"])
+    price_per_g = row.get("price_per_g")
+    exp = row.get("expiration_date")
+    if price_per_g is None or (exp is None and row["expiration"]):
+        return compute_price_info(price, row["unit"], row["product_id"], row["expiration"], now)
+
+    short_expiry = False
+    if exp is not None:
+        if isinstance(exp, str):
+            exp = date.fromisoformat(exp[:10])
+        short_expiry = _is_short_expiry(datetime.combine(exp, time()), _utc(now))
+    return price_per_g, price_per_g, short_expiry
+
+
 async def get_price_thresholds(conn, product_id):
     """Fetch price bucket thresholds for a product."""
     product_type = "default"
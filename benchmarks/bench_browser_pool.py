@@ -0,0 +1,65 @@
+"""Compare pages/minute of the pooled browser against a launch per URL.
+
+Usage::
+
+    python -m benchmarks.bench_browser_pool --pages 10
+
+The "per-url" mode reproduces the previous ``_default_fetch`` behaviour by
+creating and closing a single-use pool for every page, which launches a fresh
+Firefox each time.  The "pooled" mode reuses one :class:`AsyncBrowserPool` for
+the whole batch.  Pages are loaded one after another in both modes.  Both modes load the same URLs from ``core/config/urls.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import time
+from typing import Awaitable, Callable, List
+
+from scraper.core.config.urls import URLS
+from scraper.services.browser_pool import AsyncBrowserPool
+
+
+async def _per_url_fetch(url: str) -> str:
+    async with AsyncBrowserPool(size=1, max_uses=1) as pool:
+        return await pool.fetch(url)
+
+
+async def _run(label: str, urls: List[str], fetch: Callable[[str], Awaitable[str]]) -> float:
+    start = time.perf_counter()
+    failures = 0
+    for url in urls:
+        try:
+            await fetch(url)
+        except Exception as exc:
+            failures += 1
+            print(f"  {label}: failed {url}: {exc}")
+    elapsed = time.perf_counter() - start
+    rate = (len(urls) - failures) / elapsed * 60 if elapsed else 0.0
+    print(f"{label:>8}: {len(urls)} pages in {elapsed:.1f}s → {rate:.1f} pages/min ({failures} failed)")
+    return rate
+
+
+async def _compare(urls: List[str], max_uses: int) -> None:
+    cold = await _run("per-url", urls, _per_url_fetch)
+    async with AsyncBrowserPool(max_uses=max_uses) as pool:
+        warm = await _run("pooled", urls, pool.fetch)
+
+    if cold:
+        print(f"speed-up: {warm / cold:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10, help="Number of pages per mode")
+    parser.add_argument("--max-uses", type=int, default=25, help="Context reuse limit for the pooled mode")
+    args = parser.parse_args()
+
+    urls = list(itertools.islice(itertools.cycle(URLS), args.pages))
+    asyncio.run(_compare(urls, args.max_uses))
+
+
+if __name__ == "__main__":
+    main()
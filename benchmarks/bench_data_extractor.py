@@ -0,0 +1,67 @@
+"""Compare element-walking and single-script offer extraction.
+
+Usage::
+
+    python -m benchmarks.bench_data_extractor --offers 80 --latency-ms 1
+
+Both modes run over the same fake WebElement tree (see ``fake_dom``), which
+counts WebDriver round-trips and sleeps ``--latency-ms`` for each one to
+approximate chromedriver's HTTP overhead.  The results of both modes are
+checked for equality before timings are reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from selenium.webdriver.common.by import By
+
+from benchmarks.fake_dom import FakeDriver
+from benchmarks.fixtures import load_pages, mui_page
+from scraper.core.data_extractor import collect_offers_data, extract_pharmacy_data, parse_offer_data
+
+ITEM_SELECTOR = "li.MuiListItem-root"
+
+
+def run_elements(driver: FakeDriver) -> list:
+    elements = driver.find_elements(By.CSS_SELECTOR, ITEM_SELECTOR)
+    return [extract_pharmacy_data(el, product_id="bench") for el in elements]
+
+
+def run_script(driver: FakeDriver) -> list:
+    elements = driver.find_elements(By.CSS_SELECTOR, ITEM_SELECTOR)
+    return [parse_offer_data(raw, "bench") for raw in collect_offers_data(driver, elements)]
+
+
+def _measure(name: str, html: str, latency: float, func) -> tuple:
+    driver = FakeDriver(html, latency=latency)
+    start = time.perf_counter()
+    result = func(driver)
+    elapsed = time.perf_counter() - start
+    return name, elapsed, driver.round_trips, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offers", type=int, default=80, help="Offers on the generated page")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="Simulated latency per WebDriver call")
+    parser.add_argument("--html", nargs="*", default=[], help="Recorded pages to use instead of a generated one")
+    args = parser.parse_args()
+
+    pages = load_pages(args.html) if args.html else {f"generated-{args.offers}": mui_page(args.offers)}
+    latency = args.latency_ms / 1000
+
+    for label, html in pages.items():
+        print(f"{label}:")
+        results = []
+        for name, func in (("elements", run_elements), ("script", run_script)):
+            name, elapsed, trips, result = _measure(name, html, latency, func)
+            results.append(result)
+            print(f"  {name:>8}: {elapsed * 1000:8.1f} ms, {trips:5d} round-trips, {len(result)} offers")
+        if results[0] != results[1]:
+            print("  WARNING: modes returned different results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure offer list parse time per MB for each parser backend.
+
+Usage::
+
+    python -m benchmarks.bench_offer_parsers --sizes 10 100 1000 --padding 20
+
+Generated ``li.offer`` pages of increasing offer counts (plus ``--padding``
+unrelated elements between offers) are parsed by every available backend in
+``scraper.services.offer_parsers``.  ``--html`` parses recorded pages instead.
+
+``--drift N`` adds a page of N offers whose address class was renamed, the
+kind of markup change that sends the regex into catastrophic backtracking.
+Keep N small: the regex time grows exponentially with it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from benchmarks.fixtures import load_pages, offer_list_page
+from scraper.services.offer_parsers import etree, get_offer_parser
+
+
+def _time(parser, html: str, repeat: int) -> tuple:
+    best = float("inf")
+    entries = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        entries = parser.parse(html, "bench")
+        best = min(best, time.perf_counter() - start)
+    return best, len(entries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 100, 1000], help="Offer counts to generate")
+    parser.add_argument("--padding", type=int, default=20, help="Unrelated elements between offers")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per page; the best time is reported")
+    parser.add_argument("--html", nargs="*", default=[], help="Recorded pages to parse instead")
+    parser.add_argument("--drift", type=int, default=4, help="Offers on the drifted-markup page (0 to skip)")
+    args = parser.parse_args()
+
+    if args.html:
+        pages = load_pages(args.html)
+    else:
+        pages = {f"{n} offers": offer_list_page(n, padding=args.padding) for n in args.sizes}
+        if args.drift:
+            drifted = offer_list_page(args.drift, padding=args.padding)
+            pages[f"{args.drift} drifted"] = drifted.replace('class="address"', 'class="addr"')
+    backends = ["regex"] + (["lxml"] if etree is not None else [])
+
+    print(f"{'page':>14} {'size':>9} " + " ".join(f"{b + ' ms/MB':>14}" for b in backends))
+    for label, html in pages.items():
+        megabytes = len(html.encode("utf-8")) / 1_000_000
+        cells = []
+        counts = set()
+        for backend in backends:
+            repeat = 1 if "drifted" in label else args.repeat
+            elapsed, count = _time(get_offer_parser(backend), html, repeat)
+            counts.add(count)
+            cells.append(f"{elapsed * 1000 / megabytes:14.1f}")
+        note = "" if len(counts) == 1 else f"  (offer counts differ: {sorted(counts)})"
+        print(f"{label:>14} {megabytes:8.2f}M " + " ".join(cells) + note)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Offline CPU benchmark of the scraping pipeline, stage by stage.
+
+Usage::
+
+    python -m benchmarks.bench_pipeline --offers 200 --repeat 20 --output run.json
+    python -m benchmarks.bench_pipeline --compare run.json
+
+Stages, all without network or browser:
+
+* ``parse_offers`` – ``_parse_offers`` over an ``li.offer`` page,
+* ``extract_pharmacy_data`` – element walking over a fake WebElement tree
+  (``fake_dom``, no simulated latency, so only Python CPU time is measured),
+* ``parse_price_unit`` – every price string of the page,
+* ``insert_new`` / ``insert_unchanged`` – ``insert_prices`` into a temporary
+  SQLite file, first for products without history, then repeating the same
+  offers (the ``should_insert_price`` dedup path).
+
+Each stage reports offers/s, p50/p95 latency per iteration and the peak and
+retained memory of one extra iteration traced by ``tracemalloc`` (kept out of
+the timed runs).  ``--output`` writes the results as JSON; ``--compare``
+prints the change against such a file.  ``--html`` uses recorded pages for
+both parsing stages instead of the generated fixtures.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+from typing import Callable, Dict, List
+
+from selenium.webdriver.common.by import By
+from sqlalchemy import create_engine
+
+from benchmarks.fake_dom import FakeDriver, parse_html, select
+from benchmarks.fixtures import load_pages, mui_page, offer_list_page
+from scraper.core.config.config import OFFER_PARSER
+from scraper.core.data_extractor import extract_pharmacy_data
+from scraper.services.offers import _parse_offers
+from scraper.services.price_validator import parse_price_unit
+
+ITEM_SELECTOR = "li.MuiListItem-root"
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(func: Callable[[int], int], repeat: int) -> Dict[str, float]:
+    """Run ``func(iteration)`` ``repeat`` times; it returns the offers handled."""
+    timings, offers = [], 0
+    for i in range(repeat):
+        start = time.perf_counter()
+        offers += func(i)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(repeat)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = sum(timings)
+    return {
+        "iterations": repeat,
+        "offers": offers,
+        "offers_per_s": offers / total if total else 0.0,
+        "p50_ms": median(timings) * 1000,
+        "p95_ms": _percentile(timings, 95) * 1000,
+        "alloc_peak_kb": peak / 1024,
+        "alloc_retained_kb": retained / 1024,
+    }
+
+
+def _insert_stage(entries: List[dict], db_file: str, fresh: bool) -> Callable[[int], int]:
+    from backend.models import Base
+    from scraper.services import db as db_services
+
+    engine = create_engine(f"sqlite:///{db_file}", future=True)
+    Base.metadata.create_all(engine)
+    db_services.ENGINE = engine
+    db_services.API_URL = None
+
+    def run(iteration: int) -> int:
+        for entry in entries:
+            product_id = f"bench-{iteration}" if fresh else "bench-unchanged"
+            db_services.insert_prices({**entry, "product_id": product_id})
+        return sum(len(e["offers"]) for e in entries)
+
+    return run
+
+
+def run_suite(offer_html: str, mui_html: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    entries = _parse_offers(offer_html, "bench")
+    prices = [span.inner_text() for span in select(parse_html(mui_html), "span[class*='priceExp']")]
+    driver = FakeDriver(mui_html)
+
+    def parse(_: int) -> int:
+        return sum(len(e["offers"]) for e in _parse_offers(offer_html, "bench"))
+
+    def extract(_: int) -> int:
+        elements = driver.find_elements(By.CSS_SELECTOR, ITEM_SELECTOR)
+        found = [extract_pharmacy_data(el, product_id="bench") for el in elements]
+        return sum(len(e["offers"]) for e in found if e)
+
+    def price_units(_: int) -> int:
+        for text in prices:
+            parse_price_unit(text)
+        return len(prices)
+
+    results = {
+        "parse_offers": measure(parse, repeat),
+        "extract_pharmacy_data": measure(extract, repeat),
+        "parse_price_unit": measure(price_units, repeat),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = str(Path(tmp) / "bench.sqlite")
+        results["insert_new"] = measure(_insert_stage(entries, db_file, True), repeat)
+        unchanged = _insert_stage(entries, db_file, False)
+        unchanged(-1)  # zapisuje historię, później działa już tylko deduplikacja
+        results["insert_unchanged"] = measure(unchanged, repeat)
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]] = None) -> None:
+    print(
+        f"{'stage':>22} {'offers/s':>11} {'p50 ms':>9} {'p95 ms':>9} {'peak KB':>9} {'kept KB':>9}"
+        + (f" {'vs base':>9}" if baseline else "")
+    )
+    for stage, r in results.items():
+        line = (
+            f"{stage:>22} {r['offers_per_s']:11.0f} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} "
+            f"{r['alloc_peak_kb']:9.1f} {r['alloc_retained_kb']:9.1f}"
+        )
+        base = (baseline or {}).get(stage)
+        if base and base["offers_per_s"]:
+            line += f" {(r['offers_per_s'] / base['offers_per_s'] - 1) * 100:+8.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--offers", type=int, default=100, help="Offers on the generated pages")
+    parser.add_argument("--padding", type=int, default=5, help="Unrelated elements between offers")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed iterations per stage")
+    parser.add_argument("--html", nargs="*", default=[], help="Recorded pages to use instead of fixtures")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Earlier JSON results to compare with")
+    args = parser.parse_args()
+
+    if args.html:
+        pages = load_pages(args.html)
+        runs = {label: (html, html) for label, html in pages.items()}
+    else:
+        runs = {
+            f"generated-{args.offers}": (
+                offer_list_page(args.offers, padding=args.padding),
+                mui_page(args.offers, padding=args.padding),
+            )
+        }
+    baseline = json.loads(Path(args.compare).read_text())["pages"] if args.compare else {}
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "offer_parser": OFFER_PARSER,
+        "repeat": args.repeat,
+        "pages": {},
+    }
+    for label, (offer_html, mui_html) in runs.items():
+        print(f"{label}:")
+        results = run_suite(offer_html, mui_html, args.repeat)
+        report["pages"][label] = results
+        print_results(results, baseline.get(label))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Minimal Selenium ``WebElement`` stand-in built from HTML.
+
+Only what ``scraper.core.data_extractor`` needs is implemented: ``text``,
+``get_attribute`` and ``find_element(s)`` with tag names and simple CSS
+selectors (tags, classes, ``[attr*=..]``/``[attr^=..]``/``[attr=..]`` and the
+descendant combinator).  Every call counts as one WebDriver round-trip and can
+optionally sleep to simulate the chromedriver HTTP latency.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+_VOID_TAGS = {"br", "img", "input", "meta", "link", "hr", "path"}
+_COMPOUND = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*)?(?P<rest>.*)$")
+_PART = re.compile(r"\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?:(?P<op>[*^]?=)['\"]?(?P<val>[^'\"\]]*)['\"]?)?\]")
+
+
+class Node:
+    __slots__ = ("tag", "attrs", "children", "parent", "_text")
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional["Node"]) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.children: List[object] = []
+        self.parent = parent
+        self._text: Optional[str] = None
+
+    def iter_descendants(self):
+        for child in self.children:
+            if isinstance(child, Node):
+                yield child
+                yield from child.iter_descendants()
+
+    def inner_text(self) -> str:
+        if self._text is None:
+            chunks = []
+            for child in self.children:
+                chunks.append(child.inner_text() if isinstance(child, Node) else child)
+            self._text = re.sub(r"\s+", " ", " ".join(chunks)).strip()
+        return self._text
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {}, None)
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: v or "" for k, v in attrs}, self._current)
+        self._current.children.append(node)
+        if tag not in _VOID_TAGS:
+            self._current = node
+
+    def handle_endtag(self, tag):
+        node = self._current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self._current = node.parent
+
+    def handle_data(self, data):
+        if data.strip():
+            self._current.children.append(data)
+
+
+def parse_html(html: str) -> Node:
+    builder = _TreeBuilder()
+    builder.feed(html)
+    return builder.root
+
+
+def _compile(selector: str):
+    compounds = []
+    for token in selector.split():
+        match = _COMPOUND.match(token)
+        tag = (match.group("tag") or "").lower()
+        checks = []
+        for part in _PART.finditer(match.group("rest")):
+            if part.group("cls"):
+                checks.append(("class", "~=", part.group("cls")))
+            else:
+                checks.append((part.group("attr"), part.group("op") or "", part.group("val") or ""))
+        compounds.append((tag, checks))
+    return compounds
+
+
+def _matches_compound(node: Node, compound) -> bool:
+    tag, checks = compound
+    if tag and node.tag != tag:
+        return False
+    for attr, op, val in checks:
+        value = node.attrs.get(attr)
+        if value is None:
+            return False
+        if op == "~=" and val not in value.split():
+            return False
+        if op == "*=" and val not in value:
+            return False
+        if op == "^=" and not value.startswith(val):
+            return False
+        if op == "=" and value != val:
+            return False
+    return True
+
+
+def select(root: Node, selector: str) -> List[Node]:
+    compounds = _compile(selector)
+    found = []
+    for node in root.iter_descendants():
+        if not _matches_compound(node, compounds[-1]):
+            continue
+        remaining = compounds[:-1]
+        ancestor = node.parent
+        while remaining and ancestor is not None and ancestor is not root.parent:
+            if _matches_compound(ancestor, remaining[-1]):
+                remaining = remaining[:-1]
+            ancestor = ancestor.parent
+        if not remaining:
+            found.append(node)
+    return found
+
+
+class RoundTrips:
+    """Shared counter of simulated WebDriver calls."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.count = 0
+
+    def hit(self) -> None:
+        self.count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+
+class FakeWebElement:
+    def __init__(self, node: Node, trips: RoundTrips) -> None:
+        self.node = node
+        self._trips = trips
+
+    @property
+    def text(self) -> str:
+        self._trips.hit()
+        return self.node.inner_text()
+
+    def get_attribute(self, name: str) -> Optional[str]:
+        self._trips.hit()
+        if name == "outerHTML":
+            return f"<{self.node.tag}>{self.node.inner_text()}</{self.node.tag}>"
+        return self.node.attrs.get(name)
+
+    @property
+    def location_once_scrolled_into_view(self) -> Dict[str, int]:
+        self._trips.hit()
+        return {"x": 0, "y": 0}
+
+    def _select(self, by: str, value: str) -> List[Node]:
+        selector = value if by == By.CSS_SELECTOR else value.lower()
+        return select(self.node, selector)
+
+    def find_elements(self, by: str, value: str) -> List["FakeWebElement"]:
+        self._trips.hit()
+        return [FakeWebElement(n, self._trips) for n in self._select(by, value)]
+
+    def find_element(self, by: str, value: str) -> "FakeWebElement":
+        self._trips.hit()
+        nodes = self._select(by, value)
+        if not nodes:
+            raise NoSuchElementException(f"{by}={value}")
+        return FakeWebElement(nodes[0], self._trips)
+
+
+def _script_offer(node: Node) -> Dict[str, object]:
+    """Python equivalent of ``OFFERS_DATA_SCRIPT`` for a single offer."""
+    links = select(node, "a[href*='/apteki/']")
+    if not links:
+        return {"error": "missing pharmacy link"}
+    blocks = select(node, "div[class*='offers']")
+    if not blocks:
+        return {"error": "missing offers block"}
+    paragraphs = select(node, "p")
+    lines = []
+    for p in select(blocks[0], "p"):
+        price = next(
+            (s for s in select(p, "span") if "priceExp" in s.attrs.get("class", "")),
+            None,
+        )
+        lines.append({"text": p.inner_text(), "price": price.inner_text() if price else None})
+    return {
+        "name": links[0].inner_text(),
+        "href": links[0].attrs.get("href"),
+        "address": paragraphs[1].inner_text() if len(paragraphs) >= 2 else "",
+        "lines": lines,
+    }
+
+
+class FakeDriver(FakeWebElement):
+    """Document-level element that also answers ``execute_script``.
+
+    The offers script is evaluated in Python over the same tree and counted
+    as a single round-trip.
+    """
+
+    def __init__(self, html: str, latency: float = 0.0) -> None:
+        super().__init__(parse_html(html), RoundTrips(latency))
+
+    @property
+    def round_trips(self) -> int:
+        return self._trips.count
+
+    def execute_script(self, script: str, elements: List[FakeWebElement]):
+        self._trips.hit()
+        return [_script_offer(el.node) for el in elements]
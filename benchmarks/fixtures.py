@@ -0,0 +1,75 @@
+"""Deterministic product page fixtures for offline benchmarks.
+
+``mui_page`` mimics the Material-UI markup walked by
+``scraper.core.data_extractor`` and ``offer_list_page`` the simplified
+``li.offer`` markup read by ``scraper.services.offers._parse_offers``.  Both
+accept ``padding`` to add unrelated markup between offers so that page size
+can grow independently of the offer count.
+
+Recorded pages can be used instead by passing ``--html`` to the benchmark
+scripts; :func:`load_pages` reads them.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Iterable
+
+_NOISE = (
+    '<div class="tss-noise"><svg viewBox="0 0 24 24"><path d="M12 2C6.48 2 2 6.48 2 12s4.48 '
+    '10 10 10 10-4.48 10-10S17.52 2 12 2z"/></svg><span class="MuiTypography-root">'
+    "Reklama</span></div>"
+)
+
+
+def _price(i: int, step: int) -> str:
+    return f"{40 + (i * 7 + step) % 30},{(i * 13) % 100:02d} zł / g"
+
+
+def mui_offer(i: int) -> str:
+    return (
+        '<li class="MuiListItem-root MuiListItem-gutters">'
+        f'<a class="tss-pharmacy" href="https://www.gdziepolek.pl/apteki/apteka-{i}">Apteka nr {i}</a>'
+        "<p>Apteka ogólnodostępna</p>"
+        f"<p>ul. Testowa {i}, 40-{i % 1000:03d} Katowice</p>"
+        '<div class="tss-1oxhpw5-offers">'
+        f"<p>{i % 9 + 1} sztuk</p>"
+        f'<p>➔ 2026-{i % 12 + 1:02d}-15 <span class="tss-1u6comz-priceExp">{_price(i, 0)}</span></p>'
+        f'<p><span class="tss-1u6comz-priceExp">{_price(i, 1)}</span></p>'
+        f"<p>{i % 5 + 1} godziny temu</p>"
+        "</div>"
+        "</li>"
+    )
+
+
+def mui_page(offers: int, padding: int = 0) -> str:
+    parts = ["<html><body><ul class=\"MuiList-root\">"]
+    for i in range(offers):
+        parts.append(mui_offer(i))
+        parts.append(_NOISE * padding)
+    parts.append("</ul></body></html>")
+    return "".join(parts)
+
+
+def offer_list_offer(i: int) -> str:
+    return (
+        '<li class="offer">'
+        f'<a class="apteka" href="/apteki/apteka-{i}">Apteka nr {i}</a>'
+        f'<p class="address">ul. Testowa {i}, Katowice</p>'
+        f'<div class="offers"><p><span class="priceExp">{_price(i, 0)}</span></p></div>'
+        f'<p class="updated">{i % 5 + 1} godziny temu</p>'
+        "</li>"
+    )
+
+
+def offer_list_page(offers: int, padding: int = 0) -> str:
+    parts = ["<html><body><ul>"]
+    for i in range(offers):
+        parts.append(offer_list_offer(i))
+        parts.append(_NOISE * padding)
+    parts.append("</ul></body></html>")
+    return "".join(parts)
+
+
+def load_pages(paths: Iterable[str]) -> Dict[str, str]:
+    return {Path(p).name: Path(p).read_text(encoding="utf-8") for p in paths}
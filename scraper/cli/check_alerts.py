@@ -182,7 +182,8 @@ def check_alerts(alerts, current_prices, notified):
     return notified
 
 
-if __name__ == "__main__":
+def run():
+    """Sprawdź wszystkie potwierdzone alerty względem najnowszych cen."""
     alerts = load_alerts()
     notified = load_notified()
 
@@ -192,3 +193,7 @@ if __name__ == "__main__":
         prices = fetch_latest_prices()
         updated_notified = check_alerts(alerts, prices, notified)
         save_notified(updated_notified)
+
+
+if __name__ == "__main__":
+    run()
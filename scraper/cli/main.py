@@ -1,32 +1,56 @@
 """Command-line entry point for scraping workflow."""
 
+import argparse
 import logging
 import time
-from typing import List
+from typing import List, Optional, Sequence
 
 from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from scraper.core.bootstrap import init_logging
+from scraper.core.config.config import SCHEDULER_ENABLED, SCRAPE_REGIONS
 from scraper.products.discovery import discover_products
-from scraper.products.urls import build_regional_url
-from scraper.services import sync_products
-from scraper.services.db import ENGINE, insert_prices
-from scraper.services.offers import _default_fetch, _parse_offers
+from scraper.products.urls import resolve_regions
+from scraper.services import metrics, sync_products, tracing
+from scraper.services.async_scraper import _default_fetch
+from scraper.services.db import ENGINE
+from scraper.services.fingerprints import fingerprint_key, get_fingerprint_store
+from scraper.services.page_archive import get_page_archive
+from scraper.services.pipeline import run_pipeline
+from scraper.services.run_journal import FINISHED, RunJournal
+from scraper.services.scheduler import due_slugs
 from backend.models import Product
 
 
 logger = logging.getLogger(__name__)
 
 
-def main() -> None:
-    """Entry point for discovery, syncing and scraping workflow."""
+def main(resume: bool = False) -> None:
+    """Entry point for discovery, syncing and scraping workflow.
+
+    With ``resume`` the latest interrupted run is continued and products it
+    already finished in every region are not scraped again.
+    """
     init_logging()
+    metrics.start_exporter()
+    tracing.init_tracing()
+    tracing.instrument_engine(ENGINE)
+    try:
+        with tracing.span("scraper.run", resume=resume):
+            _run(resume)
+    finally:
+        tracing.shutdown()
+
+
+def _run(resume: bool) -> None:
     start_time = time.time()
 
     # Discover products
     discover_start = time.time()
-    discovered = discover_products()
+    with tracing.span("discover") as stage:
+        discovered = discover_products()
+        stage.set_attribute("products", len(discovered))
     discover_time = time.time() - discover_start
     logger.info("🔍 Discovered %d products in %.2fs", len(discovered), discover_time)
 
@@ -37,7 +61,8 @@ def main() -> None:
 
     # Sync products
     sync_start = time.time()
-    sync_products(discovered)
+    with tracing.span("sync", products=len(discovered)):
+        sync_products(discovered)
     sync_time = time.time() - sync_start
 
     with Session(ENGINE) as session:
@@ -55,34 +80,63 @@ def main() -> None:
         deactivated,
     )
 
-    # Scrape offers for active products
+    # Only products due according to their price volatility are visited
+    if SCHEDULER_ENABLED:
+        by_slug = {p.slug: p for p in active_products}
+        active_products = [by_slug[slug] for slug in due_slugs(list(by_slug))]
+
+    # Scrape offers for active products: fetch, parse and persist run as
+    # overlapping stages (see scraper.services.pipeline)
     scrape_start = time.time()
-    offers_count = 0
-    missing_products: List[str] = []
-    seen: set[str] = set()
-    for product in active_products:
-        base_url = f"https://www.gdziepolek.pl/produkty/{product.slug}"
-        url = build_regional_url(base_url)
-        try:
-            html = _default_fetch(url)
-        except Exception as exc:  # pragma: no cover - network failure
-            logger.error("Failed to fetch %s: %s", url, exc)
-            continue
-        entries = _parse_offers(html, product.slug)
-        if not entries:
-            missing_products.append(product.slug)
-            continue
-        seen.add(product.slug)
-        for entry in entries:
-            offers_count += len(entry.get("offers", []))
-            insert_prices(entry)
+    regions = resolve_regions(SCRAPE_REGIONS)
+    slugs = [p.slug for p in active_products]
+    journal = RunJournal(ENGINE)
+    journal.ensure_tables()
+    journal.start("main", len(slugs) * len(regions), resume=resume)
+    previous = journal.statuses()
+
+    def finished_before(slug: str) -> bool:
+        return all(previous.get(fingerprint_key(slug, region)) in FINISHED for region in regions)
+
+    # products without offers in the interrupted part must still be deactivated
+    empty_before = {
+        slug
+        for slug in slugs
+        if all(previous.get(fingerprint_key(slug, region)) == "empty" for region in regions)
+    }
+    fingerprints = get_fingerprint_store()
+    archive = get_page_archive()
+    pending = [slug for slug in slugs if not finished_before(slug)]
+    try:
+        with tracing.span("scrape", products=len(pending), regions=len(regions)) as stage:
+            report = run_pipeline(
+                pending,
+                fetch_page=_default_fetch,
+                fingerprints=fingerprints,
+                archive=archive,
+                regions=regions,
+                journal=journal,
+            )
+            stage.set_attributes({"offers": report.offers, "rows": report.rows})
+    finally:
+        if archive is not None:
+            archive.close()
+    journal.finish()
+    unchanged = fingerprints.unchanged_products() if fingerprints else set()
+    # products that failed to fetch are absent from the report and stay active
+    missing_products: List[str] = sorted((report.without_offers | empty_before) - unchanged)
+    offers_count = report.offers
+
+    if fingerprints:
+        fingerprints.save()
 
     scrape_time = time.time() - scrape_start
     logger.info(
-        "📦 Scraped offers in %.2fs: offers=%d, products_without_offers=%d",
+        "📦 Scraped offers in %.2fs: offers=%d, products_without_offers=%d, unchanged=%d",
         scrape_time,
         offers_count,
         len(missing_products),
+        len(unchanged),
     )
 
     # Deactivate products without offers
@@ -101,13 +155,25 @@ def main() -> None:
         update_price_stats = None  # type: ignore
     if update_price_stats:
         stats_start = time.time()
-        stats = update_price_stats()
+        with tracing.span("stats"):
+            stats = update_price_stats()
         stats_time = time.time() - stats_start
         logger.info("📊 Price stats updated in %.2fs: %s", stats_time, stats)
 
     total_time = time.time() - start_time
+    metrics.export()
     logger.info("✅ Finished in %.2fs", total_time)
 
 
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Discover, sync and scrape all products")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the latest interrupted run, skipping products it already finished",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    main()
+    main(resume=parse_args().resume)
@@ -0,0 +1,55 @@
+"""Ponowne parsowanie archiwum stron i zapis ofert bez sieci i przeglądarki.
+
+Strony zapisane przez scraper (``PAGE_ARCHIVE_DIR``) przechodzą przez bieżące
+parsery równolegle w ``--workers`` procesach, a oferty trafiają do bazy z
+oryginalnym czasem pobrania, w kolejności chronologicznej.  Z ``--dry-run``
+strony są tylko parsowane (np. by sprawdzić zmianę parsera na historii).
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from scraper.core.bootstrap import init_logging
+from scraper.core.config.config import PAGE_ARCHIVE_DIR
+from scraper.services.page_archive import iter_index, replay
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive-dir", default=PAGE_ARCHIVE_DIR, help="Katalog archiwum stron")
+    parser.add_argument("--since", help="Od czasu pobrania (ISO, np. 2025-05-01)")
+    parser.add_argument("--until", help="Do czasu pobrania, wyłącznie (ISO)")
+    parser.add_argument("--product", action="append", help="Tylko wskazane produkty (można powtórzyć)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Liczba procesów parsujących")
+    parser.add_argument("--dry-run", action="store_true", help="Parsuj bez zapisu do bazy")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    init_logging()
+    records = list(iter_index(args.archive_dir, args.product, args.since, args.until))
+    logger.info("🗄️ Replay: %d stron z %s", len(records), args.archive_dir)
+
+    insert = None
+    if not args.dry_run:
+        from scraper.services.db import insert_prices
+
+        insert = insert_prices
+
+    started = time.perf_counter()
+    stats = replay(records, args.archive_dir, insert=insert, workers=args.workers)
+    elapsed = time.perf_counter() - started
+    rate = stats.pages / elapsed if elapsed else 0.0
+    print(
+        f"Pages: {stats.pages} (failed {stats.failed}), entries: {stats.entries}, "
+        f"offers: {stats.offers} in {elapsed:.1f}s ({rate:.0f} pages/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
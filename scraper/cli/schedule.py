@@ -0,0 +1,88 @@
+"""Podgląd harmonogramu adaptacyjnego i symulacja na danych historycznych.
+
+Bez argumentów wypisuje listę produktów do odwiedzenia w bieżącym przebiegu.
+Z ``--simulate`` odtwarza zapisane zmiany cen z ostatnich ``--days`` dni i
+porównuje liczbę pobranych stron oraz świeżość danych dla kilku wartości
+``SCHEDULE_STABILITY`` z odwiedzaniem wszystkich produktów w każdym przebiegu.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.models import Product
+from scraper.core.config.config import SCHEDULE_WINDOW_DAYS
+from scraper.services import db as db_services
+from scraper.services.scheduler import (
+    SchedulePolicy,
+    build_due_list,
+    load_product_stats,
+    simulate,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--simulate", action="store_true", help="Odtwórz historię zamiast listy bieżącej")
+    parser.add_argument("--days", type=float, default=30, help="Okres symulacji w dniach")
+    parser.add_argument("--step-hours", type=float, default=24, help="Odstęp między przebiegami")
+    parser.add_argument(
+        "--stability",
+        type=float,
+        nargs="+",
+        default=[0.25, 0.5, 1.0],
+        help="Porównywane wartości SCHEDULE_STABILITY",
+    )
+    return parser.parse_args(argv)
+
+
+def _active_slugs():
+    with Session(db_services.ENGINE) as session:
+        return [p.slug for p in session.execute(select(Product).where(Product.active)).scalars()]
+
+
+def print_due_list(slugs, now):
+    stats = load_product_stats(slugs, now=now)
+    due = build_due_list(stats, now)
+    print(f"Due: {len(due)}/{len(slugs)}")
+    for item in due:
+        priority = "new" if item.priority == float("inf") else f"{item.priority:.2f}"
+        print(f"  {item.slug:<40} priority={priority:>6}  interval={item.interval}")
+
+
+def print_simulation(slugs, now, days, step, stabilities):
+    start = now - timedelta(days=days)
+    window = timedelta(days=days + SCHEDULE_WINDOW_DAYS)
+    stats = load_product_stats(slugs, now=now, window=window)
+    history = {s.slug: s.changes for s in stats}
+    subscribers = {s.slug: s.subscribers for s in stats}
+    changes = sum(1 for s in stats for c in s.changes if c >= start)
+    print(f"Products: {len(slugs)}, changes in period: {changes}, runs every {step}")
+    print(f"{'policy':>16} {'pages':>8} {'pages %':>8} {'fresh %':>8} {'mean delay':>12}")
+
+    results = [simulate(history, start, now, step, None, subscribers)]
+    for stability in stabilities:
+        policy = SchedulePolicy(stability=stability)
+        results.append(simulate(history, start, now, step, policy, subscribers))
+    for r in results:
+        delay_h = r.mean_delay.total_seconds() / 3600
+        print(
+            f"{r.label:>16} {r.pages:>8} {r.pages_ratio * 100:>7.1f}% "
+            f"{r.freshness * 100:>7.1f}% {delay_h:>10.1f} h"
+        )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    now = datetime.now()
+    slugs = _active_slugs()
+    if args.simulate:
+        print_simulation(slugs, now, args.days, timedelta(hours=args.step_hours), args.stability)
+    else:
+        print_due_list(slugs, now)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,12 @@ zmienne środowiskowe lub parametry wiersza poleceń.
 import argparse
 import logging
 import os
+import queue
+import shutil
 import time
-import random
+from collections import Counter
 from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
 from pathlib import Path
 from datetime import datetime
 
@@ -18,6 +21,11 @@ from scraper.cli.email_utils import send_email
 
 logger = logging.getLogger(__name__)
 
+
+class BrowserUnavailable(RuntimeError):
+    """Nie udało się uruchomić przeglądarki – worker kończy pracę."""
+
+
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("--db-type", help="Typ bazy: sqlite, postgresql, mysql, api")
@@ -31,17 +39,121 @@ def parse_args():
     parser.add_argument("--headless", action="store_true", help="Wymuś tryb headless")
     parser.add_argument("--workers", type=int, default=1, help="Liczba równoległych procesów")
     parser.add_argument("--summary-email", help="Adres e-mail do wysyłki podsumowania")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Kontynuuj ostatni przerwany przebieg, pomijając zakończone produkty",
+    )
     return parser.parse_args()
 
 
-def chunked(seq, n_chunks):
-    if n_chunks <= 0:
-        return [seq]
-    size = (len(seq) + n_chunks - 1) // n_chunks
-    return [seq[i:i + size] for i in range(0, len(seq), size)]
+def fill_queue(tasks, products, regions=None, skip=()):
+    """Wrzuć produkty do wspólnej kolejki jako ``(idx, name, attempt, not_before)``.
 
+    Dla regionów innych niż domyślny nazwa zadania ma postać ``nazwa@region``.
+    Zadania z ``skip`` (zakończone we wznawianym przebiegu) są pomijane.
+    Zwraca liczbę zadań.
+    """
+    from scraper.products.urls import DEFAULT_REGION
 
-def worker(products, db_url, headless):
+    regions = regions or (DEFAULT_REGION,)
+    count = 0
+    for idx, name in enumerate(products, start=1):
+        for region in regions:
+            task = name if region == DEFAULT_REGION else f"{name}@{region}"
+            if task in skip:
+                continue
+            tasks.put((idx, task, 1, 0.0))
+            count += 1
+    return count
+
+
+def run_queue(
+    worker_id, tasks, outstanding, lock, scrape_one, max_attempts, backoff, sleep=time.sleep, journal=None
+):
+    """Pobieraj produkty ze wspólnej kolejki, aż wszystkie zostaną obsłużone.
+
+    ``outstanding`` (obiekt z atrybutem ``value``) liczy produkty, które nie
+    zostały jeszcze zakończone – sukcesem lub ostatecznym błędem – więc
+    worker nie kończy pracy, dopóki inny proces może odłożyć ponowienie do
+    kolejki. Nieudany produkt wraca do kolejki z wykładniczym opóźnieniem
+    ``backoff * 2**(attempt-1)`` i może zostać podjęty przez dowolny worker.
+
+    ``scrape_one`` zwraca ``False``, gdy produkt został pominięty. Gdy
+    zgłosi :class:`BrowserUnavailable`, zadanie wraca do kolejki bez
+    zużycia próby, a worker kończy pracę – resztę przejmą pozostałe.
+
+    Ostateczny wynik każdego zadania trafia od razu do ``journal``
+    (:class:`~scraper.services.run_journal.RunJournal`), jeśli podano.
+
+    Zwraca raport ``{"worker", "scraped", "skipped", "failed", "retries"}``.
+    """
+    from scraper.services.metrics import count_retry
+
+    report = {"worker": worker_id, "scraped": [], "skipped": [], "failed": [], "retries": 0}
+    while True:
+        with lock:
+            if outstanding.value <= 0:
+                break
+        try:
+            idx, name, attempt, not_before = tasks.get(timeout=0.5)
+        except queue.Empty:
+            continue
+
+        wait = not_before - time.time()
+        if wait > 0:
+            # Ponowienie jeszcze nie dojrzało – oddaj je i spróbuj za chwilę
+            tasks.put((idx, name, attempt, not_before))
+            sleep(min(wait, 0.5))
+            continue
+
+        try:
+            done = scrape_one(idx, name)
+        except BrowserUnavailable as e:
+            logger.error(f"[{idx}] 🛑 Worker {worker_id}: brak przeglądarki ({e}) – oddaję {name} i kończę pracę")
+            tasks.put((idx, name, attempt, not_before))
+            break
+        except Exception as e:
+            if attempt < max_attempts:
+                delay = backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    f"[{idx}] 🔁 Worker {worker_id}: błąd ({e}), ponowienie {attempt + 1}/{max_attempts} za {delay:.0f}s"
+                )
+                report["retries"] += 1
+                count_retry("selenium", name)
+                tasks.put((idx, name, attempt + 1, time.time() + delay))
+                continue
+            logger.error(f"[{idx}] ❌ Worker {worker_id}: {name} nieudany po {attempt} próbach – {e}")
+            report["failed"].append(name)
+            if journal is not None:
+                journal.mark(name, "failed", attempt, e)
+        else:
+            status = "skipped" if done is False else "done"
+            report["skipped" if done is False else "scraped"].append(name)
+            if journal is not None:
+                journal.mark(name, status, attempt)
+        with lock:
+            outstanding.value -= 1
+    return report
+
+
+def record_page_outcome(proxies, health, driver, ok, latency, failure=None):
+    """Record one page load; return why the browser should be restarted, or ``None``.
+
+    ``failure`` is the :class:`~scraper.core.proxy_pool.ProxyFailure` reason.
+    Throttled pages (429/503 from the site) only slow down the shared token
+    bucket – neither the proxy nor the browser is to blame for them.
+    """
+    if failure == "throttled":
+        return None
+    health.record(latency, ok)
+    # proxy w kwarantannie – nowa przeglądarka wylosuje inne
+    if proxies.report(getattr(driver, "scraper_proxy", None), ok, latency, failure == "ban"):
+        return "proxy"
+    return health.restart_reason(driver)
+
+
+def worker(worker_id, tasks, outstanding, lock, db_url, headless, journal_url=None, run_id=None):
     os.environ["DB_URL"] = db_url
     if db_url.startswith("sqlite:///"):
         os.environ["DB_PATH"] = db_url.replace("sqlite:///", "")
@@ -53,44 +165,136 @@ def worker(products, db_url, headless):
 
     from scraper.core.bootstrap import ensure_schema, init_logging
     from scraper.core.browser import setup_browser
+    from scraper.core.browser_health import BrowserHealth
+    from scraper.core.debug_capture import get_debug_capture
+    from scraper.core.proxy_pool import ProxyFailure, get_proxy_pool
     from scraper.core.main import scrape_product
     from scraper.core.config.urls import get_url_by_name, extract_product_id
+    from scraper.products.urls import with_region
+    from scraper.core.resource_blocking import BlockStats, collect_cdp_blocked
+    from scraper.services.fingerprints import get_fingerprint_store
+    from scraper.services.page_archive import get_page_archive
+    from scraper.services.run_journal import RunJournal, journal_engine
+    from scraper.utils.rate_limit import RateLimiter, SharedTokenBucket
 
     init_logging()
     ensure_schema()
 
     driver = setup_browser(headless=headless)
-    scraped = 0
-
-    try:
-        for idx, name in enumerate(products, start=1):
-            url = get_url_by_name(name)
-            if not url:
-                logger.warning(f"[{idx}] ⚠️ Pominięto (brak URL): {name}")
-                continue
+    health = BrowserHealth(
+        cfg.BROWSER_MAX_RSS_MB, cfg.BROWSER_LATENCY_FACTOR, cfg.BROWSER_MAX_ERRORS, cfg.BROWSER_MAX_PAGES
+    )
+    block_stats = BlockStats()
+    fingerprints = get_fingerprint_store()
+    archive = get_page_archive()
+    proxies = get_proxy_pool()
+    limiter = RateLimiter(cfg.SCRAPE_MIN_INTERVAL, cfg.SCRAPE_INTERVAL_JITTER)
+    journal = RunJournal(journal_engine(journal_url), run_id) if journal_url and run_id else None
+    # wspólny dla wszystkich procesów – łączne tempo nie rośnie z --workers
+    bucket = (
+        SharedTokenBucket(
+            cfg.RATE_LIMIT_FILE,
+            cfg.SCRAPE_RATE,
+            cfg.SCRAPE_BURST,
+            cfg.SCRAPE_MIN_RATE,
+            cfg.SCRAPE_THROTTLE_BACKOFF,
+        )
+        if cfg.SCRAPE_RATE > 0
+        else None
+    )
 
-            logger.info(f"[{idx}] 🔍 Scraping: {name}")
+    def scrape_one(idx, task):
+        nonlocal driver
+        name, _, region = task.partition("@")
+        url = get_url_by_name(name)
+        if not url:
+            logger.warning(f"[{idx}] ⚠️ Pominięto (brak URL): {name}")
+            return False
+        if region:
+            url = with_region(url, region)
+        if driver is None:
+            # poprzednia przeglądarka została zamknięta do restartu
             try:
-                product_id = extract_product_id(url)
-                scrape_product(driver, url, product_id)
-                logger.info(f"[{idx}] ✅ Gotowe: {name}")
-            except Exception as e:
-                logger.error(f"[{idx}] ❌ Błąd ekstrakcji – {e}")
-
-            scraped += 1
-
-            if scraped % 10 == 0:
-                logger.info("🔄 Restart przeglądarki dla stabilności...")
-                driver.quit()
-                time.sleep(2)
                 driver = setup_browser(headless=headless)
+            except Exception as e:
+                raise BrowserUnavailable(str(e)) from e
+
+        limiter.wait()
+        if bucket is not None:
+            bucket.acquire()
+        logger.info(f"[{idx}] 🔍 Worker {worker_id} scraping: {task}")
+        started = time.monotonic()
+        ok = False
+        failure = None
+        try:
+            scrape_product(driver, url, extract_product_id(url), fingerprints, archive)
+            if fingerprints is not None:
+                fingerprints.save()
+            ok = True
+            logger.info(f"[{idx}] ✅ Gotowe: {task}")
+            if bucket is not None:
+                bucket.reward()
+        except ProxyFailure as e:
+            failure = e.reason
+            if e.reason == "throttled" and bucket is not None:
+                rate = bucket.penalize()
+                logger.warning(f"[{idx}] 🐢 Serwis ogranicza zapytania – wspólne tempo {rate:.2f}/s")
+            raise
+        finally:
+            latency = time.monotonic() - started
+            collect_cdp_blocked(driver, block_stats)
+            reason = record_page_outcome(proxies, health, driver, ok, latency, failure)
+            if reason:
+                health.restarted(reason)
+                # nowa przeglądarka startuje przed kolejnym zadaniem – błąd startu
+                # nie przykryje wyjątku tej strony
+                try:
+                    driver.quit()
+                except Exception as e:
+                    logger.warning(f"[{idx}] ⚠️ Zamknięcie przeglądarki nieudane: {e}")
+                driver = None
 
-            time.sleep(random.uniform(1, 3))
-
+    try:
+        report = run_queue(
+            worker_id,
+            tasks,
+            outstanding,
+            lock,
+            scrape_one,
+            cfg.SCRAPE_MAX_ATTEMPTS,
+            cfg.SCRAPE_RETRY_BACKOFF,
+            journal=journal,
+        )
     finally:
-        driver.quit()
-        logger.info("🛑 Zakończono scraping w procesie.")
-    return scraped
+        if driver is not None:
+            driver.quit()
+        if archive is not None:
+            archive.close()
+        get_debug_capture().close()
+        proxies.save()
+        logger.info(f"🛑 Zakończono scraping w procesie ({block_stats}).")
+    report["blocked"] = block_stats.as_dict()
+    report["restarts"] = dict(health.restarts)
+    return report
+
+
+def format_restarts(restarts):
+    return ", ".join(f"{reason}={count}" for reason, count in sorted(restarts.items()))
+
+
+def format_worker_report(reports):
+    lines = []
+    for report in sorted(reports, key=lambda r: r["worker"]):
+        line = f"Worker {report['worker']}: {len(report['scraped'])} ok, retries {report['retries']}"
+        restarts = report.get("restarts")
+        if restarts:
+            line += f", restarts {format_restarts(restarts)}"
+        if report["scraped"]:
+            line += f" – {', '.join(report['scraped'])}"
+        if report["failed"]:
+            line += f"; failed: {', '.join(report['failed'])}"
+        lines.append(line)
+    return "\n".join(lines)
 
 
 def main():
@@ -117,33 +321,70 @@ def main():
         os.environ["HEADLESS"] = "true"
 
     from scraper.core.config.urls import PRODUCT_NAMES
-    from scraper.core.config.config import DB_URL, DB_PATH, DEFAULT_HEADLESS
+    from scraper.core.config.config import DB_URL, DB_PATH, DEFAULT_HEADLESS, SCRAPE_REGIONS
+    from scraper.products.urls import resolve_regions
+    from scraper.services import metrics
+    from scraper.services.run_journal import RunJournal, journal_engine
 
     num_workers = max(1, args.workers)
     num_workers = min(num_workers, len(PRODUCT_NAMES))
-    product_chunks = chunked(PRODUCT_NAMES, num_workers)
 
     if DB_URL and not DB_URL.startswith("sqlite"):
-        db_urls = [DB_URL] * len(product_chunks)
+        db_urls = [DB_URL] * num_workers
     else:
         base_path = Path(DB_URL.replace("sqlite:///", "")) if DB_URL else Path(DB_PATH)
         db_urls = []
-        for i in range(len(product_chunks)):
+        for i in range(num_workers):
             worker_path = base_path.parent / f"{base_path.stem}_worker_{i}{base_path.suffix}"
             worker_path.parent.mkdir(parents=True, exist_ok=True)
             db_urls.append(f"sqlite:///{worker_path}")
     from scraper.core.bootstrap import init_logging
+    from scraper.core.resource_blocking import BlockStats, format_bytes
 
     init_logging()
 
+    # Dziennik przebiegu trafia do głównej bazy – bazy workerów SQLite są osobne
+    journal_url = DB_URL or f"sqlite:///{DB_PATH}"
+    journal = RunJournal(journal_engine(journal_url))
+    journal.ensure_tables()
+    regions = resolve_regions(SCRAPE_REGIONS)
+    journal.start("scrape_all", len(PRODUCT_NAMES) * len(regions), resume=args.resume)
+    finished = journal.finished()
+
+    # workery zapisują metryki do wspólnego katalogu, rodzic je agreguje
+    metrics_dir = metrics.enable_multiprocess()
+    metrics.start_exporter()
+
     start_dt = datetime.now()
     start_time = time.time()
 
-    with ProcessPoolExecutor(max_workers=len(product_chunks)) as executor:
-        futures = []
-        for products, db_url in zip(product_chunks, db_urls):
-            futures.append(executor.submit(worker, products, db_url, DEFAULT_HEADLESS))
-        total_scraped = sum(f.result() for f in futures)
+    # Wspólna kolejka: każdy worker pobiera kolejny produkt, gdy skończy poprzedni
+    with Manager() as manager, ProcessPoolExecutor(max_workers=num_workers) as executor:
+        tasks = manager.Queue()
+        task_count = fill_queue(tasks, PRODUCT_NAMES, regions, skip=finished)
+        outstanding = manager.Value("i", task_count)
+        lock = manager.Lock()
+        futures = [
+            executor.submit(
+                worker, i, tasks, outstanding, lock, db_url, DEFAULT_HEADLESS, journal_url, journal.run_id
+            )
+            for i, db_url in enumerate(db_urls)
+        ]
+        reports = [f.result() for f in futures]
+    journal.finish()
+    metrics.export()
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.environ.pop(metrics.MULTIPROC_ENV, None)
+
+    failed = [name for r in reports for name in r["failed"]]
+    # jak dawniej: produkty obsłużone (udane i nieudane), bez pominiętych
+    processed = sum(len(r["scraped"]) for r in reports) + len(failed)
+    block_stats = BlockStats()
+    restarts = Counter()
+    for report in reports:
+        block_stats.merge(report["blocked"])
+        restarts.update(report["restarts"])
 
     end_dt = datetime.now()
     runtime = time.time() - start_time
@@ -152,7 +393,13 @@ def main():
         f"Start: {start_dt.isoformat()}\n"
         f"End: {end_dt.isoformat()}\n"
         f"Runtime: {runtime:.2f}s\n"
-        f"Offers scraped: {total_scraped}"
+        f"Run: #{journal.run_id} ({len(finished)} tasks resumed as done)\n"
+        f"Offers scraped: {processed}\n"
+        f"Failed products: {len(failed)}\n"
+        f"Browser restarts: {sum(restarts.values())} ({format_restarts(restarts) or '-'})\n"
+        f"Blocked requests: {block_stats.requests}\n"
+        f"Bytes saved (est.): {format_bytes(block_stats.bytes_saved)}\n"
+        f"{format_worker_report(reports)}"
     )
 
     logger.info(summary)
@@ -161,7 +408,7 @@ def main():
     metrics_path.parent.mkdir(parents=True, exist_ok=True)
     with open(metrics_path, "a", encoding="utf-8") as mf:
         mf.write(
-            f"{start_dt.isoformat()}, {end_dt.isoformat()}, {runtime:.2f}, {total_scraped}\n"
+            f"{start_dt.isoformat()}, {end_dt.isoformat()}, {runtime:.2f}, {processed}\n"
         )
 
     summary_email = args.summary_email or os.environ.get("SUMMARY_EMAIL")
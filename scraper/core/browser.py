@@ -9,7 +9,13 @@ from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.common.exceptions import WebDriverException
 
-from scraper.core.config.config import PROXIES
+from scraper.core.proxy_pool import get_proxy_pool
+from scraper.core.resource_blocking import (
+    apply_cdp_blocking,
+    chrome_logging_prefs,
+    firefox_preferences,
+    get_blocking_profile,
+)
 from scraper.core.constants import (
     USER_AGENTS,
     DEFAULT_LOCALE,
@@ -22,12 +28,8 @@ from scraper.core.constants import (
 logger = logging.getLogger(__name__)
 
 def get_random_proxy() -> Optional[str]:
-    """Return a random proxy from configuration if available."""
-    if PROXIES:
-        proxy = random.choice(PROXIES)
-        logger.info(f"Using proxy: {proxy}")
-        return proxy
-    return None
+    """Return a proxy weighted by its health score, if any are configured."""
+    return get_proxy_pool().choose()
 
 def setup_browser(headless=False, specific_version=None, use_firefox_fallback=True):
     try:
@@ -45,7 +47,8 @@ def setup_browser(headless=False, specific_version=None, use_firefox_fallback=Tr
     raise WebDriverException("Failed to initialize any WebDriver with all available options")
 
 
-def setup_chrome_browser(headless=False, specific_version=None):
+def setup_chrome_browser(headless=False, specific_version=None, blocking=None):
+    blocking = blocking or get_blocking_profile()
     options = ChromeOptions()
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-gpu")
@@ -72,6 +75,11 @@ def setup_chrome_browser(headless=False, specific_version=None):
     if headless:
         options.add_argument("--headless=new")
 
+    # Log wydajności pozwala policzyć żądania zablokowane przez CDP
+    logging_prefs = chrome_logging_prefs(blocking)
+    if logging_prefs:
+        options.set_capability("goog:loggingPrefs", logging_prefs)
+
     chrome_bin = os.getenv("CHROME_BIN")
     if chrome_bin:
         options.binary_location = chrome_bin
@@ -82,6 +90,8 @@ def setup_chrome_browser(headless=False, specific_version=None):
             "Page.addScriptToEvaluateOnNewDocument",
             {"source": "Object.defineProperty(navigator, 'webdriver', { get: () => undefined });"},
         )
+        apply_cdp_blocking(driver, blocking)
+        driver.scraper_proxy = proxy
         logger.info("Successfully initialized Chrome WebDriver")
         return driver
     except Exception as e:
@@ -89,7 +99,8 @@ def setup_chrome_browser(headless=False, specific_version=None):
         raise WebDriverException(f"Chrome WebDriver initialization failed: {e}")
 
 
-def setup_firefox_browser(headless=False):
+def setup_firefox_browser(headless=False, blocking=None):
+    blocking = blocking or get_blocking_profile()
     options = FirefoxOptions()
     if headless:
         options.add_argument("--headless")
@@ -103,7 +114,9 @@ def setup_firefox_browser(headless=False):
     options.set_preference("dom.webdriver.enabled", False)
     # Remove remaining automation flags
     options.set_preference("useAutomationExtension", False)
-
+    # Firefox w Selenium nie przechwytuje żądań – wyłączamy obrazy/fonty preferencjami
+    for key, value in firefox_preferences(blocking).items():
+        options.set_preference(key, value)
 
     proxy = get_random_proxy()
     if proxy:
@@ -126,6 +139,7 @@ def setup_firefox_browser(headless=False):
         driver.execute_script(
             "Object.defineProperty(navigator, 'webdriver', { get: () => undefined });"
         )
+        driver.scraper_proxy = proxy
         logger.info("Successfully initialized Firefox WebDriver")
         return driver
     except Exception as e:
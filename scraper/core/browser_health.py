@@ -0,0 +1,176 @@
+"""Decide when a long-running WebDriver session should be restarted.
+
+:class:`BrowserHealth` watches three signals and only asks for a restart once
+one of them crosses its threshold:
+
+* resident memory of the browser process tree (driver + browser + renderers),
+* the page-load latency trend – the mean of the latest loads compared with
+  the baseline measured right after the browser started,
+* consecutive failed products.
+
+``max_pages`` remains as an optional hard cap for very long sessions.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import Counter, deque
+from statistics import mean, median
+from typing import Any, Deque, Dict, List, Optional
+
+from scraper.core.config.config import (
+    BROWSER_LATENCY_FACTOR,
+    BROWSER_MAX_ERRORS,
+    BROWSER_MAX_PAGES,
+    BROWSER_MAX_RSS_MB,
+)
+
+try:  # psutil is optional; /proc is used on Linux without it
+    import psutil
+except ImportError:  # pragma: no cover - depends on environment
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 5
+
+
+def _proc_children() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as fh:
+                stat = fh.read().decode(errors="replace")
+        except OSError:
+            continue
+        # pole 2 (comm) może zawierać spacje – PPID jest drugim polem po ")"
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _proc_rss(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm", "r") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def process_tree_rss(pid: int) -> Optional[int]:
+    """Return RSS in bytes of ``pid`` and all its descendants, if measurable."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for proc in procs:
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    if not os.path.isdir("/proc"):
+        return None
+    children = _proc_children()
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += _proc_rss(current)
+        stack.extend(children.get(current, ()))
+    return total
+
+
+def driver_pid(driver: Any) -> Optional[int]:
+    """PID of the driver service process (chromedriver/geckodriver)."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+class BrowserHealth:
+    """Track one browser session and report why it should be recycled.
+
+    Parameters
+    ----------
+    max_rss_mb:
+        Restart when the process tree uses more memory (0 disables).
+    latency_factor:
+        Restart when the mean of the last ``LATENCY_WINDOW`` page loads exceeds
+        the post-start baseline by this factor (0 disables).
+    max_errors:
+        Restart after this many consecutive failures (0 disables).
+    max_pages:
+        Hard cap on pages per session (0 disables).
+    """
+
+    def __init__(
+        self,
+        max_rss_mb: float = BROWSER_MAX_RSS_MB,
+        latency_factor: float = BROWSER_LATENCY_FACTOR,
+        max_errors: int = BROWSER_MAX_ERRORS,
+        max_pages: int = BROWSER_MAX_PAGES,
+        rss_probe=process_tree_rss,
+    ) -> None:
+        self.max_rss_mb = max_rss_mb
+        self.latency_factor = latency_factor
+        self.max_errors = max_errors
+        self.max_pages = max_pages
+        self._rss_probe = rss_probe
+        self.restarts: Counter = Counter()
+        self.reset()
+
+    def reset(self) -> None:
+        """Start tracking a fresh browser session."""
+        self.pages = 0
+        self.consecutive_errors = 0
+        self.baseline: Optional[float] = None
+        self._warmup: List[float] = []
+        self._recent: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Record one product load taking ``latency`` seconds."""
+        self.pages += 1
+        self.consecutive_errors = 0 if ok else self.consecutive_errors + 1
+        if not ok:
+            return
+        if self.baseline is None:
+            self._warmup.append(latency)
+            if len(self._warmup) >= LATENCY_WINDOW:
+                self.baseline = median(self._warmup)
+        else:
+            self._recent.append(latency)
+
+    def restart_reason(self, driver: Any = None) -> Optional[str]:
+        """Return why the browser should be restarted now, or ``None``."""
+        if self.max_errors and self.consecutive_errors >= self.max_errors:
+            return "errors"
+        if (
+            self.latency_factor
+            and self.baseline
+            and len(self._recent) == LATENCY_WINDOW
+            and mean(self._recent) > self.baseline * self.latency_factor
+        ):
+            return "latency"
+        if self.max_rss_mb and driver is not None:
+            pid = driver_pid(driver)
+            rss = self._rss_probe(pid) if pid else None
+            if rss is not None and rss / (1024 * 1024) > self.max_rss_mb:
+                return "memory"
+        if self.max_pages and self.pages >= self.max_pages:
+            return "max pages"
+        return None
+
+    def restarted(self, reason: str) -> None:
+        self.restarts[reason] += 1
+        logger.info(
+            "🔄 Restart przeglądarki (%s) po %d stronach, baseline=%s",
+            reason,
+            self.pages,
+            f"{self.baseline:.1f}s" if self.baseline else "-",
+        )
+        self.reset()
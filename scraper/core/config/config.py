@@ -50,3 +50,156 @@ if PROXY_FILE and Path(PROXY_FILE).exists():
 else:
     proxy_env = os.getenv("PROXY_LIST", "")
     PROXIES = [p.strip() for p in proxy_env.split(",") if p.strip()]
+
+# Ocena proxy: plik ze statystykami między przebiegami, liczba kolejnych błędów
+# do kwarantanny oraz początkowy i maksymalny czas kwarantanny (s, podwajany)
+PROXY_STATE_FILE = os.getenv("PROXY_STATE_FILE", str(Path(DB_PATH).parent / "proxy_state.json"))
+PROXY_MAX_FAILURES = int(os.getenv("PROXY_MAX_FAILURES", "2"))
+PROXY_COOLDOWN = float(os.getenv("PROXY_COOLDOWN", "300"))
+PROXY_MAX_COOLDOWN = float(os.getenv("PROXY_MAX_COOLDOWN", "21600"))
+
+# Pula przeglądarek Playwright: liczba równolegle utrzymywanych kontekstów
+# oraz liczba stron obsłużonych przez kontekst, po której zostaje odświeżony
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_POOL_MAX_USES = int(os.getenv("BROWSER_POOL_MAX_USES", "25"))
+
+# Silnik asynchroniczny: łączny limit równoległych pobrań, limit na host
+# oraz minimalny odstęp (w sekundach) między kolejnymi żądaniami do hosta
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+SCRAPE_HOST_CONCURRENCY = int(os.getenv("SCRAPE_HOST_CONCURRENCY", "4"))
+SCRAPE_HOST_DELAY = float(os.getenv("SCRAPE_HOST_DELAY", "0.5"))
+
+# Bezpośrednie pobieranie ofert z endpointu JSON (XHR) z pominięciem renderowania
+# strony; przeglądarka jest używana tylko do wykrycia endpointu i jako fallback.
+# Domyślnie wyłączone – schemat endpointu jest zgadywany
+SCRAPE_JSON_OFFERS = os.getenv("SCRAPE_JSON_OFFERS", "false").lower() in {"1", "true", "yes"}
+XHR_ENDPOINTS_FILE = os.getenv(
+    "XHR_ENDPOINTS_FILE", str(Path(DB_PATH).parent / "xhr_endpoints.json")
+)
+
+# Oferty ze stanu JSON osadzonego w HTML (__NEXT_DATA__) pobieranego zwykłym httpx,
+# bez przeglądarki; HTTP/2 (wymaga pakietu h2) oraz liczba stron bez stanu JSON,
+# po której w danym przebiegu wracamy od razu do przeglądarki; SSR domyślnie wyłączone
+SCRAPE_SSR_OFFERS = os.getenv("SCRAPE_SSR_OFFERS", "false").lower() in {"1", "true", "yes"}
+SCRAPE_HTTP2 = os.getenv("SCRAPE_HTTP2", "true").lower() in {"1", "true", "yes"}
+SSR_MAX_MISSES = int(os.getenv("SSR_MAX_MISSES", "5"))
+
+# Sposób ekstrakcji ofert w Selenium: "script" (jedno execute_script na stronę)
+# lub "elements" (odczyt element po elemencie przez WebDriver)
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "script").lower()
+
+# Parser listy ofert w HTML: "lxml" (drzewo + skompilowane XPath) lub "regex"
+OFFER_PARSER = os.getenv("OFFER_PARSER", "lxml").lower()
+
+# Blokowanie zbędnych zasobów w przeglądarce: "off", "standard" (obrazy, fonty,
+# media, analityka, kafelki map) lub "strict" (dodatkowo arkusze CSS)
+BLOCK_PROFILE = os.getenv("BLOCK_PROFILE", "standard").lower()
+# Wyrażenia regularne URL-i, które nigdy nie są blokowane (np. XHR z ofertami)
+BLOCK_ALLOW = [
+    p.strip() for p in os.getenv("BLOCK_ALLOW", r"offers,results,/api/").split(",") if p.strip()
+]
+
+# Gotowość strony w Selenium: "observer" (MutationObserver – czekamy aż lista ofert
+# przestanie się zmieniać przez READINESS_QUIET_MS) lub "sleep" (stare, stałe pauzy)
+READINESS_MODE = os.getenv("READINESS_MODE", "observer").lower()
+READINESS_QUIET_MS = int(os.getenv("READINESS_QUIET_MS", "300"))
+READINESS_TIMEOUT = float(os.getenv("READINESS_TIMEOUT", "10"))
+
+# Uprzejmość wobec serwisu: minimalny odstęp (s) między startami kolejnych produktów
+# w scrape_all oraz losowy dodatek do tego odstępu
+SCRAPE_MIN_INTERVAL = float(os.getenv("SCRAPE_MIN_INTERVAL", "1.0"))
+SCRAPE_INTERVAL_JITTER = float(os.getenv("SCRAPE_INTERVAL_JITTER", "1.0"))
+
+# Wspólny limit zapytań wszystkich procesów scrape_all (token bucket w SQLite):
+# zapytania/s, rozmiar "paczki", minimalne tempo po 429/503 oraz pauza (s)
+# po takiej odpowiedzi; SCRAPE_RATE=0 (domyślnie) wyłącza limit
+SCRAPE_RATE = float(os.getenv("SCRAPE_RATE", "0"))
+SCRAPE_BURST = int(os.getenv("SCRAPE_BURST", "3"))
+SCRAPE_MIN_RATE = float(os.getenv("SCRAPE_MIN_RATE", "0.05"))
+SCRAPE_THROTTLE_BACKOFF = float(os.getenv("SCRAPE_THROTTLE_BACKOFF", "60"))
+RATE_LIMIT_FILE = os.getenv("RATE_LIMIT_FILE", str(Path(DB_PATH).parent / "rate_limit.sqlite"))
+
+# Kolejka produktów w scrape_all: liczba prób na produkt i bazowe opóźnienie (s)
+# ponowienia, podwajane przy każdej kolejnej próbie
+SCRAPE_MAX_ATTEMPTS = int(os.getenv("SCRAPE_MAX_ATTEMPTS", "3"))
+SCRAPE_RETRY_BACKOFF = float(os.getenv("SCRAPE_RETRY_BACKOFF", "5"))
+
+# Recykling przeglądarki w scrape_all: restart tylko po przekroczeniu progu
+# pamięci (MB, cały proces z potomkami), wzrostu czasu ładowania (krotność
+# wartości bazowej), liczby kolejnych błędów lub twardego limitu stron (0 = brak)
+BROWSER_MAX_RSS_MB = float(os.getenv("BROWSER_MAX_RSS_MB", "1500"))
+BROWSER_LATENCY_FACTOR = float(os.getenv("BROWSER_LATENCY_FACTOR", "2.0"))
+BROWSER_MAX_ERRORS = int(os.getenv("BROWSER_MAX_ERRORS", "3"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "200"))
+
+# Odciski (hash) treści ofert: przy niezmienionej stronie pomijamy parsowanie
+# i zapytania deduplikujące; co FINGERPRINT_MAX_AGE_HOURS wymuszamy pełny przebieg
+PAGE_FINGERPRINTS = os.getenv("PAGE_FINGERPRINTS", "true").lower() in {"1", "true", "yes"}
+FINGERPRINT_MAX_AGE_HOURS = float(os.getenv("FINGERPRINT_MAX_AGE_HOURS", "24"))
+
+# Dziennik przebiegów (tabele scrape_runs/scrape_run_items): --resume kontynuuje
+# ostatni nieukończony przebieg rozpoczęty nie dawniej niż tyle godzin temu
+RUN_RESUME_WINDOW_HOURS = float(os.getenv("RUN_RESUME_WINDOW_HOURS", "24"))
+
+# Harmonogram adaptacyjny (opt-in): produkty o stabilnych cenach odwiedzamy rzadziej.
+# Interwał = (okno / (liczba zmian + 1)) * SCHEDULE_STABILITY, w granicach MIN–MAX
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() in {"1", "true", "yes"}
+SCHEDULE_MIN_HOURS = float(os.getenv("SCHEDULE_MIN_HOURS", "6"))
+SCHEDULE_MAX_HOURS = float(os.getenv("SCHEDULE_MAX_HOURS", "168"))
+SCHEDULE_STABILITY = float(os.getenv("SCHEDULE_STABILITY", "0.5"))
+SCHEDULE_WINDOW_DAYS = float(os.getenv("SCHEDULE_WINDOW_DAYS", "60"))
+
+# Regiony (województwa) scrapowane dla każdego produktu, np. "w-slaskim,w-malopolskim"
+# lub "all"; każdy region ma własny limit równoległych pobrań (0 = równy podział
+# SCRAPE_CONCURRENCY między regiony, zaokrąglony w górę)
+SCRAPE_REGIONS = [r.strip() for r in os.getenv("SCRAPE_REGIONS", "w-slaskim").split(",") if r.strip()]
+REGION_CONCURRENCY = int(os.getenv("REGION_CONCURRENCY", "0"))
+
+# Archiwum pobranych stron (append-only, segmenty zstd lub gzip z indeksem produkt/czas),
+# z którego `python -m scraper.cli.replay` ponownie parsuje oferty bez sieci; domyślnie wyłączone
+PAGE_ARCHIVE = os.getenv("PAGE_ARCHIVE", "false").lower() in {"1", "true", "yes"}
+PAGE_ARCHIVE_DIR = os.getenv("PAGE_ARCHIVE_DIR", str(Path(DB_PATH).parent / "page_archive"))
+# Kodek segmentów ("zstd" wymaga pakietu zstandard, w przeciwnym razie gzip)
+PAGE_ARCHIVE_CODEC = os.getenv("PAGE_ARCHIVE_CODEC", "zstd").lower()
+# Rozmiar segmentu (MB), po którym zaczynamy nowy plik
+PAGE_ARCHIVE_SEGMENT_MB = float(os.getenv("PAGE_ARCHIVE_SEGMENT_MB", "64"))
+# Segmenty starsze niż tyle dni są usuwane przy starcie przebiegu (0 = bez limitu)
+PAGE_ARCHIVE_MAX_AGE_DAYS = float(os.getenv("PAGE_ARCHIVE_MAX_AGE_DAYS", "30"))
+
+# Próbki niepoprawnych ofert: jedno archiwum zip na przebieg w DEBUG_CAPTURE_DIR.
+# Dla każdej pary (selektor, powód) zapisujemy pierwsze DEBUG_CAPTURE_FIRST próbek,
+# potem ułamek DEBUG_CAPTURE_RATE; liczniki błędów są zawsze pełne
+DEBUG_CAPTURE_DIR = os.getenv("DEBUG_CAPTURE_DIR", "logs")
+DEBUG_CAPTURE_RATE = float(os.getenv("DEBUG_CAPTURE_RATE", "0.05"))
+DEBUG_CAPTURE_FIRST = int(os.getenv("DEBUG_CAPTURE_FIRST", "3"))
+DEBUG_CAPTURE_QUEUE = int(os.getenv("DEBUG_CAPTURE_QUEUE", "1000"))
+
+# Potok pobieranie → parsowanie → zapis w scraper.cli.main: procesy parsujące
+# (0 = wątek), pojemność kolejek między etapami, rozmiar wsadu zapisu do bazy
+# i odstęp (s) logowania postępu
+PIPELINE_PARSE_WORKERS = int(os.getenv("PIPELINE_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "32"))
+PIPELINE_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", "200"))
+PIPELINE_LOG_INTERVAL = float(os.getenv("PIPELINE_LOG_INTERVAL", "10"))
+
+# Wykrywanie produktów: plik z zapamiętanym endpointem listy, walidatorami stron
+# (ETag/Last-Modified) i sumą kontrolną ostatniej listy; limit stron/kliknięć
+DISCOVERY_CACHE_FILE = os.getenv("DISCOVERY_CACHE_FILE", str(Path(DB_PATH).parent / "discovery_cache.json"))
+DISCOVERY_MAX_PAGES = int(os.getenv("DISCOVERY_MAX_PAGES", "100"))
+# Lista z endpointu krótsza niż ta część poprzedniej jest uznawana za uciętą
+# i zastępowana wykrywaniem w przeglądarce (produkty spoza listy są dezaktywowane)
+DISCOVERY_MIN_SHARE = float(os.getenv("DISCOVERY_MIN_SHARE", "0.9"))
+
+# Metryki Prometheus scrapera: port serwera /metrics (0 = wyłączony), plik w formacie
+# tekstowym (node_exporter textfile / Pushgateway), adres Pushgateway i nazwa joba;
+# METRICS_PER_PRODUCT=false łączy etykiety produktów w "all"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")
+METRICS_PUSHGATEWAY = os.getenv("METRICS_PUSHGATEWAY", "")
+METRICS_JOB = os.getenv("METRICS_JOB", "scraper")
+METRICS_PER_PRODUCT = os.getenv("METRICS_PER_PRODUCT", "true").lower() in {"1", "true", "yes"}
+
+# Śledzenie etapów (OpenTelemetry): "console" wypisuje zakończone spany na stderr,
+# "file" dopisuje je do TRACING_FILE; pusty = bez eksportu
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "").lower()
+TRACING_FILE = os.getenv("TRACING_FILE", str(Path(DB_PATH).parent / "traces.jsonl"))
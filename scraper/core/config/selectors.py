@@ -0,0 +1,7 @@
+"""CSS selectors used to locate pharmacy offers on product pages."""
+
+# Kolejność ma znaczenie – używany jest pierwszy selektor, który coś znajdzie
+PHARMACY_ITEMS_SELECTORS = [
+    "li.MuiListItem-root",
+    "ul li[class*='MuiListItem']",
+]
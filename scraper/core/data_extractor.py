@@ -8,6 +8,12 @@ duplicate inserts, this module now focuses solely on transforming a Selenium
 ``WebElement`` representing a pharmacy offer into a Python dictionary with the
 parsed data.  Responsibility for persisting data has moved to callers (e.g.
 ``scrape_product`` in ``main.py``).
+
+Extraction happens in two steps: the raw texts of an offer are collected from
+the page and then parsed in Python by :func:`parse_offer_data`.  Collecting
+element by element costs several WebDriver round-trips per paragraph, so
+:func:`collect_offers_data` gathers the raw texts of every offer on the page
+with a single ``execute_script`` call instead.
 """
 
 from __future__ import annotations
@@ -21,9 +27,220 @@ from selenium.webdriver.common.by import By
 
 from scraper.services.price_validator import parse_price_unit
 
+try:  # lxml is optional; only replay of archived Selenium pages needs it
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover - exercised only without lxml
+    lxml_html = None
+
 logger = logging.getLogger(__name__)
 
 
+OFFERS_DATA_SCRIPT = """
+var text = function (node) { return node ? (node.innerText || '').trim() : ''; };
+return Array.prototype.map.call(arguments[0], function (el) {
+    var link = el.querySelector("a[href*='/apteki/']");
+    if (!link) { return {error: 'missing pharmacy link'}; }
+    var block = el.querySelector("div[class*='offers']");
+    if (!block) { return {error: 'missing offers block'}; }
+    var paragraphs = el.querySelectorAll('p');
+    return {
+        name: text(link),
+        href: link.href,
+        address: paragraphs.length >= 2 ? text(paragraphs[1]) : '',
+        lines: Array.prototype.map.call(block.querySelectorAll('p'), function (p) {
+            var price = Array.prototype.find.call(p.querySelectorAll('span'), function (s) {
+                return (s.getAttribute('class') || '').indexOf('priceExp') !== -1;
+            });
+            return {text: text(p), price: price ? text(price) : null};
+        })
+    };
+});
+"""
+
+# XPath odpowiedniki PHARMACY_ITEMS_SELECTORS i selektorów OFFERS_DATA_SCRIPT
+_ITEMS_XPATHS = (
+    "//li[contains(concat(' ', normalize-space(@class), ' '), ' MuiListItem-root ')]",
+    "//ul//li[contains(@class, 'MuiListItem')]",
+)
+
+
+def collect_offers_data(driver: Any, elements: List[Any]) -> List[Dict[str, Any]]:
+    """Return raw offer data for all ``elements`` using one script call.
+
+    Each item has ``name``, ``href``, ``address`` and ``lines`` (one
+    ``{"text", "price"}`` dict per paragraph of the offers block), or an
+    ``error`` key when the element lacks the expected structure.
+    """
+    if not elements:
+        return []
+    return driver.execute_script(OFFERS_DATA_SCRIPT, elements) or []
+
+
+def _node_text(node: Any) -> str:
+    return " ".join(node.text_content().split()) if node is not None else ""
+
+
+def collect_offers_from_html(page: str, base_url: str = "") -> List[Dict[str, Any]]:
+    """Return the raw data of :func:`collect_offers_data` from saved page HTML.
+
+    Used to replay ``driver.page_source`` archived by the Selenium scraper
+    without a browser; the lookups mirror :data:`OFFERS_DATA_SCRIPT`.
+    """
+    if lxml_html is None:
+        raise RuntimeError("lxml is required to parse archived Selenium pages")
+    root = lxml_html.document_fromstring(page)
+    items: List[Any] = []
+    for xpath in _ITEMS_XPATHS:
+        items = root.xpath(xpath)
+        if items:
+            break
+    raw_offers = []
+    for item in items:
+        link = next(iter(item.xpath(".//a[contains(@href, '/apteki/')]")), None)
+        if link is None:
+            raw_offers.append({"error": "missing pharmacy link"})
+            continue
+        block = next(iter(item.xpath(".//div[contains(@class, 'offers')]")), None)
+        if block is None:
+            raw_offers.append({"error": "missing offers block"})
+            continue
+        paragraphs = item.xpath(".//p")
+        lines = []
+        for p in block.xpath(".//p"):
+            price = next(iter(p.xpath(".//span[contains(@class, 'priceExp')]")), None)
+            lines.append({"text": _node_text(p), "price": _node_text(price) if price is not None else None})
+        raw_offers.append(
+            {
+                "name": _node_text(link),
+                "href": urllib.parse.urljoin(base_url, link.get("href") or ""),
+                "address": _node_text(paragraphs[1]) if len(paragraphs) >= 2 else "",
+                "lines": lines,
+            }
+        )
+    return raw_offers
+
+
+def parse_selenium_page(page: str, product_id: Any, base_url: str = "") -> List[Dict[str, Any]]:
+    """Parse every offer of an archived Selenium page; invalid offers are skipped."""
+    entries = []
+    for raw in collect_offers_from_html(page, base_url):
+        try:
+            data = parse_offer_data(raw, product_id)
+        except ValueError as e:
+            logger.debug(f"✖️ Oferta pominięta przy odtwarzaniu: {e}")
+            continue
+        if data:
+            entries.append(data)
+    return entries
+
+
+def _collect_element_data(element: Any) -> Dict[str, Any]:
+    """Collect the raw data of one offer by walking its WebElements."""
+    name_el = element.find_element(By.CSS_SELECTOR, "a[href*='/apteki/']")
+    address_els = element.find_elements(By.CSS_SELECTOR, "p")
+    offers_block = element.find_element(By.CSS_SELECTOR, "div[class*='offers']")
+
+    lines = []
+    for p in offers_block.find_elements(By.TAG_NAME, "p"):
+        spans = p.find_elements(By.TAG_NAME, "span")
+        price = next(
+            (s.text.strip() for s in spans if "priceExp" in s.get_attribute("class")),
+            None,
+        )
+        lines.append({"text": p.text.strip(), "price": price})
+
+    return {
+        "name": name_el.text.strip(),
+        "href": name_el.get_attribute("href"),
+        "address": address_els[1].text.strip() if len(address_els) >= 2 else "",
+        "lines": lines,
+    }
+
+
+def parse_offer_data(raw: Dict[str, Any], product_id: Any) -> Optional[Dict[str, Any]]:
+    """Turn raw offer data into the offer dictionary.
+
+    ``raw`` comes from :func:`collect_offers_data` or the element-walking
+    collector.  Raises ``ValueError`` when the offer lacked its pharmacy link
+    or offers block.
+    """
+    if raw.get("error"):
+        raise ValueError(raw["error"])
+
+    address = raw.get("address") or ""
+    if "km" in address.lower():
+        address = ""
+
+    map_url = (
+        f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(address)}"
+        if address
+        else ""
+    )
+
+    offers: List[Dict[str, Any]] = []
+    availability: Optional[str] = None
+    updated: Optional[str] = None
+    expiration_hint: Optional[str] = None
+    last_expiration = ""
+
+    for line in raw.get("lines", []):
+        raw_text = line.get("text") or ""
+        text = raw_text.lower()
+        price_text = line.get("price")
+
+        if "sztuk" in text or "ostatnia" in text or "niepełne" in text:
+            availability = raw_text
+            continue
+        elif "temu" in text:
+            updated = raw_text
+            continue
+        elif "ważność" in text:
+            expiration_hint = "short"
+            continue
+
+        if "➔" in text:
+            match = re.search(r"(\d{4}-\d{2}-\d{2})", text)
+            if match:
+                last_expiration = match.group(1)
+
+            if price_text:
+                try:
+                    price, unit = parse_price_unit(price_text)
+                    offers.append({"expiration": last_expiration, "price": price, "unit": unit})
+                    last_expiration = ""
+                except Exception as e:  # pragma: no cover - defensive log
+                    logger.error(f"⚠️ Błąd ceny ➔+priceExp: {price_text} → {e}")
+            continue
+
+        if price_text:
+            expiration = last_expiration or ""
+            if expiration_hint == "short":
+                expiration = "krótki termin"
+
+            try:
+                price, unit = parse_price_unit(price_text)
+                offers.append({"expiration": expiration, "price": price, "unit": unit})
+                last_expiration = ""
+            except Exception as e:  # pragma: no cover - defensive log
+                logger.debug(f"⚠️ Błąd konwersji ceny fallback: {price_text} → {e}")
+            continue
+
+    if not offers:
+        logger.debug("✖️ Oferta pominięta — brak poprawnych cen.")
+        return None
+
+    return {
+        "product_id": product_id,
+        "name": raw.get("name", ""),
+        "href": raw.get("href"),
+        "address": address,
+        "map_url": map_url,
+        "availability": availability,
+        "updated": updated,
+        "offers": offers,
+    }
+
+
 def extract_pharmacy_data(element: Any, product_id: Any) -> Optional[Dict[str, Any]]:
     """Parse a single pharmacy offer ``element``.
 
@@ -43,99 +260,7 @@ def extract_pharmacy_data(element: Any, product_id: Any) -> Optional[Dict[str, A
     """
 
     try:
-        name_el = element.find_element(By.CSS_SELECTOR, "a[href*='/apteki/']")
-        name = name_el.text.strip()
-        href = name_el.get_attribute("href")
-
-        address = ""
-        address_els = element.find_elements(By.CSS_SELECTOR, "p")
-        if len(address_els) >= 2:
-            addr_text = address_els[1].text.strip()
-            if "km" not in addr_text.lower():
-                address = addr_text
-
-        map_url = (
-            f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(address)}"
-            if address
-            else ""
-        )
-
-        offers_block = element.find_element(By.CSS_SELECTOR, "div[class*='offers']")
-        p_elements = offers_block.find_elements(By.TAG_NAME, "p")
-
-        offers: List[Dict[str, Any]] = []
-        availability: Optional[str] = None
-        updated: Optional[str] = None
-        expiration_hint: Optional[str] = None
-        last_expiration = ""
-
-        for p in p_elements:
-            text = p.text.strip().lower()
-            spans = p.find_elements(By.TAG_NAME, "span")
-
-            if "sztuk" in text or "ostatnia" in text or "niepełne" in text:
-                availability = p.text.strip()
-                continue
-            elif "temu" in text:
-                updated = p.text.strip()
-                continue
-            elif "ważność" in text:
-                expiration_hint = "short"
-                continue
-
-            if "➔" in text:
-                match = re.search(r"(\d{4}-\d{2}-\d{2})", text)
-                if match:
-                    last_expiration = match.group(1)
-
-                price_text = next(
-                    (s.text.strip() for s in spans if "priceExp" in s.get_attribute("class")),
-                    None,
-                )
-
-                if price_text:
-                    try:
-                        price, unit = parse_price_unit(price_text)
-                        offers.append({"expiration": last_expiration, "price": price, "unit": unit})
-                        last_expiration = ""
-                    except Exception as e:  # pragma: no cover - defensive log
-                        logger.error(f"⚠️ Błąd ceny ➔+priceExp: {price_text} → {e}")
-                continue
-
-            price_text = next(
-                (s.text.strip() for s in spans if "priceExp" in s.get_attribute("class")),
-                None,
-            )
-
-            if price_text:
-                expiration = last_expiration or ""
-                if expiration_hint == "short":
-                    expiration = "krótki termin"
-
-                try:
-                    price, unit = parse_price_unit(price_text)
-                    offers.append({"expiration": expiration, "price": price, "unit": unit})
-                    last_expiration = ""
-                except Exception as e:  # pragma: no cover - defensive log
-                    logger.debug(f"⚠️ Błąd konwersji ceny fallback: {price_text} → {e}")
-                continue
-
-        if not offers:
-            logger.debug("✖️ Oferta pominięta — brak poprawnych cen.")
-            return None
-
-        return {
-            "product_id": product_id,
-            "name": name,
-            "href": href,
-            "address": address,
-            "map_url": map_url,
-            "availability": availability,
-            "updated": updated,
-            "offers": offers,
-        }
-
+        return parse_offer_data(_collect_element_data(element), product_id)
     except Exception as e:  # pragma: no cover - defensive log
         logger.error(f"❌ Błąd ekstrakcji – {e}")
         raise
-
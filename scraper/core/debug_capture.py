@@ -0,0 +1,190 @@
+"""Background sink for snippets of offers that failed to parse.
+
+:func:`scraper.core.main.scrape_product` used to write one HTML file per bad
+offer into a fresh timestamped directory, synchronously and with an extra
+WebDriver round-trip for ``outerHTML``.  After a layout change that meant
+thousands of tiny files and a slower scrape loop.
+
+:class:`DebugCapture` instead counts every failure by ``(selector, reason)``
+and keeps only a sample of snippets: the first ``first`` of each key and then
+a ``rate`` fraction.  The snippet is produced by a callable that is only
+invoked for sampled failures, so skipped ones cost no round-trip.  Sampled
+snippets are queued to a writer thread that appends them to a single
+``debug_<timestamp>_<pid>.zip`` per run; :meth:`DebugCapture.close` adds a
+``summary.json`` with the failure counts.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import zipfile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from scraper.core.config.config import (
+    DEBUG_CAPTURE_DIR,
+    DEBUG_CAPTURE_FIRST,
+    DEBUG_CAPTURE_QUEUE,
+    DEBUG_CAPTURE_RATE,
+)
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class DebugCapture:
+    """Sampled, batched and compressed capture of failing offer snippets.
+
+    Parameters
+    ----------
+    directory:
+        Where the run archive is created (lazily, on the first snippet).
+    rate:
+        Fraction of failures captured once ``first`` were kept for a key.
+    first:
+        Snippets always kept per ``(selector, reason)``.
+    max_queue:
+        Pending snippets; when the writer falls behind new ones are dropped
+        (and counted) rather than blocking the scrape.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = DEBUG_CAPTURE_DIR,
+        rate: float = DEBUG_CAPTURE_RATE,
+        first: int = DEBUG_CAPTURE_FIRST,
+        max_queue: int = DEBUG_CAPTURE_QUEUE,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.rate = rate
+        self.first = first
+        self.failures: Counter = Counter()
+        self.captured = 0
+        self.dropped = 0
+        self.path: Optional[Path] = None
+        self._rng = rng or random.Random()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_queue))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._closed = False
+
+    def _sampled(self, key: tuple) -> bool:
+        count = self.failures[key]
+        return count <= self.first or self._rng.random() < self.rate
+
+    def record(
+        self,
+        product_id: Any,
+        index: int,
+        reason: str,
+        selector: str,
+        snippet: Callable[[], Any],
+    ) -> bool:
+        """Count one failure and queue its snippet if sampled.
+
+        ``snippet`` returns the HTML (or JSON-serialisable raw data) of the
+        offer; it is called only for sampled failures.  Returns whether the
+        snippet was queued.
+        """
+        key = (selector, reason)
+        with self._lock:
+            if self._closed:
+                return False
+            self.failures[key] += 1
+            seq = self.failures[key]
+            if not self._sampled(key):
+                return False
+        try:
+            content = snippet()
+        except Exception as exc:  # np. element odłączony od DOM
+            content = f"<!-- snippet unavailable: {exc} -->"
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False, indent=2, default=str)
+        name = f"{product_id}/oferta_{index}_{reason}_{seq}.html"
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((name, content))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            self.path = self.directory / f"debug_{stamp}_{os.getpid()}.zip"
+            self._zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_DEFLATED)
+            self._thread = threading.Thread(target=self._write_loop, name="debug-capture", daemon=True)
+            self._thread.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            name, content = item
+            try:
+                self._zip.writestr(name, content)
+                self.captured += 1
+            except Exception as exc:  # pragma: no cover - disk errors
+                logger.debug("Debug capture write failed for %s: %s", name, exc)
+
+    def summary(self) -> dict:
+        return {
+            "failures": [
+                {"selector": selector, "reason": reason, "count": count}
+                for (selector, reason), count in self.failures.most_common()
+            ],
+            "captured": self.captured,
+            "dropped": self.dropped,
+        }
+
+    def close(self) -> None:
+        """Flush queued snippets, write ``summary.json`` and log the counts."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+            self._zip.writestr("summary.json", json.dumps(self.summary(), ensure_ascii=False, indent=2))
+            self._zip.close()
+        if self.failures:
+            counts = ", ".join(f"{selector} [{reason}]={count}" for (selector, reason), count in self.failures.most_common())
+            logger.warning(
+                "🐞 Niepoprawne oferty: %s; zapisano %d próbek do %s",
+                counts,
+                self.captured,
+                self.path or "-",
+            )
+
+
+_capture: Optional[DebugCapture] = None
+_capture_lock = threading.Lock()
+
+
+def get_debug_capture() -> DebugCapture:
+    """Return the capture of this process, closed automatically at exit."""
+    global _capture
+    with _capture_lock:
+        if _capture is None or _capture._closed:
+            _capture = DebugCapture()
+            atexit.register(_capture.close)
+        return _capture
@@ -13,10 +13,21 @@ from selenium.webdriver.support import expected_conditions as EC
 
 from scraper.utils.retry import retry_on_timeout
 from scraper.core.browser import setup_browser
-from scraper.core.data_extractor import extract_pharmacy_data
+from scraper.core.data_extractor import (
+    collect_offers_data,
+    extract_pharmacy_data,
+    parse_offer_data,
+)
+from scraper.core.config.config import EXTRACTION_MODE, READINESS_MODE
 from scraper.core.config.urls import URLS, extract_product_id
 from scraper.core.config.selectors import PHARMACY_ITEMS_SELECTORS
+from scraper.core.debug_capture import get_debug_capture
+from scraper.core.proxy_pool import ProxyFailure, page_failure
+from scraper.core.readiness import wait_for_offers_stable
+from scraper.products.urls import region_from_url
+from scraper.services.fingerprints import fingerprint_key
 from scraper.services.db import insert_prices
+from scraper.services.metrics import count_timeout, observe_page
 from scraper.core.bootstrap import init_logging
 
 logger = logging.getLogger(__name__)
@@ -34,19 +45,57 @@ def get_output_paths(product_id):
 def filter_urls_by_product(urls, product_id):
     return [url for url in urls if extract_product_id(url) == product_id]
 
-def scrape_product(driver, url, product_id):
+
+class OffersTimeout(TimeoutException):
+    """The offers list never appeared; the page should be fetched again."""
+
+
+def scrape_product(driver, url, product_id, fingerprints=None, archive=None, capture=None):
+    """Scrape offers of one product page and store them.
+
+    With a ``fingerprints`` store the raw script payload is hashed first; an
+    unchanged page is neither parsed nor written (the caller persists the
+    store with ``fingerprints.save()``); a page without offers or with a
+    failed insert is not fingerprinted.  Offers are tagged with the region
+    taken from ``url``.  The rendered page is stored in ``archive`` for
+    offline replay.  Offers that fail to parse are counted and sampled by
+    ``capture`` (the process-wide :class:`DebugCapture` by default).  Fetch,
+    parse and write times are recorded in :mod:`scraper.services.metrics`.
+
+    Raises :class:`~scraper.core.proxy_pool.ProxyFailure` straight after
+    loading when the browser shows a network-error or block page, and
+    :class:`OffersTimeout` when the offers list never appears, so callers
+    retry the page instead of treating it as scraped.
+    """
+    region = region_from_url(url)
+    key = fingerprint_key(product_id, region)
     logger.info(f"🔍 Scraping: Produkt_{product_id} ({product_id})")
     logger.info(f"🌐 Ładuję stronę: {url}")
+    started = time.perf_counter()
     driver.get(url)
 
+    # Martwe proxy lub blokada: kończymy od razu zamiast czekać na WebDriverWait
+    failure = page_failure(driver)
+    if failure:
+        logger.warning(f"🚫 Strona niedostępna ({failure}): {url}")
+        raise ProxyFailure(failure, url)
+
     if "#stacjonarne" in url:
         driver.execute_script("location.href = '#stacjonarne';")
-        time.sleep(1.5)
+        if READINESS_MODE == "sleep":
+            time.sleep(1.5)
 
     # Scroll to the bottom to trigger lazy-loaded content and ensure
     # all offers are rendered before we start searching for them.
     driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
-    time.sleep(0.5)
+    if READINESS_MODE == "sleep":
+        time.sleep(0.5)
+    else:
+        # Czekamy, aż lista ofert istnieje i DOM przestał się zmieniać
+        try:
+            wait_for_offers_stable(driver, ", ".join(PHARMACY_ITEMS_SELECTORS))
+        except TimeoutException as e:
+            logger.debug(f"Lista ofert niestabilna, przechodzę do WebDriverWait: {e}")
 
     try:
         retry_on_timeout(
@@ -54,14 +103,21 @@ def scrape_product(driver, url, product_id):
                 EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li.MuiListItem-root"))
             )
         )
-    except TimeoutException:
+    except TimeoutException as e:
         logger.warning("❌ Timeout – nie znaleziono ofert aptek.")
-        return []
+        count_timeout("selenium", product_id)
+        raise OffersTimeout(f"brak listy ofert: {url}") from e
+    fetched = time.perf_counter()
+
+    if archive is not None:
+        # osobny rodzaj: replay parsuje znaczniki MUI jak data_extractor
+        archive.append(product_id, url, driver.page_source, kind="selenium", region=region)
 
     pharmacy_elements = []
-    for selector in PHARMACY_ITEMS_SELECTORS:
+    items_selector = ""
+    for items_selector in PHARMACY_ITEMS_SELECTORS:
         try:
-            pharmacy_elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            pharmacy_elements = driver.find_elements(By.CSS_SELECTOR, items_selector)
             if pharmacy_elements:
                 break
         except Exception:
@@ -71,31 +127,73 @@ def scrape_product(driver, url, product_id):
         f"🔎 Znaleziono {len(pharmacy_elements)} ofert." if pharmacy_elements else "⚠️ Nie znaleziono ofert."
     )
     offers = []
-    _, debug_dir = get_output_paths(product_id)
+    capture = capture or get_debug_capture()
+
+    raw_offers = None
+    db_write = 0.0
+    insert_failed = False
+    if EXTRACTION_MODE == "script" and pharmacy_elements:
+        try:
+            raw_offers = collect_offers_data(driver, pharmacy_elements)
+        except Exception as e:
+            logger.warning(f"⚠️ Ekstrakcja skryptem nieudana, odczyt element po elemencie: {e}")
+
+    if fingerprints is not None and raw_offers is not None and fingerprints.check(key, raw_offers):
+        logger.info("🧬 Oferty bez zmian od ostatniego przebiegu – pomijam zapis.")
+        observe_page("selenium", product_id, fetch=fetched - started)
+        return []
+
+    def snippet(i, el):
+        # surowe dane ze skryptu nie wymagają kolejnego zapytania do WebDrivera
+        if raw_offers is not None:
+            return lambda: raw_offers[i]
+        return lambda: el.get_attribute("outerHTML")
 
     for i, el in enumerate(pharmacy_elements):
         try:
-            # Some elements load asynchronously; scrolling them into view
-            # avoids stale or detached element errors during extraction.
-            el.location_once_scrolled_into_view()
-            data = extract_pharmacy_data(el, product_id=product_id)
+            if raw_offers is not None:
+                data = parse_offer_data(raw_offers[i], product_id)
+            else:
+                # Some elements load asynchronously; scrolling them into view
+                # avoids stale or detached element errors during extraction.
+                el.location_once_scrolled_into_view
+                data = extract_pharmacy_data(el, product_id=product_id)
+            if data:
+                data["region"] = region
             if not data:
                 logger.warning(f"✖ Oferta {i+1}: pominięta — niepoprawne dane.")
-                with open(debug_dir / f"oferta_{i+1}_invalid.html", "w", encoding="utf-8") as f:
-                    f.write(el.get_attribute("outerHTML"))
+                capture.record(product_id, i + 1, "invalid", items_selector, snippet(i, el))
                 continue
 
             offers.append(data)
-            insert_prices(data)
+            write_started = time.perf_counter()
+            try:
+                insert_prices(data)
+            except Exception as e:
+                insert_failed = True
+                logger.error(f"❌ Oferta {i+1}: zapis do bazy nieudany: {e}")
+                continue
+            finally:
+                db_write += time.perf_counter() - write_started
             cheapest_offer = min(data["offers"], key=lambda x: x["price"])
             logger.info(
                 f"✅ Oferta {i+1}: {data['name']} – {cheapest_offer['price']} zł / {cheapest_offer['unit']}"
             )
         except Exception as e:
             logger.error(f"❌ Błąd podczas przetwarzania oferty {i+1}: {e}")
-            with open(debug_dir / f"oferta_{i+1}_exception.html", "w", encoding="utf-8") as f:
-                f.write(el.get_attribute("outerHTML"))
+            capture.record(product_id, i + 1, "exception", items_selector, snippet(i, el))
 
+    if fingerprints is not None and (not offers or insert_failed):
+        # niezapisane oferty muszą zostać pobrane ponownie w kolejnym runie
+        fingerprints.discard(key)
+    observe_page(
+        "selenium",
+        product_id,
+        fetch=fetched - started,
+        parse=time.perf_counter() - fetched - db_write,
+        db_write=db_write,
+        offers=sum(len(data["offers"]) for data in offers),
+    )
     return offers
 
 def main(product_id, headless=False):
@@ -113,7 +211,10 @@ def main(product_id, headless=False):
     all_offers = []
     try:
         for url in filtered_urls:
-            offers = scrape_product(driver, url, product_id)
+            try:
+                offers = scrape_product(driver, url, product_id)
+            except OffersTimeout:
+                continue
             all_offers.extend(offers)
     finally:
         driver.quit()
@@ -0,0 +1,213 @@
+"""Health-scored proxy selection with quarantine and persisted state.
+
+:class:`ProxyPool` keeps per-proxy statistics – successes, failures, ban
+signals and an exponentially weighted page latency – and picks proxies at
+random with weights derived from them, so healthy, fast proxies are used
+most.  A proxy that is banned or fails ``max_failures`` times in a row is
+quarantined for ``cooldown`` seconds, doubled on every repeated quarantine
+up to ``max_cooldown``.  Statistics are saved to a small JSON file so the
+next run starts with what the previous one learned.
+
+:func:`page_failure` recognises browser network-error pages and block pages
+right after ``driver.get`` so a dead proxy fails in one round-trip instead of
+a full ``WebDriverWait`` timeout; "too many requests"/503 pages are reported
+as ``"throttled"`` so callers can slow down instead of blaming the proxy.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from selenium.common.exceptions import WebDriverException
+
+from scraper.core.config.config import (
+    PROXIES,
+    PROXY_COOLDOWN,
+    PROXY_MAX_COOLDOWN,
+    PROXY_MAX_FAILURES,
+    PROXY_STATE_FILE,
+)
+
+logger = logging.getLogger(__name__)
+
+# Czas ładowania strony (s), przy którym waga proxy spada o połowę
+LATENCY_REFERENCE = 5.0
+LATENCY_ALPHA = 0.3
+
+_NETWORK_ERROR_URLS = ("chrome-error://", "about:neterror")
+_BAN_MARKERS = ("captcha", "access denied", "403 forbidden", "cloudflare")
+# 429/503 – serwis prosi o zwolnienie, to nie jest blokada konkretnego proxy
+_THROTTLE_MARKERS = ("too many requests", "service unavailable", "error 429", "error 503")
+
+PAGE_STATE_SCRIPT = "return [location.href, document.title];"
+
+
+class ProxyFailure(WebDriverException):
+    """The page could not be loaded through the current proxy."""
+
+    def __init__(self, reason: str, url: str = "") -> None:
+        super().__init__(f"{reason}: {url}")
+        self.reason = reason
+
+
+def page_failure(driver: Any) -> Optional[str]:
+    """Return ``"network"``, ``"throttled"`` or ``"ban"`` for error pages."""
+    try:
+        href, title = driver.execute_script(PAGE_STATE_SCRIPT)
+    except Exception:
+        return None
+    if str(href).startswith(_NETWORK_ERROR_URLS):
+        return "network"
+    title = str(title or "").lower()
+    if any(marker in title for marker in _THROTTLE_MARKERS):
+        return "throttled"
+    if any(marker in title for marker in _BAN_MARKERS):
+        return "ban"
+    return None
+
+
+@dataclass
+class ProxyStats:
+    successes: int = 0
+    failures: int = 0
+    bans: int = 0
+    latency: Optional[float] = None
+    consecutive_failures: int = 0
+    cooldown_level: int = 0
+    quarantined_until: float = 0.0
+
+    @property
+    def score(self) -> float:
+        """Selection weight: smoothed success rate discounted by latency."""
+        success_rate = (self.successes + 1) / (self.successes + self.failures + self.bans + 2)
+        if self.latency is None:
+            return success_rate
+        return success_rate / (1 + self.latency / LATENCY_REFERENCE)
+
+
+class ProxyPool:
+    """Weighted proxy choice backed by :class:`ProxyStats`.
+
+    Parameters
+    ----------
+    proxies:
+        Configured proxy URLs; state of proxies no longer configured is
+        dropped.
+    state_file:
+        JSON file the statistics are loaded from and saved to (``None``
+        keeps them in memory only).
+    max_failures:
+        Consecutive failures that put a proxy in quarantine.
+    cooldown, max_cooldown:
+        First and maximum quarantine length in seconds.
+    """
+
+    def __init__(
+        self,
+        proxies: Iterable[str] = PROXIES,
+        state_file: Optional[str] = PROXY_STATE_FILE,
+        max_failures: int = PROXY_MAX_FAILURES,
+        cooldown: float = PROXY_COOLDOWN,
+        max_cooldown: float = PROXY_MAX_COOLDOWN,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.state_file = Path(state_file) if state_file else None
+        self.max_failures = max(1, max_failures)
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self.stats: Dict[str, ProxyStats] = {proxy: ProxyStats() for proxy in proxies}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.state_file or not self.state_file.exists():
+            return
+        try:
+            saved = json.loads(self.state_file.read_text(encoding="utf-8"))
+            for proxy, values in saved.items():
+                if proxy in self.stats:
+                    self.stats[proxy] = ProxyStats(**values)
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning("Ignoring unreadable proxy state %s: %s", self.state_file, exc)
+
+    def save(self) -> None:
+        if not self.state_file or not self.stats:
+            return
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_file.with_suffix(".tmp")
+        data = {proxy: asdict(stats) for proxy, stats in self.stats.items()}
+        tmp_path.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self.state_file)
+
+    def available(self) -> Dict[str, ProxyStats]:
+        now = self._clock()
+        return {p: s for p, s in self.stats.items() if s.quarantined_until <= now}
+
+    def choose(self) -> Optional[str]:
+        """Pick a proxy weighted by score; ``None`` when none is configured.
+
+        When every proxy is quarantined the one released soonest is used
+        rather than scraping without a proxy.
+        """
+        if not self.stats:
+            return None
+        candidates = self.available()
+        if not candidates:
+            proxy = min(self.stats, key=lambda p: self.stats[p].quarantined_until)
+            logger.warning("⚠️ Wszystkie proxy w kwarantannie – używam %s", proxy)
+            return proxy
+        proxies = list(candidates)
+        weights = [candidates[p].score for p in proxies]
+        proxy = self._rng.choices(proxies, weights=weights)[0]
+        logger.info(f"Using proxy: {proxy}")
+        return proxy
+
+    def report(self, proxy: Optional[str], ok: bool, latency: Optional[float] = None, banned: bool = False) -> bool:
+        """Record one page load through ``proxy``; return ``True`` if it got quarantined."""
+        stats = self.stats.get(proxy) if proxy else None
+        if stats is None:
+            return False
+        if ok:
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.cooldown_level = 0
+            if latency is not None:
+                stats.latency = latency if stats.latency is None else (
+                    LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * stats.latency
+                )
+            return False
+        if banned:
+            stats.bans += 1
+        else:
+            stats.failures += 1
+        stats.consecutive_failures += 1
+        if banned or stats.consecutive_failures >= self.max_failures:
+            self._quarantine(proxy, stats, "ban" if banned else "failures")
+            return True
+        return False
+
+    def _quarantine(self, proxy: str, stats: ProxyStats, reason: str) -> None:
+        duration = min(self.max_cooldown, self.cooldown * 2 ** stats.cooldown_level)
+        stats.cooldown_level += 1
+        stats.consecutive_failures = 0
+        stats.quarantined_until = self._clock() + duration
+        logger.warning("🚫 Proxy %s w kwarantannie na %.0f s (%s)", proxy, duration, reason)
+
+
+_pool: Optional[ProxyPool] = None
+
+
+def get_proxy_pool() -> ProxyPool:
+    """Return the proxy pool of this process."""
+    global _pool
+    if _pool is None:
+        _pool = ProxyPool()
+    return _pool
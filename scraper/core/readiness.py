@@ -0,0 +1,77 @@
+"""Event-driven page readiness checks for Selenium.
+
+Instead of sleeping a fixed amount of time after navigation, hash changes or
+scrolling, :func:`wait_for_offers_stable` injects a ``MutationObserver`` that
+resolves as soon as the offers list exists and the DOM has been quiet for
+``quiet_ms`` milliseconds.  A fast page is therefore ready after a few hundred
+milliseconds, while a slow one still gets up to ``timeout`` seconds.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from scraper.core.config.config import READINESS_QUIET_MS, READINESS_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+# arguments[0]: selektor ofert, arguments[1]: cisza w ms, arguments[2]: limit w ms
+OFFERS_STABLE_SCRIPT = """
+const [selector, quietMs, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+let quietTimer = null;
+let deadline = null;
+let observer = null;
+
+function finish(ready) {
+  clearTimeout(quietTimer);
+  clearTimeout(deadline);
+  if (observer) observer.disconnect();
+  done({
+    ready: ready,
+    items: document.querySelectorAll(selector).length,
+    elapsed: Math.round(performance.now() - started),
+  });
+}
+
+function armQuietTimer() {
+  clearTimeout(quietTimer);
+  quietTimer = setTimeout(() => {
+    if (document.querySelector(selector)) finish(true);
+  }, quietMs);
+}
+
+observer = new MutationObserver(armQuietTimer);
+observer.observe(document.documentElement, { childList: true, subtree: true, characterData: true });
+deadline = setTimeout(() => finish(false), timeoutMs);
+armQuietTimer();
+"""
+
+
+def wait_for_offers_stable(
+    driver: Any,
+    selector: str,
+    quiet_ms: int = READINESS_QUIET_MS,
+    timeout: float = READINESS_TIMEOUT,
+) -> Dict[str, Any]:
+    """Block until ``selector`` matches and the DOM stops changing.
+
+    Returns the script result (``ready``, ``items`` and ``elapsed`` in ms).
+    Raises :class:`TimeoutException` when the offers list is not stable
+    within ``timeout`` seconds.
+    """
+    driver.set_script_timeout(timeout + 5)
+    try:
+        result = driver.execute_async_script(OFFERS_STABLE_SCRIPT, selector, quiet_ms, int(timeout * 1000))
+    except TimeoutException:
+        raise
+    except WebDriverException as exc:
+        raise TimeoutException(f"Readiness script failed: {exc.msg}") from exc
+    if not result or not result.get("ready"):
+        raise TimeoutException(f"Offers list not stable after {timeout}s")
+    logger.debug("Offers list stable after %s ms (%s items)", result.get("elapsed"), result.get("items"))
+    return result
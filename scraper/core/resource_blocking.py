@@ -0,0 +1,268 @@
+"""Request-blocking profiles shared by the Selenium and Playwright browsers.
+
+Product pages pull in images, fonts, media, analytics beacons and map tiles
+that the scraper never reads.  A :class:`BlockingProfile` describes what to
+drop; it is applied with ``context.route`` for Playwright contexts and with
+the CDP ``Network.setBlockedURLs`` command for Chrome.  Firefox driven by
+Selenium has no request interception, so only its image/font preferences are
+switched off.
+
+Allow-list rules always win over block rules, which keeps the offers XHR
+(and anything else matching ``BLOCK_ALLOW``) loading even under the strict
+profile.
+
+Blocked requests never reach the network, so their size is unknown;
+:class:`BlockStats` estimates the bytes saved from typical sizes per resource
+type.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import logging
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from scraper.core.config.config import BLOCK_ALLOW, BLOCK_PROFILE
+
+logger = logging.getLogger(__name__)
+
+# Typowe rozmiary zasobów (w bajtach) używane do szacowania oszczędności
+ESTIMATED_BYTES: Dict[str, int] = {
+    "image": 35_000,
+    "font": 40_000,
+    "media": 300_000,
+    "stylesheet": 25_000,
+    "script": 30_000,
+    "other": 10_000,
+}
+
+# Rozszerzenia plików odpowiadające typom zasobów (dla CDP, które nie zna typów)
+_EXTENSIONS: Dict[str, Tuple[str, ...]] = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mp3", "ogg", "m3u8"),
+    "stylesheet": ("css",),
+}
+
+_EXTENSION_TYPES: Dict[str, str] = {
+    ext: resource_type for resource_type, exts in _EXTENSIONS.items() for ext in exts
+}
+
+ANALYTICS_PATTERNS: Tuple[str, ...] = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+)
+
+MAP_TILE_PATTERNS: Tuple[str, ...] = (
+    "*maps.googleapis.com*",
+    "*maps.gstatic.com*",
+    "*tile.openstreetmap.org*",
+    "*api.mapbox.com*",
+)
+
+
+def _resource_type_from_url(url: str) -> str:
+    path = url.split("?", 1)[0].split("#", 1)[0]
+    ext = path.rsplit(".", 1)[-1].lower() if "." in path.rsplit("/", 1)[-1] else ""
+    return _EXTENSION_TYPES.get(ext, "other")
+
+
+class BlockingProfile:
+    """Set of block and allow rules applied to browser requests.
+
+    Parameters
+    ----------
+    name:
+        Profile name used in logs.
+    resource_types:
+        Playwright resource types to drop (``image``, ``font``, ...).
+    url_patterns:
+        ``fnmatch``-style URL globs to drop regardless of resource type.
+    allow:
+        Regular expressions; a URL matching any of them is never blocked.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        resource_types: Iterable[str] = (),
+        url_patterns: Iterable[str] = (),
+        allow: Iterable[str] = (),
+    ) -> None:
+        self.name = name
+        self.resource_types = frozenset(resource_types)
+        self.url_patterns = tuple(url_patterns)
+        self.allow: Tuple[Pattern[str], ...] = tuple(re.compile(p) for p in allow)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.url_patterns)
+
+    def is_allowed(self, url: str) -> bool:
+        return any(p.search(url) for p in self.allow)
+
+    def should_block(self, url: str, resource_type: Optional[str] = None) -> bool:
+        """Return ``True`` when a request for ``url`` should be aborted."""
+        if not self.enabled or self.is_allowed(url):
+            return False
+        if (resource_type or _resource_type_from_url(url)) in self.resource_types:
+            return True
+        return any(fnmatch.fnmatchcase(url, p) for p in self.url_patterns)
+
+    def cdp_patterns(self) -> List[str]:
+        """URL patterns for ``Network.setBlockedURLs``.
+
+        CDP matches URLs only, so resource types are translated to file
+        extensions.  Host patterns that would also match an allow-listed URL
+        cannot be detected here; keep ``BLOCK_ALLOW`` to first-party URLs.
+        """
+        patterns = [f"*.{ext}*" for t in sorted(self.resource_types) for ext in _EXTENSIONS.get(t, ())]
+        return patterns + list(self.url_patterns)
+
+
+PROFILES: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "off": ((), ()),
+    "standard": (("image", "font", "media"), ANALYTICS_PATTERNS + MAP_TILE_PATTERNS),
+    "strict": (("image", "font", "media", "stylesheet"), ANALYTICS_PATTERNS + MAP_TILE_PATTERNS),
+}
+
+
+def get_blocking_profile(name: Optional[str] = None, allow: Optional[Iterable[str]] = None) -> BlockingProfile:
+    """Build the profile ``name`` (``BLOCK_PROFILE`` by default).
+
+    Unknown names fall back to ``off`` with a warning.
+    """
+    name = (name or BLOCK_PROFILE).lower()
+    if name not in PROFILES:
+        logger.warning("Unknown block profile %r – blocking disabled", name)
+        name = "off"
+    resource_types, url_patterns = PROFILES[name]
+    return BlockingProfile(name, resource_types, url_patterns, BLOCK_ALLOW if allow is None else allow)
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class BlockStats:
+    """Counts blocked requests and the estimated bytes they would have cost."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.bytes_saved = 0
+        self.by_type: Counter = Counter()
+
+    def record(self, resource_type: Optional[str], size: Optional[int] = None) -> None:
+        resource_type = resource_type if resource_type in ESTIMATED_BYTES else "other"
+        self.requests += 1
+        self.by_type[resource_type] += 1
+        self.bytes_saved += size if size is not None else ESTIMATED_BYTES[resource_type]
+
+    def merge(self, other: "BlockStats | Dict[str, Any]") -> None:
+        data = other.as_dict() if isinstance(other, BlockStats) else other
+        self.requests += data.get("requests", 0)
+        self.bytes_saved += data.get("bytes_saved", 0)
+        self.by_type.update(data.get("by_type", {}))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "bytes_saved": self.bytes_saved, "by_type": dict(self.by_type)}
+
+    def __str__(self) -> str:
+        return f"blocked={self.requests}, saved≈{format_bytes(self.bytes_saved)}"
+
+
+# --------------------------------------------------------------------------
+# Playwright
+# --------------------------------------------------------------------------
+
+
+def _route_handler(profile: BlockingProfile, stats: BlockStats):
+    def handle(route: Any, request: Any) -> Any:
+        if profile.should_block(request.url, request.resource_type):
+            stats.record(request.resource_type)
+            return route.abort()
+        return route.continue_()
+
+    return handle
+
+
+def install_route(context: Any, profile: BlockingProfile, stats: BlockStats) -> None:
+    """Install the blocking handler on a sync Playwright ``context``."""
+    if profile.enabled:
+        context.route("**/*", _route_handler(profile, stats))
+
+
+async def install_route_async(context: Any, profile: BlockingProfile, stats: BlockStats) -> None:
+    """Install the blocking handler on an async Playwright ``context``.
+
+    ``route.abort()``/``route.continue_()`` return coroutines in the async
+    API; the handler returns them and Playwright awaits the result.
+    """
+    if profile.enabled:
+        await context.route("**/*", _route_handler(profile, stats))
+
+
+# --------------------------------------------------------------------------
+# Selenium
+# --------------------------------------------------------------------------
+
+
+def chrome_logging_prefs(profile: BlockingProfile) -> Optional[Dict[str, str]]:
+    """``goog:loggingPrefs`` needed by :func:`collect_cdp_blocked`."""
+    return {"performance": "ALL"} if profile.enabled else None
+
+
+def apply_cdp_blocking(driver: Any, profile: BlockingProfile) -> None:
+    """Block ``profile`` URLs in Chrome through the DevTools protocol."""
+    if not profile.enabled:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": profile.cdp_patterns()})
+    logger.info("🧱 Blocking profile '%s' active in Chrome", profile.name)
+
+
+def collect_cdp_blocked(driver: Any, stats: BlockStats) -> None:
+    """Add requests blocked by CDP since the last call to ``stats``.
+
+    Reads Chrome's performance log: ``Network.requestWillBeSent`` gives the
+    resource type of each request and ``Network.loadingFailed`` with a
+    ``blockedReason`` marks the ones that were dropped.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:  # logging not enabled or not a Chrome driver
+        return
+    types: Dict[str, str] = {}
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        params = message.get("params", {})
+        if message.get("method") == "Network.requestWillBeSent":
+            types[params.get("requestId")] = (params.get("type") or "other").lower()
+        elif message.get("method") == "Network.loadingFailed" and params.get("blockedReason"):
+            stats.record(types.get(params.get("requestId")) or (params.get("type") or "other").lower())
+
+
+def firefox_preferences(profile: BlockingProfile) -> Dict[str, Any]:
+    """Firefox preferences approximating ``profile`` without interception."""
+    prefs: Dict[str, Any] = {}
+    if "image" in profile.resource_types:
+        prefs["permissions.default.image"] = 2
+    if "font" in profile.resource_types:
+        prefs["gfx.downloadable_fonts.enabled"] = False
+    if "media" in profile.resource_types:
+        prefs["media.autoplay.default"] = 5
+    return prefs
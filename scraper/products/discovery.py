@@ -1,7 +1,36 @@
-import os
+"""Discover products listed in the medical cannabis category.
+
+The category page loads further products through an XHR listing endpoint
+when "Pokaż więcej" is clicked.  Discovery therefore works incrementally:
+
+1. When a listing endpoint is known (:class:`DiscoveryCache`), its pages are
+   requested directly over HTTP with ``If-None-Match``/``If-Modified-Since``
+   taken from the previous run; a ``304`` page reuses the cached products, so
+   only new or changed pages are downloaded and parsed.
+2. Otherwise (or when that fails) the browser loads the category page,
+   clicks "Pokaż więcej" waiting only until new product links appear, and
+   records the endpoint requested by the first click for the next run.
+
+The cache also keeps a checksum and the size of the discovered slug set, so
+runs without catalogue changes are reported as such and a listing clearly
+shorter than the previous one is rejected instead of deactivating products.
+"""
+
+import hashlib
 import importlib
+import json
+import logging
+import os
+import re
 import sys
-from typing import Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+import httpx
+
+from scraper.core.config.config import DISCOVERY_CACHE_FILE, DISCOVERY_MAX_PAGES, DISCOVERY_MIN_SHARE
+from scraper.core.constants import DEFAULT_LOCALE, USER_AGENTS
 
 from .urls import build_regional_url
 
@@ -10,15 +39,210 @@ try:
 except ImportError as exc:
     raise RuntimeError("Playwright is required for product discovery") from exc
 
+logger = logging.getLogger(__name__)
+
 CATEGORY_URL = "https://www.gdziepolek.pl/kategorie/susz-i-ekstrakt-marihuany-medycznej"
 PRODUCT_URL_BASE = "https://www.gdziepolek.pl"
 
+# Parametry stronicowania: numer strony albo przesunięcie (liczba pominiętych pozycji)
+PAGE_PARAMS = ("page", "p", "strona", "pageNumber")
+OFFSET_PARAMS = ("offset", "skip", "start", "from")
 
-def discover_products(headless: Optional[bool] = None) -> List[Dict[str, str]]:
-    """Return a list of products discovered on the category page."""
-    if headless is None:
-        headless_env = os.getenv("HEADLESS", "true")
-        headless = headless_env.lower() == "true"
+_PRODUCT_HREF = re.compile(r"/produkty/([^/?#\"']+)")
+_LINK_COUNT_SCRIPT = "(n) => document.querySelectorAll(\"a[href^='/produkty/']\").length > n"
+
+
+def _product(slug: str, name: str, pvid: Optional[str] = None) -> Dict[str, str]:
+    base_url = f"{PRODUCT_URL_BASE}/produkty/{slug}"
+    return {
+        "name": name,
+        "slug": slug,
+        "base_url": base_url,
+        "regional_url": build_regional_url(base_url, pvid=pvid),
+    }
+
+
+def products_from_json(data: Any) -> Dict[str, Dict[str, str]]:
+    """Collect products from a listing payload of unknown shape.
+
+    Any object carrying a ``/produkty/<slug>`` URL (or a ``slug``) and a
+    name is taken as a product.
+    """
+    found: Dict[str, Dict[str, str]] = {}
+
+    def walk(value: Any) -> None:
+        if isinstance(value, list):
+            for item in value:
+                walk(item)
+            return
+        if not isinstance(value, dict):
+            return
+        slug = None
+        for key in ("url", "href", "link", "path"):
+            match = _PRODUCT_HREF.search(str(value.get(key) or ""))
+            if match:
+                slug = match.group(1)
+                break
+        slug = slug or value.get("slug")
+        name = value.get("name") or value.get("title")
+        if slug and isinstance(name, str) and name.strip():
+            found.setdefault(str(slug), _product(str(slug), name.strip(), value.get("pvid")))
+        for child in value.values():
+            if isinstance(child, (list, dict)):
+                walk(child)
+
+    walk(data)
+    return found
+
+
+def slug_checksum(slugs) -> str:
+    return hashlib.sha256("\n".join(sorted(slugs)).encode("utf-8")).hexdigest()
+
+
+class DiscoveryCache:
+    """Listing endpoint, per-page validators and the last slug set, on disk."""
+
+    def __init__(self, path: Optional[str] = DISCOVERY_CACHE_FILE) -> None:
+        self.path = Path(path) if path else None
+        self.endpoint: Optional[Dict[str, Any]] = None
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        self.checksum: Optional[str] = None
+        self.count = 0
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.endpoint = data.get("endpoint")
+                self.pages = data.get("pages", {})
+                self.checksum = data.get("checksum")
+                self.count = data.get("count", 0)
+            except (OSError, ValueError) as exc:
+                logger.warning("Ignoring unreadable discovery cache %s: %s", self.path, exc)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        data = {"endpoint": self.endpoint, "pages": self.pages, "checksum": self.checksum, "count": self.count}
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def learn_endpoint(self, url: str, items: int) -> bool:
+        """Derive a page URL template from a captured "load more" request."""
+        parsed = urlparse(url)
+        query = parse_qsl(parsed.query, keep_blank_values=True)
+        for name, value in query:
+            if not value.isdigit():
+                continue
+            if name in PAGE_PARAMS:
+                start, step = int(value) - 1, 1
+            elif name in OFFSET_PARAMS:
+                start, step = 0, max(1, items)
+            else:
+                continue
+            rest = [(k, v) for k, v in query if k != name]
+            self.endpoint = {
+                "url": urlunparse(parsed._replace(query=urlencode(rest))),
+                "param": name,
+                "start": start,
+                "step": step,
+            }
+            self.pages = {}
+            return True
+        return False
+
+    def page_url(self, index: int) -> str:
+        endpoint = self.endpoint
+        separator = "&" if "?" in endpoint["url"] else "?"
+        value = endpoint["start"] + index * endpoint["step"]
+        return f"{endpoint['url']}{separator}{endpoint['param']}={value}"
+
+
+def discover_via_endpoint(
+    cache: DiscoveryCache,
+    client: Optional[httpx.Client] = None,
+    max_pages: int = DISCOVERY_MAX_PAGES,
+) -> Optional[List[Dict[str, str]]]:
+    """Page through the known listing endpoint; ``None`` means use the browser.
+
+    The listing is accepted only when it ends with an empty page after all
+    pages known from the previous run, stays within ``max_pages`` and holds
+    at least ``DISCOVERY_MIN_SHARE`` of the previously discovered products.
+    """
+    if not cache.endpoint:
+        return None
+    owns_client = client is None
+    client = client or httpx.Client(
+        timeout=10.0,
+        follow_redirects=True,
+        headers={"User-Agent": USER_AGENTS[0], "Accept": "application/json", "Accept-Language": DEFAULT_LOCALE},
+    )
+    products: Dict[str, Dict[str, str]] = {}
+    downloaded = reused = 0
+    known_pages = sum(1 for page in cache.pages.values() if page.get("products"))
+    try:
+        for index in range(max_pages):
+            key = str(index)
+            cached = cache.pages.get(key, {})
+            headers = {"Referer": CATEGORY_URL}
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+            response = client.get(cache.page_url(index), headers=headers)
+            if response.status_code == 304 and cached:
+                page_products = cached["products"]
+                reused += 1
+            else:
+                response.raise_for_status()
+                page_products = products_from_json(response.json())
+                downloaded += 1
+            new = {slug: p for slug, p in page_products.items() if slug not in products}
+            if not new:
+                if index < known_pages:
+                    # pusta strona w środku listy lub endpoint ignoruje parametr stronicowania
+                    return _truncated(cache, f"strona {index} bez nowych produktów, poprzednio {known_pages} stron")
+                for stale in [k for k in cache.pages if int(k) >= index]:
+                    del cache.pages[stale]
+                break
+            if response.status_code != 304:
+                cache.pages[key] = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "products": page_products,
+                }
+            products.update(new)
+        else:
+            logger.warning("⚠️ Discovery HTTP: osiągnięto DISCOVERY_MAX_PAGES=%d – używam przeglądarki", max_pages)
+            return None
+    except (httpx.HTTPError, ValueError) as exc:
+        logger.warning("⚠️ Endpoint listy produktów nie działa (%s) – używam przeglądarki", exc)
+        cache.endpoint = None
+        return None
+    finally:
+        if owns_client:
+            client.close()
+    if not products:
+        return None
+    if cache.count and len(products) < cache.count * DISCOVERY_MIN_SHARE:
+        return _truncated(cache, f"{len(products)} produktów, poprzednio {cache.count}")
+    logger.info("🔍 Discovery HTTP: %d stron pobranych, %d bez zmian (304)", downloaded, reused)
+    return list(products.values())
+
+
+def _truncated(cache: DiscoveryCache, reason: str) -> None:
+    """Reject a partial endpoint listing so the browser discovers the full one.
+
+    ``sync_products`` deactivates every product missing from the list, so a
+    truncated result must never be used.  The page validators are dropped and
+    the next run downloads every page again.
+    """
+    logger.warning("⚠️ Lista z endpointu wygląda na uciętą (%s) – używam przeglądarki", reason)
+    cache.pages = {}
+    return None
+
+
+def _discover_in_browser(headless: bool, cache: DiscoveryCache) -> List[Dict[str, str]]:
     global sync_playwright
     manager = sync_playwright()
     if manager is None:
@@ -37,20 +261,34 @@ def discover_products(headless: Optional[bool] = None) -> List[Dict[str, str]]:
         browser = p.firefox.launch(headless=headless)
         context = browser.new_context(ignore_https_errors=True)
         page = context.new_page()
+        listing_responses: List[Any] = []
+
+        def on_response(response) -> None:
+            request = response.request
+            if request.resource_type in ("xhr", "fetch") and response.ok:
+                listing_responses.append(response)
+
+        page.on("response", on_response)
         page.goto(CATEGORY_URL)
 
         load_more_selector = "button:has-text('Pokaż więcej'), button:has-text('Załaduj więcej')"
-        for _ in range(100):
+        link_selector = "a[href^='/produkty/']"
+        for click in range(DISCOVERY_MAX_PAGES):
             button = page.locator(load_more_selector)
             if not button.count():
                 break
+            before = len(page.query_selector_all(link_selector))
+            seen_responses = len(listing_responses)
             try:
                 button.first.click()
-                page.wait_for_load_state("networkidle")
+                # czekamy tylko na nowe linki zamiast na pełne networkidle
+                page.wait_for_function(_LINK_COUNT_SCRIPT, arg=before, timeout=15000)
             except Exception:
                 break
+            if click == 0 and not cache.endpoint:
+                _learn_from_responses(cache, listing_responses[seen_responses:])
 
-        links = page.query_selector_all("a[href^='/produkty/']")
+        links = page.query_selector_all(link_selector)
         products: Dict[str, Dict[str, str]] = {}
         for link in links:
             href = link.get_attribute("href") or ""
@@ -58,14 +296,39 @@ def discover_products(headless: Optional[bool] = None) -> List[Dict[str, str]]:
             if not slug or slug in products:
                 continue
             name = (link.inner_text() or "").strip()
-            base_url = f"{PRODUCT_URL_BASE}/produkty/{slug}"
             pvid = link.get_attribute("data-pvid") or link.get_attribute("pvid")
-            products[slug] = {
-                "name": name,
-                "slug": slug,
-                "base_url": base_url,
-                "regional_url": build_regional_url(base_url, pvid=pvid),
-            }
+            products[slug] = _product(slug, name, pvid)
 
         browser.close()
         return list(products.values())
+
+
+def _learn_from_responses(cache: DiscoveryCache, responses: List[Any]) -> None:
+    for response in responses:
+        try:
+            items = products_from_json(response.json())
+        except Exception:
+            continue
+        if items and cache.learn_endpoint(response.url, len(items)):
+            logger.info("🔗 Zapamiętano endpoint listy produktów: %s", cache.endpoint["url"])
+            return
+
+
+def discover_products(headless: Optional[bool] = None, cache_file: Optional[str] = None) -> List[Dict[str, str]]:
+    """Return a list of products discovered on the category page."""
+    if headless is None:
+        headless_env = os.getenv("HEADLESS", "true")
+        headless = headless_env.lower() == "true"
+    cache = DiscoveryCache(cache_file if cache_file is not None else DISCOVERY_CACHE_FILE)
+
+    products = discover_via_endpoint(cache)
+    if products is None:
+        products = _discover_in_browser(headless, cache)
+    if products:
+        checksum = slug_checksum(p["slug"] for p in products)
+        if checksum == cache.checksum:
+            logger.info("🔍 Discovery: %d produktów, lista bez zmian", len(products))
+        cache.checksum = checksum
+        cache.count = len(products)
+        cache.save()
+    return products
@@ -1,12 +1,71 @@
 from __future__ import annotations
 
 
+import logging
+import re
 from typing import Optional
 
+logger = logging.getLogger(__name__)
 
-def build_regional_url(base_url: str, region: str = "w-slaskim", pvid: Optional[str] = None) -> str:
+
+DEFAULT_REGION = "w-slaskim"
+
+# Województwa w formie używanej w ścieżkach gdziepolek.pl (/apteki/<region>)
+REGIONS = (
+    "w-dolnoslaskim",
+    "w-kujawsko-pomorskim",
+    "w-lubelskim",
+    "w-lubuskim",
+    "w-lodzkim",
+    "w-malopolskim",
+    "w-mazowieckim",
+    "w-opolskim",
+    "w-podkarpackim",
+    "w-podlaskim",
+    "w-pomorskim",
+    "w-slaskim",
+    "w-swietokrzyskim",
+    "w-warminsko-mazurskim",
+    "w-wielkopolskim",
+    "w-zachodniopomorskim",
+)
+
+_REGION_SEGMENT = re.compile(r"/apteki/([^/?#]+)")
+
+
+def build_regional_url(base_url: str, region: str = DEFAULT_REGION, pvid: Optional[str] = None) -> str:
     """Return a regional URL for a product page."""
     url = f"{base_url.rstrip('/')}/apteki/{region}"
     if pvid is not None:
         url += f"?pvid={pvid}"
     return f"{url}#stacjonarne"
+
+
+def region_from_url(url: str) -> str:
+    """Return the region segment of a regional product URL."""
+    match = _REGION_SEGMENT.search(url)
+    return match.group(1) if match else DEFAULT_REGION
+
+
+def with_region(url: str, region: str) -> str:
+    """Return ``url`` pointing at ``region`` instead of its current region."""
+    if _REGION_SEGMENT.search(url):
+        return _REGION_SEGMENT.sub(f"/apteki/{region}", url, count=1)
+    return build_regional_url(url.split("#", 1)[0].split("?", 1)[0], region)
+
+
+def resolve_regions(names) -> tuple:
+    """Expand ``all`` and drop unknown names (with the default as fallback).
+
+    Unknown names are logged as a warning, so a typo in ``SCRAPE_REGIONS``
+    does not silently shrink a multi-region run.
+    """
+    if any(name == "all" for name in names):
+        return REGIONS
+    unknown = [name for name in names if name not in REGIONS]
+    if unknown:
+        logger.warning("⚠️ Nieznane regiony w SCRAPE_REGIONS pominięte: %s", ", ".join(unknown))
+    regions = tuple(dict.fromkeys(name for name in names if name in REGIONS))
+    if not regions:
+        logger.warning("⚠️ Brak poprawnych regionów – używam %s", DEFAULT_REGION)
+    return regions or (DEFAULT_REGION,)
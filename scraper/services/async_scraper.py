@@ -0,0 +1,274 @@
+"""Concurrent offers scraping built on asyncio and ``playwright.async_api``.
+
+Product pages are fetched by many coroutines at once.  Two limits keep the
+run polite: a global ``concurrency`` cap on pages in flight and a per-host
+:class:`HostThrottle` that bounds parallel requests to one host and spaces
+their start times by ``host_delay`` seconds.
+
+``fetch_page`` stays injectable exactly as in
+:func:`scraper.services.offers.scrape_offers_once`; it may be a coroutine
+function or a plain callable returning HTML, so tests can keep passing simple
+stubs.
+
+With the built-in browser fetch, offers are first requested from the JSON
+endpoint learned on earlier visits (:mod:`scraper.services.xhr_offers`); the
+browser only loads the page when that shortcut is unavailable or fails.
+Next the page is requested over plain HTTP and offers are read from its
+embedded ``__NEXT_DATA__`` state (:mod:`scraper.services.ssr_offers`);
+Playwright is launched only for pages where neither works.
+
+Every product is scraped in each configured region (``SCRAPE_REGIONS``);
+each region has its own ``region_concurrency`` budget on top of the global
+and per-host limits, and parsed entries carry their ``region``.
+
+Fetched pages and JSON payloads are appended to the optional ``archive``
+(:class:`~scraper.services.page_archive.PageArchive`) before parsing.
+
+When a :class:`~scraper.services.fingerprints.FingerprintStore` is passed,
+payloads identical to the previous run are not parsed at all; their slugs are
+collected in ``fingerprints.unchanged`` instead of the results.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Union
+from urllib.parse import urlparse
+
+from scraper.core.config.config import (
+    SCRAPE_CONCURRENCY,
+    SCRAPE_HOST_CONCURRENCY,
+    SCRAPE_HOST_DELAY,
+    SCRAPE_JSON_OFFERS,
+    SCRAPE_REGIONS,
+    SCRAPE_SSR_OFFERS,
+    REGION_CONCURRENCY,
+)
+from scraper.products.urls import build_regional_url, resolve_regions
+from scraper.services.browser_pool import AsyncBrowserPool
+from scraper.services.fingerprints import FingerprintStore, fingerprint_key
+from scraper.services.metrics import count_timeout, observe_page
+from scraper.services.offers import _parse_offers
+from scraper.services.page_archive import PageArchive
+from scraper.services.ssr_offers import SsrOffersFetcher
+from scraper.services.tracing import span
+from scraper.services.xhr_offers import JsonOffersFetcher
+
+logger = logging.getLogger(__name__)
+
+FetchPage = Callable[[str], Union[str, Awaitable[str]]]
+PageSink = Callable[[str, str, Union[str, List[dict]]], Awaitable[None]]
+
+_current_pool: contextvars.ContextVar[Optional[AsyncBrowserPool]] = contextvars.ContextVar(
+    "scraper_async_pool", default=None
+)
+_current_json: contextvars.ContextVar[Optional[JsonOffersFetcher]] = contextvars.ContextVar(
+    "scraper_json_fetcher", default=None
+)
+
+
+async def _default_fetch(url: str) -> str:
+    """Fetch ``url`` through the browser pool owned by the running scrape.
+
+    The offers XHR seen while loading the page is remembered so the next
+    visit can use the JSON shortcut instead.
+    """
+    pool = _current_pool.get()
+    if pool is None:
+        raise RuntimeError("_default_fetch must be called from scrape_products_async")
+    html, endpoint = await pool.fetch_capturing(url)  # pragma: no cover - browser side effect
+    json_fetcher = _current_json.get()
+    if endpoint and json_fetcher is not None:
+        json_fetcher.remember(url, endpoint)
+    return html
+
+
+class HostThrottle:
+    """Per-host politeness: parallelism cap and spacing between requests."""
+
+    def __init__(self, per_host: int = SCRAPE_HOST_CONCURRENCY, delay: float = SCRAPE_HOST_DELAY) -> None:
+        self.per_host = max(1, per_host)
+        self.delay = max(0.0, delay)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        host = urlparse(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host))
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with semaphore:
+            async with lock:
+                loop = asyncio.get_running_loop()
+                wait = self._next_start.get(host, 0.0) - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._next_start[host] = loop.time() + self.delay
+            yield
+
+
+def _is_timeout(exc: BaseException) -> bool:
+    return isinstance(exc, (asyncio.TimeoutError, TimeoutError)) or "Timeout" in type(exc).__name__
+
+
+async def _call_fetch(fetch_page: FetchPage, url: str) -> str:
+    result = fetch_page(url)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def scrape_products_async(
+    slugs: Iterable[str],
+    fetch_page: FetchPage = _default_fetch,
+    concurrency: int = SCRAPE_CONCURRENCY,
+    host_concurrency: int = SCRAPE_HOST_CONCURRENCY,
+    host_delay: float = SCRAPE_HOST_DELAY,
+    json_fetcher: Optional[JsonOffersFetcher] = None,
+    fingerprints: Optional[FingerprintStore] = None,
+    regions: Optional[Sequence[str]] = None,
+    region_concurrency: int = REGION_CONCURRENCY,
+    archive: Optional[PageArchive] = None,
+    sink: Optional[PageSink] = None,
+    ssr_fetcher: Optional[SsrOffersFetcher] = None,
+    pool: Optional[AsyncBrowserPool] = None,
+) -> Dict[str, List[dict]]:
+    """Fetch and parse offers for every product slug and region concurrently.
+
+    Returns a mapping of slug to parsed entries of all ``regions``
+    (``SCRAPE_REGIONS`` by default).  Products whose page could not be
+    fetched in any region are absent from the mapping; products without
+    offers in every fetched region map to an empty list.
+
+    The JSON shortcut and the SSR state fetch are enabled automatically
+    (``SCRAPE_JSON_OFFERS``, ``SCRAPE_SSR_OFFERS``) only for the built-in
+    browser fetch; a custom ``fetch_page`` is always honoured unless a
+    ``json_fetcher`` or ``ssr_fetcher`` is passed explicitly.
+
+    Products whose payload matches their ``fingerprints`` entry in every
+    region that returned offers are absent from the mapping and reported by
+    ``fingerprints.unchanged_products()``; callers must check that before
+    treating a missing slug as a failed fetch.
+
+    With a ``sink`` nothing is parsed here: every changed payload (HTML, or
+    entries from the JSON shortcut) is awaited into ``sink(slug, region,
+    payload)`` and the returned mapping stays empty – see
+    :mod:`scraper.services.pipeline`.
+
+    A ``pool`` owned by the caller (e.g. one per Celery worker process) is
+    used as is and left open; otherwise a pool is created for this call.
+    """
+    concurrency = max(1, concurrency)
+    limiter = asyncio.Semaphore(concurrency)
+    throttle = HostThrottle(host_concurrency, host_delay)
+    regions = resolve_regions(SCRAPE_REGIONS if regions is None else regions)
+    if region_concurrency <= 0:
+        region_concurrency = -(-concurrency // len(regions))
+    region_limits = {region: asyncio.Semaphore(region_concurrency) for region in regions}
+    outcomes: Dict[str, Dict[str, Optional[List[dict]]]] = {}
+    if json_fetcher is None and SCRAPE_JSON_OFFERS and fetch_page is _default_fetch:
+        json_fetcher = JsonOffersFetcher(max_connections=concurrency)
+    if json_fetcher is not None and json_fetcher.archive is None:
+        json_fetcher.archive = archive
+    if ssr_fetcher is None and SCRAPE_SSR_OFFERS and fetch_page is _default_fetch:
+        ssr_fetcher = SsrOffersFetcher(max_connections=concurrency)
+    if ssr_fetcher is not None and ssr_fetcher.archive is None:
+        ssr_fetcher.archive = archive
+
+    async def scrape_one(slug: str, region: str) -> None:
+        url = build_regional_url(f"https://www.gdziepolek.pl/produkty/{slug}", region)
+        key = fingerprint_key(slug, region)
+        entries: Optional[List[dict]] = None
+        source = "playwright"
+        async with region_limits[region], limiter, throttle.slot(url):
+            with span("scrape.fetch", product=slug, region=region) as fetch_span:
+                for source, fetcher in (("json", json_fetcher), ("ssr", ssr_fetcher)):
+                    if fetcher is not None:
+                        started = time.perf_counter()
+                        entries = await fetcher.fetch_entries(url, slug)
+                        if entries is not None:
+                            offers = sum(len(e["offers"]) for e in entries)
+                            observe_page(source, slug, fetch=time.perf_counter() - started, offers=offers)
+                            fetch_span.set_attributes({"source": source, "offers": offers})
+                            break
+                if entries is None:
+                    source = "playwright"
+                    fetch_span.set_attribute("source", source)
+                    started = time.perf_counter()
+                    try:
+                        html = await _call_fetch(fetch_page, url)
+                    except Exception as exc:  # pragma: no cover - network failure
+                        if _is_timeout(exc):
+                            count_timeout(source, slug)
+                        fetch_span.record_exception(exc)
+                        logger.error("Failed to fetch %s: %s", url, exc)
+                        return
+                    observe_page(source, slug, fetch=time.perf_counter() - started)
+                    fetch_span.set_attribute("bytes", len(html or ""))
+        if entries is None and archive is not None:
+            await archive.append_async(slug, url, html, region=region)
+        if fingerprints is not None and fingerprints.check(key, entries if entries is not None else html):
+            # None oznacza region bez zmian od ostatniego przebiegu
+            outcomes.setdefault(slug, {})[region] = None
+            return
+        if sink is not None:
+            await sink(slug, region, entries if entries is not None else html)
+            return
+        if entries is None:
+            with span("scrape.parse", product=slug, region=region, bytes=len(html or "")) as parse_span:
+                started = time.perf_counter()
+                entries = _parse_offers(html, slug)
+                offers = sum(len(e.get("offers", [])) for e in entries)
+                observe_page(source, slug, parse=time.perf_counter() - started, offers=offers)
+                parse_span.set_attribute("offers", offers)
+        for entry in entries:
+            entry["region"] = region
+        if fingerprints is not None and not entries:
+            # pusta strona nie może zablokować dezaktywacji produktu w kolejnym runie
+            fingerprints.discard(key)
+        outcomes.setdefault(slug, {})[region] = entries
+
+    owns_pool = pool is None
+    if owns_pool:
+        pool = AsyncBrowserPool(size=concurrency)
+    pool_token = _current_pool.set(pool)
+    json_token = _current_json.set(json_fetcher)
+    try:
+        await asyncio.gather(*(scrape_one(slug, region) for slug in slugs for region in regions))
+    finally:
+        _current_json.reset(json_token)
+        _current_pool.reset(pool_token)
+        if json_fetcher is not None:
+            logger.info(
+                "JSON offers endpoint: hits=%d, browser fallbacks=%d",
+                json_fetcher.hits,
+                json_fetcher.misses,
+            )
+            await json_fetcher.aclose()
+        if ssr_fetcher is not None:
+            logger.info(
+                "SSR state: hits=%d, browser fallbacks=%d", ssr_fetcher.hits, ssr_fetcher.misses
+            )
+            await ssr_fetcher.aclose()
+        if owns_pool:
+            if pool.pages_served:
+                logger.info("🧱 Resource blocking (%s): %s", pool.blocking.name, pool.block_stats)
+            await pool.aclose()
+
+    results: Dict[str, List[dict]] = {}
+    for slug, by_region in outcomes.items():
+        entries = [entry for found in by_region.values() if found for entry in found]
+        if entries or None not in by_region.values():
+            results[slug] = entries
+    return results
+
+
+def scrape_products(slugs: Iterable[str], fetch_page: FetchPage = _default_fetch, **kwargs) -> Dict[str, List[dict]]:
+    """Synchronous entry point for :func:`scrape_products_async`."""
+    return asyncio.run(scrape_products_async(slugs, fetch_page, **kwargs))
@@ -0,0 +1,227 @@
+"""Long-lived Playwright browser pools used for fetching product pages.
+
+Launching Firefox for every URL dominates the runtime of a scrape.  The pools
+keep one browser process alive for the whole run and hand out pages from a
+small set of reusable contexts.  A context is recycled after ``max_uses``
+pages or as soon as a page using it raises, so cookies, caches and leaked
+memory never accumulate for long.
+
+Every context gets the request-blocking handler of the configured
+:class:`~scraper.core.resource_blocking.BlockingProfile`; blocked requests
+are tallied in :attr:`AsyncBrowserPool.block_stats`.
+
+:class:`AsyncBrowserPool` is built on ``playwright.async_api`` and is owned
+by its caller: the concurrent engine in :mod:`scraper.services.async_scraper`
+creates one per run unless it is handed a longer-lived pool, such as the one
+each Celery worker process keeps (:mod:`scraper.worker`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from scraper.core.config.config import BROWSER_POOL_MAX_USES, BROWSER_POOL_SIZE
+from scraper.core.constants import DEFAULT_LOCALE, DEFAULT_VIEWPORT, USER_AGENTS
+from scraper.core.resource_blocking import (
+    BlockingProfile,
+    BlockStats,
+    get_blocking_profile,
+    install_route_async,
+)
+from scraper.utils.retry import async_retry_on_timeout
+
+logger = logging.getLogger(__name__)
+
+OFFERS_RESPONSE_PATTERN = re.compile(r"(offers|results)")
+
+
+class _Slot:
+    """Browser context together with the number of pages it has served."""
+
+    __slots__ = ("context", "uses")
+
+    def __init__(self, context: Any) -> None:
+        self.context = context
+        self.uses = 0
+
+
+def _context_options() -> dict:
+    return {
+        "user_agent": random.choice(USER_AGENTS),
+        "locale": DEFAULT_LOCALE,
+        "viewport": DEFAULT_VIEWPORT,
+    }
+
+
+class AsyncBrowserPool:
+    """Hand out Playwright pages backed by a persistent browser.
+
+    Many coroutines may hold pages at the same time; the number of idle
+    contexts kept for reuse is still bounded by ``size``.  Concurrency itself
+    is limited by the caller.
+
+    Parameters
+    ----------
+    size:
+        Maximum number of idle contexts kept for reuse.
+    max_uses:
+        Number of pages served by a context before it is closed and replaced.
+    headless:
+        Whether the browser runs without a visible window.
+    browser_type:
+        Name of the Playwright browser type to launch (``firefox`` by default).
+    blocking:
+        Request-blocking profile installed on every context
+        (``BLOCK_PROFILE`` by default).
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_uses: int = BROWSER_POOL_MAX_USES,
+        headless: bool = True,
+        browser_type: str = "firefox",
+        blocking: Optional[BlockingProfile] = None,
+    ) -> None:
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.headless = headless
+        self.browser_type = browser_type
+        self.blocking = blocking if blocking is not None else get_blocking_profile()
+        self.block_stats = BlockStats()
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._idle: Deque[_Slot] = deque()
+        self.pages_served = 0
+        self.contexts_recycled = 0
+        self.browser_launches = 0
+        self._launch_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncBrowserPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def _ensure_browser_async(self) -> Any:
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            if self._browser is not None:
+                logger.warning("Browser disconnected – launching a new one")
+                self._idle.clear()
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+
+                self._playwright = await async_playwright().start()
+            launcher = getattr(self._playwright, self.browser_type)
+            self._browser = await launcher.launch(headless=self.headless)
+            self.browser_launches += 1
+            return self._browser
+
+    async def _acquire_async(self) -> _Slot:
+        browser = await self._ensure_browser_async()
+        if self._idle:
+            return self._idle.popleft()
+        context = await browser.new_context(**_context_options())
+        await install_route_async(context, self.blocking, self.block_stats)
+        return _Slot(context)
+
+    def _retire_reason(self, slot: _Slot, failed: bool) -> Optional[str]:
+        if failed:
+            return "error"
+        if slot.uses >= self.max_uses:
+            return "max uses"
+        if len(self._idle) >= self.size:
+            return "pool full"
+        return None
+
+    async def _release_async(self, slot: _Slot, failed: bool) -> None:
+        reason = self._retire_reason(slot, failed)
+        if not reason:
+            self._idle.append(slot)
+            return
+        logger.debug("Recycling browser context after %d pages (%s)", slot.uses, reason)
+        self.contexts_recycled += 1
+        try:
+            await slot.context.close()
+        except Exception as exc:  # pragma: no cover - defensive cleanup
+            logger.debug("Failed to close browser context: %s", exc)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """Yield a fresh page from a pooled context.
+
+        The page is always closed afterwards.  If the body raises, the
+        underlying context is discarded instead of being returned to the pool.
+        """
+        slot = await self._acquire_async()
+        page = await slot.context.new_page()
+        failed = False
+        try:
+            yield page
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            slot.uses += 1
+            self.pages_served += 1
+            try:
+                await page.close()
+            except Exception:
+                failed = True
+            await self._release_async(slot, failed)
+
+    async def fetch(self, url: str) -> str:
+        """Load ``url`` and return its HTML once the offers list has arrived."""
+        html, _ = await self.fetch_capturing(url)
+        return html
+
+    async def fetch_capturing(self, url: str) -> Tuple[str, Optional[str]]:
+        """Like :meth:`fetch` but also return the offers XHR URL.
+
+        The second element is the URL of the offers response when it was
+        served as JSON, otherwise ``None``.
+        """
+        async with self.page() as page:
+            captured: Dict[str, Optional[str]] = {"url": None}
+
+            async def load_page() -> None:
+                await page.goto(url)
+                response = await page.wait_for_response(
+                    lambda r: OFFERS_RESPONSE_PATTERN.search(r.url)
+                )
+                if "json" in (response.headers.get("content-type") or ""):
+                    captured["url"] = response.url
+                await page.wait_for_load_state("networkidle")
+
+            await async_retry_on_timeout(load_page)
+            return await page.content(), captured["url"]
+
+    async def aclose(self) -> None:
+        """Close every pooled context, the browser and the Playwright driver."""
+        while self._idle:
+            slot = self._idle.popleft()
+            try:
+                await slot.context.close()
+            except Exception:  # pragma: no cover - defensive cleanup
+                pass
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:  # pragma: no cover - defensive cleanup
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:  # pragma: no cover - defensive cleanup
+                pass
+            self._playwright = None
+
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime, timezone
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional
 
 import requests
 from sqlalchemy import create_engine as create_sync_engine
@@ -13,7 +13,10 @@ from sqlalchemy.orm import Session
 
 from backend.models import Product
 from scraper.core.config.config import API_URL, DB_PATH, DB_URL
+from scraper.products.urls import DEFAULT_REGION
 from scraper.services.price_validator import normalize_unit
+from scraper.services.tracing import span
+from scraper.utils.price_units import price_columns
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +45,7 @@ ENGINE = _build_sync_engine(DB_URL, DB_PATH)
 __all__ = [
     "ensure_product_name",
     "insert_prices",
+    "insert_prices_batch",
     "should_insert_price",
     "get_all_prices",
     "get_prices_for_product",
@@ -121,65 +125,167 @@ def ensure_product_name(product_id: str, product_name: str) -> None:
             session.commit()
 
 
-def insert_prices(entry: Dict) -> None:
-    """Persist scraped offers to the configured backend or API."""
+_INSERT_PRICE = text(
+    """
+    INSERT INTO pharmacy_prices (
+        product_id, pharmacy_name, address, price, unit, expiration,
+        availability, updated, fetched_at, map_url, region,
+        package_grams, price_per_g, expiration_date
+    ) VALUES (
+        :product_id, :pharmacy_name, :address, :price, :unit, :expiration,
+        :availability, :updated, :fetched_at, :map_url, :region,
+        :package_grams, :price_per_g, :expiration_date
+    )
+    """
+)
+
+_PRICE_EXISTS = text(
+    """
+    SELECT 1 FROM pharmacy_prices
+    WHERE product_id = :pid AND pharmacy_name = :ph AND address = :addr
+      AND price = :price AND expiration = :exp AND unit = :unit
+      AND region = :region
+    LIMIT 1
+    """
+)
+
+
+def _price_row(entry: Dict, offer: Dict, now: str) -> Dict:
+    price = float(offer.get("price"))
+    unit = normalize_unit(offer.get("unit"))
+    return {
+        "product_id": entry["product_id"],
+        "pharmacy_name": entry["name"],
+        "address": entry.get("address", ""),
+        "price": price,
+        "unit": unit,
+        "expiration": offer.get("expiration"),
+        "availability": entry.get("availability"),
+        "updated": entry.get("updated"),
+        "fetched_at": now,
+        "map_url": entry.get("map_url", ""),
+        "region": entry.get("region") or DEFAULT_REGION,
+        **price_columns(price, unit, entry["product_id"], offer.get("expiration")),
+    }
+
+
+def _has_new_offer(conn, entry: Dict) -> bool:
+    for offer in entry.get("offers", []):
+        result = conn.execute(
+            _PRICE_EXISTS,
+            {
+                "pid": entry["product_id"],
+                "ph": entry["name"],
+                "addr": entry.get("address", ""),
+                "price": offer.get("price"),
+                "exp": offer.get("expiration", ""),
+                "unit": normalize_unit(offer.get("unit")),
+                "region": entry.get("region") or DEFAULT_REGION,
+            },
+        ).first()
+        if result is None:
+            return True
+    return False
+
+
+def insert_prices(entry: Dict) -> int:
+    """Persist scraped offers to the configured backend or API.
+
+    ``entry["fetched_at"]`` (set when replaying archived pages) overrides the
+    current time.  Returns the number of rows written (offers sent to the
+    API count as written).
+    """
 
     offers = entry.get("offers", [])
     if not offers:
         logger.debug(f"⏩ Pominięto {entry['name']} – brak ofert.")
-        return
-
-    now = datetime.now().isoformat(timespec="seconds")
-
-    if API_URL:
-        payload = entry.copy()
-        payload["fetched_at"] = now
-        try:
-            requests.post(API_URL, json=payload, timeout=10)
-        except Exception as e:
-            logger.error(f"❌ Błąd wysyłki do API ({entry['name']}): {e}")
-        return
+        return 0
 
-    if not should_insert_price(entry):
-        logger.debug(f"⏩ Pominięto {entry['name']} – brak zmian.")
-        return
+    now = entry.get("fetched_at") or datetime.now().isoformat(timespec="seconds")
 
-    with ENGINE.begin() as conn:
-        ensure_product_name(entry["product_id"], entry.get("product_name", entry["name"]))
-        for offer in offers:
-            price = offer.get("price")
-            unit = normalize_unit(offer.get("unit"))
-            expiration = offer.get("expiration")
+    with span(
+        "db.insert_prices", product=entry["product_id"], region=entry.get("region"), offers=len(offers)
+    ) as current:
+        if API_URL:
+            payload = entry.copy()
+            payload["fetched_at"] = now
+            current.set_attribute("target", "api")
             try:
-                conn.execute(
-                    text(
-                        """
-                        INSERT INTO pharmacy_prices (
-                            product_id, pharmacy_name, address, price, unit, expiration,
-                            availability, updated, fetched_at, map_url
-                        ) VALUES (
-                            :product_id, :pharmacy_name, :address, :price, :unit, :expiration,
-                            :availability, :updated, :fetched_at, :map_url
-                        )
-                        """
-                    ),
-                    {
-                        "product_id": entry["product_id"],
-                        "pharmacy_name": entry["name"],
-                        "address": entry.get("address", ""),
-                        "price": float(price),
-                        "unit": unit,
-                        "expiration": expiration,
-                        "availability": entry.get("availability"),
-                        "updated": entry.get("updated"),
-                        "fetched_at": now,
-                        "map_url": entry.get("map_url", ""),
-                    },
-                )
+                requests.post(API_URL, json=payload, timeout=10)
             except Exception as e:
-                logger.debug(
-                    f"ℹ️ Duplikat lub błąd przy zapisie do bazy ({entry['name']}): {e}"
-                )
+                logger.error(f"❌ Błąd wysyłki do API ({entry['name']}): {e}")
+                return 0
+            return len(offers)
+
+        if not should_insert_price(entry):
+            current.set_attribute("skipped", True)
+            logger.debug(f"⏩ Pominięto {entry['name']} – brak zmian.")
+            return 0
+
+        written = 0
+        with ENGINE.begin() as conn:
+            ensure_product_name(entry["product_id"], entry.get("product_name", entry["name"]))
+            for offer in offers:
+                try:
+                    conn.execute(_INSERT_PRICE, _price_row(entry, offer, now))
+                except Exception as e:
+                    logger.debug(
+                        f"ℹ️ Duplikat lub błąd przy zapisie do bazy ({entry['name']}): {e}"
+                    )
+                else:
+                    written += 1
+        current.set_attribute("rows", written)
+    return written
+
+
+def insert_prices_batch(entries: Iterable[Dict]) -> int:
+    """Persist many entries in one transaction; return the rows written.
+
+    Same rules as :func:`insert_prices` – entries without a new offer are
+    skipped – but the duplicate checks and inserts share one connection and
+    the rows go out in a single ``executemany``.  If the batch hits a
+    constraint (e.g. a concurrent writer), it is retried entry by entry and
+    only the rows written by that fallback are counted.
+    """
+
+    entries = [e for e in entries if e.get("offers")]
+    if not entries:
+        return 0
+    offers = sum(len(e["offers"]) for e in entries)
+    with span("db.insert_prices_batch", entries=len(entries), offers=offers) as current:
+        rows = _insert_prices_batch(entries)
+        current.set_attribute("rows", rows)
+    return rows
+
+
+def _insert_prices_batch(entries: List[Dict]) -> int:
+    if API_URL:
+        return sum(insert_prices(entry) or 0 for entry in entries)
+
+    now = datetime.now().isoformat(timespec="seconds")
+    rows: Dict[tuple, Dict] = {}
+    with ENGINE.connect() as conn:
+        for entry in entries:
+            if not _has_new_offer(conn, entry):
+                continue
+            for offer in entry["offers"]:
+                row = _price_row(entry, offer, entry.get("fetched_at") or now)
+                key = (row["product_id"], row["pharmacy_name"], row["price"], row["expiration"], row["fetched_at"], row["region"])
+                rows.setdefault(key, row)
+    if not rows:
+        return 0
+
+    names = {e["product_id"]: e.get("product_name", e["name"]) for e in entries}
+    for product_id, name in names.items():
+        ensure_product_name(product_id, name)
+    try:
+        with ENGINE.begin() as conn:
+            conn.execute(_INSERT_PRICE, list(rows.values()))
+    except Exception as e:
+        logger.debug(f"ℹ️ Zapis wsadowy nieudany, zapisuję pojedynczo: {e}")
+        # liczymy tylko wiersze faktycznie zapisane przez zapis pojedynczy
+        return sum(insert_prices(entry) or 0 for entry in entries)
+    return len(rows)
 
 
 def should_insert_price(entry: Dict) -> bool:
@@ -190,31 +296,7 @@ def should_insert_price(entry: Dict) -> bool:
         return bool(offers)
 
     with ENGINE.connect() as conn:
-        for offer in offers:
-            price = offer.get("price")
-            expiration = offer.get("expiration", "")
-            unit = normalize_unit(offer.get("unit"))
-            result = conn.execute(
-                text(
-                    """
-                    SELECT 1 FROM pharmacy_prices
-                    WHERE product_id = :pid AND pharmacy_name = :ph AND address = :addr
-                      AND price = :price AND expiration = :exp AND unit = :unit
-                    LIMIT 1
-                    """
-                ),
-                {
-                    "pid": entry["product_id"],
-                    "ph": entry["name"],
-                    "addr": entry.get("address", ""),
-                    "price": price,
-                    "exp": expiration,
-                    "unit": unit,
-                },
-            ).first()
-            if result is None:
-                return True
-    return False
+        return _has_new_offer(conn, entry)
 
 
 def get_all_prices() -> Iterable[Dict]:
@@ -0,0 +1,181 @@
+"""Per-product fingerprints of the scraped offers payload.
+
+Most runs see very little price churn, yet every page used to be parsed and
+every offer sent through :func:`scraper.services.db.should_insert_price`.
+:class:`FingerprintStore` keeps a SHA-256 hash of the normalised payload of
+each product together with the time it was last seen.  When a fresh payload
+hashes to the stored value the product is marked *unchanged*: parsing and all
+per-offer DB queries are skipped and only ``last_seen`` is bumped.
+
+Normalisation removes markup that changes between identical listings
+(scripts, styles, comments, whitespace and relative "x godzin temu" times),
+so the hash tracks offers rather than page noise.  A fingerprint older than
+``max_age`` is ignored, which forces a full pass at least that often.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Set
+
+from sqlalchemy import text
+
+from scraper.core.config.config import API_URL, FINGERPRINT_MAX_AGE_HOURS, PAGE_FINGERPRINTS
+from scraper.products.urls import DEFAULT_REGION
+from scraper.services import db as db_services
+
+logger = logging.getLogger(__name__)
+
+_STRIP_BLOCKS = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>|<!--.*?-->", re.S | re.I)
+_RELATIVE_TIME = re.compile(
+    r"\b\d+\s+(?:sekund|minut|godzin|dni|dzień|tygodni)\w*\s+temu\b|\b(?:dziś|dzisiaj|wczoraj)\b",
+    re.I,
+)
+_WHITESPACE = re.compile(r"\s+")
+_VOLATILE_KEYS = {"updated", "updated_at", "fetched_at", "timestamp", "map_url"}
+
+
+def _normalize_text(value: str) -> str:
+    return _WHITESPACE.sub(" ", _RELATIVE_TIME.sub("", value)).strip()
+
+
+def _normalize_data(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _normalize_data(v) for k, v in value.items() if k not in _VOLATILE_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [_normalize_data(v) for v in value]
+    if isinstance(value, str):
+        return _normalize_text(value)
+    return value
+
+
+def fingerprint_key(product_id: str, region: str = DEFAULT_REGION) -> str:
+    """Store key of ``product_id`` in ``region`` (the bare id for the default region)."""
+    return product_id if region == DEFAULT_REGION else f"{product_id}@{region}"
+
+
+def payload_fingerprint(payload: Any) -> str:
+    """Return the hex SHA-256 of ``payload`` after normalisation.
+
+    ``payload`` is either page HTML or JSON-like data (offers XHR payload,
+    raw extraction results or parsed entries).
+    """
+    if isinstance(payload, (bytes, bytearray)):
+        payload = payload.decode("utf-8", errors="replace")
+    if isinstance(payload, str):
+        normalized = _normalize_text(_STRIP_BLOCKS.sub("", payload))
+    else:
+        normalized = json.dumps(_normalize_data(payload), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class FingerprintStore:
+    """Fingerprints kept in the ``page_fingerprints`` table.
+
+    :meth:`check` is called before parsing; matching products are collected
+    in :attr:`unchanged`, new hashes are staged in :attr:`pending`.  Nothing
+    is written until :meth:`save`, which callers invoke once the offers of
+    the staged products have been stored.
+    """
+
+    def __init__(self, engine: Any = None, max_age: timedelta = timedelta(hours=FINGERPRINT_MAX_AGE_HOURS)) -> None:
+        self.engine = engine or db_services.ENGINE
+        self.max_age = max_age
+        self.pending: Dict[str, str] = {}
+        self.unchanged: Set[str] = set()
+        self._known: Optional[Dict[str, tuple]] = None
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    """
+                    CREATE TABLE IF NOT EXISTS page_fingerprints (
+                        product_id TEXT PRIMARY KEY,
+                        hash TEXT NOT NULL,
+                        changed_at TEXT NOT NULL,
+                        last_seen TEXT NOT NULL
+                    )
+                    """
+                )
+            )
+
+    def _load(self) -> Dict[str, tuple]:
+        if self._known is None:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text("SELECT product_id, hash, changed_at FROM page_fingerprints"))
+                self._known = {row[0]: (row[1], row[2]) for row in rows}
+        return self._known
+
+    def check(self, product_id: str, payload: Any) -> bool:
+        """Return ``True`` when ``payload`` matches the stored fingerprint.
+
+        Otherwise the new fingerprint is staged and ``False`` is returned so
+        the caller parses and stores the offers as usual.
+        """
+        fingerprint = payload_fingerprint(payload)
+        known = self._load().get(product_id)
+        if known and known[0] == fingerprint:
+            changed_at = datetime.fromisoformat(known[1])
+            if datetime.now(timezone.utc) - changed_at < self.max_age:
+                self.unchanged.add(product_id)
+                return True
+        self.pending[product_id] = fingerprint
+        return False
+
+    def unchanged_products(self) -> Set[str]:
+        """Product ids with at least one unchanged region in this run."""
+        return {key.split("@", 1)[0] for key in self.unchanged}
+
+    def discard(self, product_id: str) -> None:
+        """Drop a staged fingerprint, e.g. when the page had no offers."""
+        self.pending.pop(product_id, None)
+
+    def save(self, product_ids: Optional[Iterable[str]] = None) -> None:
+        """Persist staged fingerprints and bump ``last_seen`` of unchanged ones.
+
+        ``product_ids`` limits the staged fingerprints written to those whose
+        offers were actually stored; by default all staged ones are saved.
+        """
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        staged = self.pending if product_ids is None else {
+            pid: self.pending[pid] for pid in product_ids if pid in self.pending
+        }
+        with self.engine.begin() as conn:
+            for pid, fingerprint in staged.items():
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO page_fingerprints (product_id, hash, changed_at, last_seen)
+                        VALUES (:pid, :hash, :now, :now)
+                        ON CONFLICT (product_id) DO UPDATE
+                        SET hash = excluded.hash, changed_at = excluded.changed_at,
+                            last_seen = excluded.last_seen
+                        """
+                    ),
+                    {"pid": pid, "hash": fingerprint, "now": now},
+                )
+            if self.unchanged:
+                conn.execute(
+                    text("UPDATE page_fingerprints SET last_seen = :now WHERE product_id = :pid"),
+                    [{"pid": pid, "now": now} for pid in self.unchanged],
+                )
+        if self._known is not None:
+            self._known.update({pid: (fp, now) for pid, fp in staged.items()})
+        if staged or self.unchanged:
+            logger.info("🧬 Fingerprints: changed=%d, unchanged=%d", len(staged), len(self.unchanged))
+        self.pending.clear()
+        self.unchanged.clear()
+
+
+def get_fingerprint_store() -> Optional[FingerprintStore]:
+    """Return a store for this run, or ``None`` when fingerprints are disabled.
+
+    Fingerprints need the local database, so they are off when offers are
+    sent to ``API_URL``.
+    """
+    if not PAGE_FINGERPRINTS or API_URL:
+        return None
+    return FingerprintStore()
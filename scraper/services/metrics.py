@@ -0,0 +1,186 @@
+"""Prometheus metrics of the scraping hot path.
+
+Histograms of fetch latency, parse time, database write time and offers per
+page plus counters of timeouts and retries, labelled by ``engine``
+(``selenium`` for :mod:`scraper.cli.scrape_all`; ``json``, ``ssr`` or
+``playwright`` – the source of the page – in the async engine; ``pipeline``
+for batched writes) and by ``product`` (``all`` when
+``METRICS_PER_PRODUCT`` is off).
+
+Export is configured by environment variables:
+
+* ``METRICS_PORT`` – serve ``/metrics`` over HTTP while the run lasts,
+* ``METRICS_TEXTFILE`` – write the metrics at the end of the run in the text
+  format read by the node_exporter textfile collector and the Pushgateway,
+* ``METRICS_PUSHGATEWAY`` – push them to a Pushgateway (job ``METRICS_JOB``).
+
+``scrape_all`` runs workers in separate processes; it switches
+``prometheus_client`` to multiprocess mode (:func:`enable_multiprocess`)
+before they start and exports the aggregate from the parent.
+
+Without ``prometheus_client`` every helper is a no-op.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from typing import Optional
+
+from scraper.core.config.config import (
+    METRICS_JOB,
+    METRICS_PER_PRODUCT,
+    METRICS_PORT,
+    METRICS_PUSHGATEWAY,
+    METRICS_TEXTFILE,
+)
+
+try:
+    from prometheus_client import (
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        push_to_gateway,
+        start_http_server,
+        write_to_textfile,
+    )
+    from prometheus_client import values
+    from prometheus_client.multiprocess import MultiProcessCollector
+except ImportError:  # pragma: no cover - optional dependency
+    CollectorRegistry = None
+
+logger = logging.getLogger(__name__)
+
+MULTIPROC_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Przedziały histogramów: czasy w sekundach, liczba ofert na stronie
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40)
+OFFER_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class _NoopMetric:
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+
+if CollectorRegistry is not None:
+    REGISTRY = CollectorRegistry()
+    FETCH_SECONDS = Histogram(
+        "scraper_fetch_seconds", "Time to fetch one product page", ["engine", "product"],
+        buckets=TIME_BUCKETS, registry=REGISTRY,
+    )
+    PARSE_SECONDS = Histogram(
+        "scraper_parse_seconds", "Time to parse offers of one page", ["engine", "product"],
+        buckets=TIME_BUCKETS, registry=REGISTRY,
+    )
+    DB_WRITE_SECONDS = Histogram(
+        "scraper_db_write_seconds", "Time to store offers of one page or batch", ["engine", "product"],
+        buckets=TIME_BUCKETS, registry=REGISTRY,
+    )
+    OFFERS_PER_PAGE = Histogram(
+        "scraper_offers_per_page", "Offers parsed from one page", ["engine", "product"],
+        buckets=OFFER_BUCKETS, registry=REGISTRY,
+    )
+    TIMEOUTS = Counter(
+        "scraper_timeouts_total", "Page loads that timed out", ["engine", "product"], registry=REGISTRY
+    )
+    RETRIES = Counter(
+        "scraper_retries_total", "Product scrapes scheduled for another attempt", ["engine", "product"],
+        registry=REGISTRY,
+    )
+else:  # pragma: no cover - optional dependency
+    REGISTRY = None
+    FETCH_SECONDS = PARSE_SECONDS = DB_WRITE_SECONDS = OFFERS_PER_PAGE = TIMEOUTS = RETRIES = _NoopMetric()
+
+
+def _product(product: Optional[str]) -> str:
+    return str(product) if METRICS_PER_PRODUCT and product else "all"
+
+
+def observe_page(
+    engine: str,
+    product: Optional[str],
+    fetch: Optional[float] = None,
+    parse: Optional[float] = None,
+    db_write: Optional[float] = None,
+    offers: Optional[int] = None,
+) -> None:
+    """Record the measured stages of one page; ``None`` stages are skipped."""
+    labels = (engine, _product(product))
+    if fetch is not None:
+        FETCH_SECONDS.labels(*labels).observe(fetch)
+    if parse is not None:
+        PARSE_SECONDS.labels(*labels).observe(parse)
+    if db_write is not None:
+        DB_WRITE_SECONDS.labels(*labels).observe(db_write)
+    if offers is not None:
+        OFFERS_PER_PAGE.labels(*labels).observe(offers)
+
+
+def count_timeout(engine: str, product: Optional[str]) -> None:
+    TIMEOUTS.labels(engine, _product(product)).inc()
+
+
+def count_retry(engine: str, product: Optional[str]) -> None:
+    RETRIES.labels(engine, _product(product)).inc()
+
+
+def enabled() -> bool:
+    return CollectorRegistry is not None and bool(METRICS_PORT or METRICS_TEXTFILE or METRICS_PUSHGATEWAY)
+
+
+def enable_multiprocess() -> Optional[str]:
+    """Switch to multiprocess mode before workers start; return the directory created.
+
+    Samples are then kept in files under ``PROMETHEUS_MULTIPROC_DIR`` by
+    every process (forked workers inherit the setting) and :func:`export`
+    aggregates them.  The caller removes the directory after exporting.
+    """
+    if not enabled() or os.environ.get(MULTIPROC_ENV):
+        return None
+    directory = tempfile.mkdtemp(prefix="scraper-metrics-")
+    os.environ[MULTIPROC_ENV] = directory
+    # klasa wartości jest wybierana przy imporcie – przełączamy ją dla nowych serii
+    values.ValueClass = values.get_value_class()
+    return directory
+
+
+def _export_registry():
+    if os.environ.get(MULTIPROC_ENV) and os.path.isdir(os.environ[MULTIPROC_ENV]):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def start_exporter() -> None:
+    """Serve ``/metrics`` on ``METRICS_PORT`` (if set) for the rest of the process."""
+    if CollectorRegistry is None or not METRICS_PORT:
+        return
+    try:
+        start_http_server(METRICS_PORT, registry=_export_registry())
+        logger.info("📈 Metryki Prometheus: http://0.0.0.0:%d/metrics", METRICS_PORT)
+    except OSError as exc:
+        logger.warning("⚠️ Nie uruchomiono serwera metryk na porcie %d: %s", METRICS_PORT, exc)
+
+
+def export() -> None:
+    """Write ``METRICS_TEXTFILE`` and push to ``METRICS_PUSHGATEWAY`` if configured."""
+    if CollectorRegistry is None:
+        return
+    registry = _export_registry()
+    if METRICS_TEXTFILE:
+        os.makedirs(os.path.dirname(os.path.abspath(METRICS_TEXTFILE)), exist_ok=True)
+        write_to_textfile(METRICS_TEXTFILE, registry)
+    if METRICS_PUSHGATEWAY:
+        try:
+            push_to_gateway(METRICS_PUSHGATEWAY, job=METRICS_JOB, registry=registry)
+        except OSError as exc:
+            logger.warning("⚠️ Nie wysłano metryk do Pushgateway %s: %s", METRICS_PUSHGATEWAY, exc)
@@ -0,0 +1,163 @@
+"""HTML parser backends for offer lists.
+
+:class:`LxmlOfferParser` builds a tree with ``lxml`` and evaluates XPath
+expressions compiled once at import time.  :class:`RegexOfferParser` keeps the
+original single-regex implementation and is used when ``lxml`` is not
+installed, when ``OFFER_PARSER=regex`` is configured, or when the tree parser
+fails on a document.
+
+Both backends return the entry dictionaries expected by
+:func:`scraper.services.db.insert_prices`.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import urllib.parse
+from typing import Dict, List, Optional
+
+from scraper.core.config.config import OFFER_PARSER
+from scraper.services.price_validator import parse_price_unit
+
+try:  # lxml is optional; the regex backend works without it
+    from lxml import etree, html as lxml_html
+except ImportError:  # pragma: no cover - exercised only without lxml
+    etree = None
+    lxml_html = None
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _clean(text: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def _entry(product_id: str, name: str, address: str, price_text: str, updated: Optional[str]) -> Optional[dict]:
+    try:
+        price, unit = parse_price_unit(price_text)
+    except Exception:  # pragma: no cover - defensive
+        return None
+    return {
+        "product_id": product_id,
+        "name": name,
+        "address": address,
+        "map_url": f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(address)}" if address else "",
+        "updated": updated,
+        "offers": [{"price": price, "unit": unit, "expiration": ""}],
+    }
+
+
+class OfferParser:
+    """Interface implemented by the offer list parsers."""
+
+    name = "base"
+
+    def parse(self, html: str, product_id: str) -> List[dict]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+class RegexOfferParser(OfferParser):
+    """Original regular-expression parser, kept as a dependency-free fallback."""
+
+    name = "regex"
+
+    PATTERN = re.compile(
+        r"<li[^>]*class=\"offer\".*?>.*?"
+        r"<a[^>]*class=\"apteka\"[^>]*>(?P<name>.*?)</a>.*?"
+        r"<p[^>]*class=\"address\"[^>]*>(?P<addr>.*?)</p>.*?"
+        r"<span[^>]*class=\"priceExp\"[^>]*>(?P<price>.*?)</span>"
+        r"(?:.*?<p[^>]*class=\"updated\"[^>]*>(?P<updated>.*?)</p>)?"
+        r".*?</li>",
+        re.S,
+    )
+
+    def parse(self, html: str, product_id: str) -> List[dict]:
+        offers: List[dict] = []
+        for match in self.PATTERN.finditer(html):
+            updated = match.group("updated")
+            entry = _entry(
+                product_id,
+                _clean(match.group("name")),
+                _clean(match.group("addr")),
+                _clean(match.group("price")),
+                _clean(updated) if updated else updated,
+            )
+            if entry:
+                offers.append(entry)
+        return offers
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+class LxmlOfferParser(OfferParser):
+    """Tree-based parser using pre-compiled XPath expressions."""
+
+    name = "lxml"
+
+    if etree is not None:
+        ITEMS = etree.XPath(f"//li[{_has_class('offer')}]")
+        NAME = etree.XPath(f".//a[{_has_class('apteka')}]")
+        ADDRESS = etree.XPath(f".//p[{_has_class('address')}]")
+        PRICE = etree.XPath(f".//span[{_has_class('priceExp')}]")
+        UPDATED = etree.XPath(f".//p[{_has_class('updated')}]")
+
+    def __init__(self) -> None:
+        if etree is None:
+            raise RuntimeError("lxml is required for LxmlOfferParser")
+
+    def parse(self, html: str, product_id: str) -> List[dict]:
+        if not html or not html.strip():
+            return []
+        root = lxml_html.document_fromstring(html)
+        offers: List[dict] = []
+        for item in self.ITEMS(root):
+            name_els = self.NAME(item)
+            address_els = self.ADDRESS(item)
+            price_els = self.PRICE(item)
+            if not (name_els and address_els and price_els):
+                continue
+            updated_els = self.UPDATED(item)
+            entry = _entry(
+                product_id,
+                _clean(name_els[0].text_content()),
+                _clean(address_els[0].text_content()),
+                _clean(price_els[0].text_content()),
+                _clean(updated_els[0].text_content()) if updated_els else None,
+            )
+            if entry:
+                offers.append(entry)
+        return offers
+
+
+_PARSERS: Dict[str, OfferParser] = {}
+
+
+def get_offer_parser(name: Optional[str] = None) -> OfferParser:
+    """Return the parser backend ``name`` (``OFFER_PARSER`` by default).
+
+    Falls back to the regex backend when ``lxml`` is unavailable.
+    """
+    name = (name or OFFER_PARSER).lower()
+    if name == "lxml" and etree is None:
+        logger.warning("lxml not installed – using the regex offer parser")
+        name = "regex"
+    if name not in _PARSERS:
+        _PARSERS[name] = LxmlOfferParser() if name == "lxml" else RegexOfferParser()
+    return _PARSERS[name]
+
+
+def parse_offers(html: str, product_id: str, parser: Optional[OfferParser] = None) -> List[dict]:
+    """Parse ``html`` with ``parser``, retrying with the regex backend on errors."""
+    parser = parser or get_offer_parser()
+    try:
+        return parser.parse(html, product_id)
+    except Exception as exc:
+        if isinstance(parser, RegexOfferParser):
+            raise
+        logger.warning("%s offer parser failed (%s) – falling back to regex", parser.name, exc)
+        return get_offer_parser("regex").parse(html, product_id)
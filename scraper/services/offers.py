@@ -1,119 +1,149 @@
 from __future__ import annotations
 
 import logging
-import random
 import re
 import urllib.parse
-from typing import Callable, List
+from typing import Any, Callable, Dict, List, Optional
 
 from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from backend.models import Product
-from scraper.products.urls import build_regional_url
+from scraper.core.config.config import SCHEDULER_ENABLED
 from scraper.services.db import insert_prices, ENGINE
+from scraper.services.fingerprints import get_fingerprint_store
+from scraper.services.offer_parsers import parse_offers
+from scraper.services.page_archive import get_page_archive
 from scraper.services.price_validator import parse_price_unit
-from scraper.core.constants import USER_AGENTS, DEFAULT_LOCALE, DEFAULT_VIEWPORT
-from scraper.utils.retry import retry_on_timeout
 
 logger = logging.getLogger(__name__)
 
 
-def _default_fetch(url: str) -> str:
-    """Fetch ``url`` using Playwright and return HTML content.
+def _parse_offers(html: str, product_id: str) -> List[dict]:
+    """Return parsed offer entries from ``html`` for ``product_id``.
 
-    The browser waits for ``networkidle`` to ensure that dynamic sections such
-    as ``#stacjonarne`` are fully loaded before the HTML is captured.
+    Expects ``li`` elements carrying the ``offer`` class, containing pharmacy
+    name, address and a ``span.priceExp`` with the price text.  Parsing is
+    delegated to the configured backend in
+    :mod:`scraper.services.offer_parsers`.
     """
-    from playwright.sync_api import sync_playwright
-    
-    with sync_playwright() as p:  # pragma: no cover - network/browser side effect
-        browser = p.firefox.launch(headless=True)
-        context = browser.new_context(
-            user_agent=random.choice(USER_AGENTS),
-            locale=DEFAULT_LOCALE,
-            viewport=DEFAULT_VIEWPORT,
-        )
-        page = context.new_page()
+    return parse_offers(html, product_id)
 
-        def load_page() -> None:
-            page.goto(url)
-            page.wait_for_response(lambda r: re.search(r"(offers|results)", r.url))
-            page.wait_for_load_state("networkidle")
 
-        try:
-            retry_on_timeout(load_page)
-            content = page.content()
-        finally:
-            context.close()
-            browser.close()
-    return content
+def _json_items(data: Any) -> List[dict]:
+    if isinstance(data, list):
+        return [item for item in data if isinstance(item, dict)]
+    if isinstance(data, dict):
+        for key in ("offers", "items", "results", "data"):
+            if key in data:
+                return _json_items(data[key])
+    return []
 
 
-def _parse_offers(html: str, product_id: str) -> List[dict]:
-    """Return parsed offer entries from ``html`` for ``product_id``.
+def _parse_offers_json(data: Any, product_id: str) -> List[dict]:
+    """Return offer entries from the offers XHR payload ``data``.
 
-    The parser is intentionally minimal and expects a structure with ``li``
-    elements carrying the ``offer`` class, containing pharmacy name, address and
-    a ``span.priceExp`` with the price text.
+    The payload is a list of offers (or an object wrapping it under
+    ``offers``/``items``/``results``/``data``).  Offers of the same pharmacy are
+    grouped into one entry so the result has the same shape as
+    :func:`_parse_offers` and :func:`scraper.core.data_extractor.extract_pharmacy_data`.
+    A numeric price without ``unit`` is skipped rather than assumed per gram.
     """
-    offers: List[dict] = []
-    pattern = re.compile(
-        r"<li[^>]*class=\"offer\".*?>.*?"
-        r"<a[^>]*class=\"apteka\"[^>]*>(?P<name>.*?)</a>.*?"
-        r"<p[^>]*class=\"address\"[^>]*>(?P<addr>.*?)</p>.*?"
-        r"<span[^>]*class=\"priceExp\"[^>]*>(?P<price>.*?)</span>"
-        r"(?:.*?<p[^>]*class=\"updated\"[^>]*>(?P<updated>.*?)</p>)?"
-        r".*?</li>",
-        re.S,
-    )
-    for match in pattern.finditer(html):
-        name = re.sub(r"\s+", " ", match.group("name")).strip()
-        address = re.sub(r"\s+", " ", match.group("addr")).strip()
-        price_text = re.sub(r"\s+", " ", match.group("price")).strip()
-        updated = match.group("updated")
-        if updated:
-            updated = re.sub(r"\s+", " ", updated).strip()
+    entries: Dict[tuple, dict] = {}
+    for item in _json_items(data):
+        pharmacy = item.get("pharmacy")
+        if isinstance(pharmacy, dict):
+            name = pharmacy.get("name") or ""
+            address = pharmacy.get("address") or item.get("address") or ""
+        else:
+            name = pharmacy or item.get("pharmacy_name") or item.get("pharmacyName") or item.get("name") or ""
+            address = item.get("address") or ""
+        name = re.sub(r"\s+", " ", str(name)).strip()
+        address = re.sub(r"\s+", " ", str(address)).strip()
+        raw_price = item.get("price")
+        if not name or raw_price in (None, ""):
+            continue
         try:
-            price, unit = parse_price_unit(price_text)
+            if isinstance(raw_price, (int, float)):
+                # bez jednostki nie wiadomo, czy to cena za gram czy za opakowanie
+                if not item.get("unit"):
+                    continue
+                price, unit = float(raw_price), str(item["unit"])
+            else:
+                price, unit = parse_price_unit(str(raw_price))
         except Exception:  # pragma: no cover - defensive
             continue
-        entry = {
-            "product_id": product_id,
-            "name": name,
-            "address": address,
-            "map_url": f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(address)}" if address else "",
-            "updated": updated,
-            "offers": [{"price": price, "unit": unit, "expiration": ""}],
-        }
-        offers.append(entry)
-    return offers
-
-
-def scrape_offers_once(fetch_page: Callable[[str], str] = _default_fetch) -> None:
+        entry = entries.get((name, address))
+        if entry is None:
+            entry = entries[(name, address)] = {
+                "product_id": product_id,
+                "name": name,
+                "address": address,
+                "map_url": f"https://www.google.com/maps/search/?api=1&query={urllib.parse.quote(address)}" if address else "",
+                "availability": item.get("availability"),
+                "updated": item.get("updated") or item.get("updated_at") or item.get("updatedAt"),
+                "offers": [],
+            }
+        entry["offers"].append(
+            {
+                "price": price,
+                "unit": unit,
+                "expiration": (
+                    item.get("expires_at") or item.get("expiresAt") or item.get("expiration") or ""
+                ),
+            }
+        )
+    return list(entries.values())
+
+
+def scrape_offers_once(fetch_page: Optional[Callable[[str], str]] = None) -> None:
     """Scrape offers for all active products once.
 
-    ``fetch_page`` is a callable returning HTML for a given URL, allowing tests
-    to provide a lightweight stub instead of launching a browser.
+    Pages are fetched concurrently by
+    :func:`scraper.services.async_scraper.scrape_products`.  ``fetch_page`` is
+    a callable (or coroutine function) returning HTML for a given URL,
+    allowing tests to provide a lightweight stub instead of launching a
+    browser; by default pages come from the engine's browser pool.
+
+    Products whose page did not change since the last run (see
+    :mod:`scraper.services.fingerprints`) count as seen without re-inserting
+    their offers.  With ``SCHEDULER_ENABLED`` only products due according to
+    :mod:`scraper.services.scheduler` are visited.  Fetched pages are kept
+    in the page archive (:mod:`scraper.services.page_archive`).
     """
+    from scraper.services.async_scraper import _default_fetch, scrape_products
+
     with Session(ENGINE) as session:
         products = session.execute(select(Product).where(Product.active)).scalars().all()
+    if SCHEDULER_ENABLED:
+        from scraper.services.scheduler import due_slugs
+
+        due = set(due_slugs([p.slug for p in products]))
+        products = [p for p in products if p.slug in due]
+
+    fingerprints = get_fingerprint_store()
+    archive = get_page_archive()
+    try:
+        results = scrape_products(
+            [p.slug for p in products],
+            fetch_page=fetch_page or _default_fetch,
+            fingerprints=fingerprints,
+            archive=archive,
+        )
+    finally:
+        if archive is not None:
+            archive.close()
 
-    seen: set[str] = set()
+    seen: set[str] = fingerprints.unchanged_products() if fingerprints else set()
     for product in products:
-        base_url = f"https://www.gdziepolek.pl/produkty/{product.slug}"
-        url = build_regional_url(base_url)
-        try:
-            html = fetch_page(url)
-        except Exception as e:  # pragma: no cover - network failure
-            logger.error("Failed to fetch %s: %s", url, e)
-            continue
-        entries = _parse_offers(html, product.slug)
+        entries = results.get(product.slug)
         if not entries:
             continue
         seen.add(product.slug)
         for entry in entries:
             insert_prices(entry)
+    if fingerprints:
+        fingerprints.save()
 
     missing = [p.slug for p in products if p.slug not in seen]
     if missing:
@@ -0,0 +1,345 @@
+"""Append-only archive of fetched pages and offline replay.
+
+Every page (or offers JSON payload) a scraper fetches can be appended to a
+:class:`PageArchive`.  Records are compressed one by one (zstd frames when
+``zstandard`` is installed, gzip members otherwise) and appended to segment
+files; a JSON-lines sidecar index (``<segment>.idx``) stores product, region,
+URL, kind, fetch time and the byte range of each record.  Because every
+process writes its own segments, parallel ``scrape_all`` workers never share
+a file, and a crashed writer loses at most the record it was writing.
+
+:func:`replay` streams archived records through the current parsers
+(:func:`scraper.services.offers._parse_offers` for HTML,
+:func:`scraper.services.offers._parse_offers_json` for JSON and
+:func:`scraper.core.data_extractor.parse_selenium_page` for the MUI pages
+saved by the Selenium scraper, kind ``selenium``) in a process
+pool and hands the resulting entries, stamped with the original fetch time,
+to ``insert_prices`` in chronological order – no browser or network needed.
+
+Archiving is opt-in (``PAGE_ARCHIVE``); segments older than
+``PAGE_ARCHIVE_MAX_AGE_DAYS`` are pruned whenever a run opens the archive.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from scraper.core.config.config import (
+    PAGE_ARCHIVE,
+    PAGE_ARCHIVE_CODEC,
+    PAGE_ARCHIVE_DIR,
+    PAGE_ARCHIVE_MAX_AGE_DAYS,
+    PAGE_ARCHIVE_SEGMENT_MB,
+)
+from scraper.products.urls import region_from_url
+
+try:  # zstandard is optional; gzip is always available
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx"
+_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst archive segments")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _codec_of(segment: str) -> str:
+    return "zstd" if segment.endswith(_EXTENSIONS["zstd"]) else "gzip"
+
+
+@dataclass
+class ArchivedPage:
+    """Index entry of one archived record."""
+
+    segment: str
+    offset: int
+    length: int
+    product_id: str
+    region: str
+    url: str
+    kind: str
+    fetched_at: str
+
+
+class PageArchive:
+    """Writer appending compressed pages to size-bounded segments.
+
+    Parameters
+    ----------
+    root:
+        Archive directory; created on first write.
+    codec:
+        ``"zstd"`` or ``"gzip"``; zstd falls back to gzip when the
+        ``zstandard`` package is missing.
+    segment_bytes:
+        A new segment is started once the current one exceeds this size.
+    """
+
+    def __init__(
+        self,
+        root: str = PAGE_ARCHIVE_DIR,
+        codec: str = PAGE_ARCHIVE_CODEC,
+        segment_bytes: int = int(PAGE_ARCHIVE_SEGMENT_MB * 1024 * 1024),
+    ) -> None:
+        if codec == "zstd" and zstandard is None:
+            logger.debug("zstandard not installed, archiving pages with gzip")
+            codec = "gzip"
+        if codec not in _EXTENSIONS:
+            raise ValueError(f"Unknown archive codec: {codec}")
+        self.root = Path(root)
+        self.codec = codec
+        self.segment_bytes = max(1, segment_bytes)
+        self.pages = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._lock = threading.Lock()
+        self._segment = None
+        self._index = None
+        self._segment_name = ""
+        self._serial = 0
+
+    def __enter__(self) -> "PageArchive":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _open_segment(self) -> None:
+        self._close_segment()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._serial += 1
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        self._segment_name = f"pages-{stamp}-{os.getpid()}-{self._serial}{_EXTENSIONS[self.codec]}"
+        self._segment = open(self.root / self._segment_name, "ab")
+        self._index = open(self.root / (self._segment_name + INDEX_SUFFIX), "a", encoding="utf-8")
+
+    def _close_segment(self) -> None:
+        for handle in (self._segment, self._index):
+            if handle is not None:
+                handle.close()
+        self._segment = self._index = None
+
+    async def append_async(self, *args: Any, **kwargs: Any) -> None:
+        """:meth:`append` in a worker thread, keeping compression off the event loop."""
+        await asyncio.to_thread(self.append, *args, **kwargs)
+
+    def append(
+        self,
+        product_id: str,
+        url: str,
+        payload: Any,
+        kind: str = "html",
+        region: Optional[str] = None,
+        fetched_at: Optional[str] = None,
+    ) -> None:
+        """Store one fetched ``payload`` (text or bytes) for ``product_id``.
+
+        Archiving must never break a scrape, so write errors are logged and
+        swallowed.
+        """
+        data = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+        frame = _compress(data, self.codec)
+        fetched_at = fetched_at or datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            try:
+                if self._segment is None or self._segment.tell() >= self.segment_bytes:
+                    self._open_segment()
+                offset = self._segment.tell()
+                self._segment.write(frame)
+                self._segment.flush()
+                record = ArchivedPage(
+                    segment=self._segment_name,
+                    offset=offset,
+                    length=len(frame),
+                    product_id=str(product_id),
+                    region=region or region_from_url(url),
+                    url=url,
+                    kind=kind,
+                    fetched_at=fetched_at,
+                )
+                self._index.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+                self._index.flush()
+            except OSError as exc:
+                logger.warning("⚠️ Nie udało się zarchiwizować strony %s: %s", url, exc)
+                return
+            self.pages += 1
+            self.raw_bytes += len(data)
+            self.stored_bytes += len(frame)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_segment()
+        if self.pages:
+            logger.info(
+                "🗄️ Archiwum stron: %d stron, %.1f MB → %.1f MB",
+                self.pages,
+                self.raw_bytes / (1024 * 1024),
+                self.stored_bytes / (1024 * 1024),
+            )
+
+
+def prune_segments(root: str = PAGE_ARCHIVE_DIR, max_age_days: float = PAGE_ARCHIVE_MAX_AGE_DAYS) -> int:
+    """Delete segments (with their index) last written over ``max_age_days`` ago.
+
+    Returns the number of removed segments; ``max_age_days <= 0`` keeps all.
+    """
+    if max_age_days <= 0:
+        return 0
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for index_path in Path(root).glob(f"*{INDEX_SUFFIX}"):
+        segment_path = index_path.with_suffix("")
+        try:
+            if max(p.stat().st_mtime for p in (index_path, segment_path) if p.exists()) >= cutoff:
+                continue
+            for path in (segment_path, index_path):
+                path.unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("⚠️ Nie udało się usunąć segmentu archiwum %s: %s", segment_path, exc)
+            continue
+        removed += 1
+    if removed:
+        logger.info("🗄️ Usunięto %d segmentów archiwum starszych niż %g dni", removed, max_age_days)
+    return removed
+
+
+def get_page_archive() -> Optional[PageArchive]:
+    """Return an archive writer for this run, or ``None`` when disabled."""
+    if not PAGE_ARCHIVE:
+        return None
+    prune_segments()
+    return PageArchive()
+
+
+def iter_index(
+    root: str = PAGE_ARCHIVE_DIR,
+    product_ids: Optional[Iterable[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Iterator[ArchivedPage]:
+    """Yield index entries, optionally filtered by product and fetch time.
+
+    ``since``/``until`` are ISO timestamps compared lexically with
+    ``fetched_at`` (``until`` is exclusive).  A truncated last index line left
+    by a crashed writer is skipped.
+    """
+    wanted = {str(p) for p in product_ids} if product_ids else None
+    for index_path in sorted(Path(root).glob(f"*{INDEX_SUFFIX}")):
+        with open(index_path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = ArchivedPage(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue
+                if wanted is not None and record.product_id not in wanted:
+                    continue
+                if since and record.fetched_at < since:
+                    continue
+                if until and record.fetched_at >= until:
+                    continue
+                yield record
+
+
+def read_payload(root: str, record: ArchivedPage) -> bytes:
+    """Return the decompressed payload of ``record``."""
+    with open(Path(root) / record.segment, "rb") as fh:
+        fh.seek(record.offset)
+        frame = fh.read(record.length)
+    return _decompress(frame, _codec_of(record.segment))
+
+
+def parse_record(root: str, record: ArchivedPage) -> Optional[List[dict]]:
+    """Parse one archived record into offer entries (``None`` on failure)."""
+    from scraper.services.offers import _parse_offers, _parse_offers_json
+
+    try:
+        payload = read_payload(root, record).decode("utf-8", errors="replace")
+        if record.kind == "json":
+            entries = _parse_offers_json(json.loads(payload), record.product_id)
+        elif record.kind == "selenium":
+            from scraper.core.data_extractor import parse_selenium_page
+
+            entries = parse_selenium_page(payload, record.product_id, record.url)
+        else:
+            entries = _parse_offers(payload, record.product_id)
+    except Exception as exc:
+        logger.warning("⚠️ Replay %s@%s (%s): %s", record.segment, record.offset, record.url, exc)
+        return None
+    for entry in entries:
+        entry["region"] = record.region
+        entry["fetched_at"] = record.fetched_at
+    return entries
+
+
+@dataclass
+class ReplayStats:
+    pages: int = 0
+    failed: int = 0
+    entries: int = 0
+    offers: int = 0
+
+
+def replay(
+    records: Iterable[ArchivedPage],
+    root: str = PAGE_ARCHIVE_DIR,
+    insert: Optional[Callable[[dict], None]] = None,
+    workers: int = 0,
+    chunksize: int = 16,
+) -> ReplayStats:
+    """Re-parse ``records`` and pass entries to ``insert`` oldest first.
+
+    Parsing runs in a pool of ``workers`` processes (``0``/``1`` parses in
+    this process); inserts stay in the calling process so SQLite sees a
+    single writer.  Without ``insert`` the records are only parsed, which
+    is how a parser change can be checked against history.
+    """
+    records = sorted(records, key=lambda r: (r.fetched_at, r.segment, r.offset))
+    stats = ReplayStats()
+    parse = partial(parse_record, str(root))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = pool.map(parse, records, chunksize=chunksize)
+            _consume(parsed, stats, insert)
+    else:
+        _consume(map(parse, records), stats, insert)
+    return stats
+
+
+def _consume(parsed: Iterable[Optional[List[dict]]], stats: ReplayStats, insert) -> None:
+    for entries in parsed:
+        stats.pages += 1
+        if entries is None:
+            stats.failed += 1
+            continue
+        for entry in entries:
+            stats.entries += 1
+            stats.offers += len(entry.get("offers", []))
+            if insert is not None:
+                insert(entry)
@@ -0,0 +1,309 @@
+"""Staged fetch → parse → persist pipeline connected by bounded queues.
+
+Before, ``scraper.cli.main`` fetched and parsed every page in the event loop
+and only then inserted all offers, one entry per transaction: the database
+waited for the network and parsing competed with fetching for the loop.
+Here each stage has its own workers:
+
+* **fetch** – :func:`scraper.services.async_scraper.scrape_products_async`
+  with a ``sink``; payloads are handed over without parsing,
+* **parse** – a process pool (``parse_workers``; ``0`` parses in a thread)
+  running :func:`parse_page`, at most ``2 * parse_workers`` pages in flight,
+* **persist** – one writer thread collecting entries into batches of
+  ``batch_size`` for :func:`scraper.services.db.insert_prices_batch`.
+
+Stages are connected by ``queue.Queue(maxsize=queue_size)``; a full queue
+blocks the stage before it, so a slow database throttles parsing and parsing
+throttles fetching instead of buffering the whole run in memory.  Progress
+(items per stage and queue depths) is logged every ``log_interval`` seconds
+and a per-stage summary at the end; total runtime approaches that of the
+slowest stage.
+
+With a ``journal`` (:class:`~scraper.services.run_journal.RunJournal`) each
+product/region is recorded once its outcome is final: ``done`` after its
+batch is committed, ``empty`` without offers and ``failed`` when parsing or
+the batch insert fails.  Fingerprints of failed tasks are discarded, so their
+pages are parsed and stored again by the next run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from scraper.core.config.config import (
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_LOG_INTERVAL,
+    PIPELINE_PARSE_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+)
+from scraper.services.fingerprints import FingerprintStore, fingerprint_key
+from scraper.services.metrics import observe_page
+from scraper.services.page_archive import PageArchive
+from scraper.services.run_journal import RunJournal
+from scraper.services.tracing import attached, capture, record_span
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def parse_page(slug: str, region: str, payload: Union[str, List[dict]]) -> Tuple[List[dict], float]:
+    """Parse one payload into region-tagged entries; also return the CPU time."""
+    from scraper.services.offers import _parse_offers
+
+    started = time.perf_counter()
+    entries = payload if isinstance(payload, list) else _parse_offers(payload, slug)
+    for entry in entries:
+        entry["region"] = region
+    return entries, time.perf_counter() - started
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    busy: float = 0.0
+    max_depth: int = 0
+
+    def line(self, elapsed: float) -> str:
+        rate = self.items / elapsed if elapsed else 0.0
+        return f"{self.name}: {self.items} ({rate:.1f}/s, busy {self.busy:.1f}s, max queue {self.max_depth})"
+
+
+@dataclass
+class PipelineReport:
+    fetched: Set[str] = field(default_factory=set)
+    with_offers: Set[str] = field(default_factory=set)
+    failed: Set[str] = field(default_factory=set)
+    offers: int = 0
+    rows: int = 0
+    elapsed: float = 0.0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+
+    @property
+    def without_offers(self) -> Set[str]:
+        """Fetched products that had no offers in any region."""
+        return self.fetched - self.with_offers - self.failed
+
+
+def run_pipeline(
+    slugs: Iterable[str],
+    fetch_page: Optional[Callable] = None,
+    fingerprints: Optional[FingerprintStore] = None,
+    archive: Optional[PageArchive] = None,
+    parse_workers: int = PIPELINE_PARSE_WORKERS,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    batch_size: int = PIPELINE_BATCH_SIZE,
+    insert_batch: Optional[Callable[[List[dict]], int]] = None,
+    log_interval: float = PIPELINE_LOG_INTERVAL,
+    journal: Optional[RunJournal] = None,
+    **engine_kwargs,
+) -> PipelineReport:
+    """Scrape, parse and store offers of ``slugs`` in overlapping stages.
+
+    ``fetch_page`` and ``engine_kwargs`` are passed to the async engine;
+    ``insert_batch`` defaults to :func:`insert_prices_batch`.  Products whose
+    payload is unchanged (``fingerprints``) never enter the pipeline.
+    """
+    from scraper.services.async_scraper import _default_fetch, scrape_products_async
+
+    if insert_batch is None:
+        from scraper.services.db import insert_prices_batch as insert_batch
+
+    report = PipelineReport(
+        stages={name: StageStats(name) for name in ("fetch", "parse", "persist")}
+    )
+    fetch_stats, parse_stats, persist_stats = report.stages.values()
+    parse_q: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+    write_q: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+    stop_monitor = threading.Event()
+    started = time.perf_counter()
+
+    def depth(q: "queue.Queue", stats: StageStats) -> int:
+        size = q.qsize()
+        stats.max_depth = max(stats.max_depth, size)
+        return size
+
+    # spany etapów w wątkach mają tego samego rodzica co wywołanie run_pipeline
+    trace_context = capture()
+
+    def put(q: "queue.Queue", item, stats: StageStats) -> None:
+        q.put(item)
+        depth(q, stats)
+
+    def parse_stage() -> None:
+        pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+        in_flight: deque = deque()
+        limit = max(1, 2 * parse_workers)
+
+        def finish(item, result: Callable[[], Tuple[List[dict], float]]) -> None:
+            slug, region, payload = item
+            try:
+                entries, busy = result()
+            except Exception as exc:
+                logger.error("❌ Parsowanie %s (%s) nieudane: %s", slug, region, exc)
+                entries, busy = None, 0.0
+            parse_stats.items += 1
+            parse_stats.busy += busy
+            if entries is not None and isinstance(payload, str):
+                # wpisy z JSON/SSR zmierzył już silnik pobierania
+                offers = sum(len(e.get("offers", [])) for e in entries)
+                observe_page("playwright", slug, parse=busy, offers=offers)
+                record_span(
+                    "scrape.parse", busy, product=slug, region=region, bytes=len(payload), offers=offers
+                )
+            put(write_q, (slug, region, entries), persist_stats)
+
+        try:
+            while True:
+                item = parse_q.get()
+                if item is _DONE:
+                    break
+                if pool is None:
+                    finish(item, lambda: parse_page(*item))
+                    continue
+                in_flight.append((item, pool.submit(parse_page, *item)))
+                while len(in_flight) >= limit:
+                    done_item, future = in_flight.popleft()
+                    finish(done_item, future.result)
+            while in_flight:
+                done_item, future = in_flight.popleft()
+                finish(done_item, future.result)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            write_q.put(_DONE)
+
+    def record(tasks: List[str], status: str, error=None) -> None:
+        if journal is not None:
+            journal.mark_many(tasks, status, error=error)
+
+    def fail(tasks: List[str], error) -> None:
+        if fingerprints is not None:
+            # niezapisane oferty nie mogą zostać uznane za aktualne w kolejnym runie
+            for task in tasks:
+                fingerprints.discard(task)
+        record(tasks, "failed", error)
+
+    def persist_stage() -> None:
+        batch: List[dict] = []
+        batch_tasks: List[str] = []
+
+        def flush() -> None:
+            if not batch:
+                return
+            t0 = time.perf_counter()
+            try:
+                report.rows += insert_batch(list(batch)) or 0
+            except Exception as exc:
+                logger.error("❌ Zapis wsadu %d wpisów nieudany: %s", len(batch), exc)
+                fail(batch_tasks, exc)
+            else:
+                record(batch_tasks, "done")
+            elapsed = time.perf_counter() - t0
+            persist_stats.busy += elapsed
+            observe_page("pipeline", None, db_write=elapsed)
+            persist_stats.items += len(batch)
+            batch.clear()
+            batch_tasks.clear()
+
+        while True:
+            try:
+                item = write_q.get(timeout=1.0)
+            except queue.Empty:
+                flush()
+                continue
+            if item is _DONE:
+                flush()
+                return
+            slug, region, entries = item
+            task = fingerprint_key(slug, region)
+            if entries is None:
+                report.failed.add(slug)
+                fail([task], "parse error")
+                continue
+            if not entries:
+                if fingerprints is not None:
+                    # pusta strona nie może zablokować dezaktywacji w kolejnym runie
+                    fingerprints.discard(task)
+                record([task], "empty")
+                continue
+            report.with_offers.add(slug)
+            report.offers += sum(len(e.get("offers", [])) for e in entries)
+            batch.extend(entries)
+            batch_tasks.append(task)
+            if len(batch) >= batch_size:
+                flush()
+
+    def monitor() -> None:
+        while not stop_monitor.wait(log_interval):
+            logger.info(
+                "📊 Pipeline: fetched=%d parsed=%d stored=%d | parse queue %d/%d, write queue %d/%d",
+                fetch_stats.items,
+                parse_stats.items,
+                persist_stats.items,
+                depth(parse_q, parse_stats),
+                parse_q.maxsize,
+                depth(write_q, persist_stats),
+                write_q.maxsize,
+            )
+
+    def traced(stage: Callable[[], None]) -> Callable[[], None]:
+        def run() -> None:
+            with attached(trace_context):
+                stage()
+
+        return run
+
+    threads = [
+        threading.Thread(target=traced(parse_stage), name="pipeline-parse", daemon=True),
+        threading.Thread(target=traced(persist_stage), name="pipeline-persist", daemon=True),
+        threading.Thread(target=monitor, name="pipeline-monitor", daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    # jeden wątek do blokujących put(), żeby pełna kolejka nie blokowała pętli asyncio
+    handoff = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-handoff")
+
+    async def sink(slug: str, region: str, payload) -> None:
+        report.fetched.add(slug)
+        fetch_stats.items += 1
+        await asyncio.get_running_loop().run_in_executor(handoff, put, parse_q, (slug, region, payload), parse_stats)
+
+    fetch_started = time.perf_counter()
+    try:
+        asyncio.run(
+            scrape_products_async(
+                list(slugs),
+                fetch_page or _default_fetch,
+                fingerprints=fingerprints,
+                archive=archive,
+                sink=sink,
+                **engine_kwargs,
+            )
+        )
+    finally:
+        fetch_stats.busy = time.perf_counter() - fetch_started
+        handoff.shutdown(wait=True)
+        parse_q.put(_DONE)
+        threads[0].join()
+        threads[1].join()
+        stop_monitor.set()
+        threads[2].join()
+
+    report.elapsed = time.perf_counter() - started
+    logger.info(
+        "🏁 Pipeline w %.1fs – %s",
+        report.elapsed,
+        "; ".join(stats.line(report.elapsed) for stats in report.stages.values()),
+    )
+    return report
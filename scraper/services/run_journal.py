@@ -0,0 +1,165 @@
+"""Crash-safe journal of scrape runs stored next to the scraped data.
+
+A run is a row in ``scrape_runs``; the final outcome of every task (a
+product slug, or ``slug@region`` for other regions) is written to
+``scrape_run_items`` in its own transaction as soon as it is known, so a run
+killed halfway (dead driver, OOM) leaves an exact record of what was done.
+
+With ``resume=True`` :meth:`RunJournal.start` continues the newest run of
+the same kind that did not finish cleanly and started less than
+``RUN_RESUME_WINDOW_HOURS`` ago; its finished tasks (:data:`FINISHED`) are
+then skipped by the caller.  Failed tasks are retried.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.models import ScrapeRun, ScrapeRunItem
+from scraper.core.config.config import RUN_RESUME_WINDOW_HOURS
+
+logger = logging.getLogger(__name__)
+
+# Statusy zadań, których nie powtarzamy przy wznowieniu
+FINISHED = ("done", "empty", "skipped")
+RESUMABLE = ("running", "partial")
+
+runs = ScrapeRun.__table__
+items = ScrapeRunItem.__table__
+
+
+def journal_engine(url: str) -> Engine:
+    """Engine for the journal; SQLite waits for other worker processes' writes."""
+    if url.startswith("sqlite"):
+        return create_engine(url, future=True, connect_args={"timeout": 30})
+    return create_engine(url, future=True)
+
+
+class RunJournal:
+    """Progress of one run of ``kind``; see the module docstring."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        run_id: Optional[int] = None,
+        window_hours: float = RUN_RESUME_WINDOW_HOURS,
+    ) -> None:
+        self.engine = engine
+        self.run_id = run_id
+        self.window = timedelta(hours=window_hours)
+
+    def ensure_tables(self) -> None:
+        """Create the journal tables in databases not managed by Alembic."""
+        runs.create(self.engine, checkfirst=True)
+        items.create(self.engine, checkfirst=True)
+
+    def start(self, kind: str, total: int, resume: bool = False) -> int:
+        """Open a new run, or continue the latest unfinished one with ``resume``."""
+        now = datetime.utcnow()
+        with self.engine.begin() as conn:
+            run_id = None
+            if resume:
+                run_id = conn.execute(
+                    select(runs.c.id)
+                    .where(
+                        runs.c.kind == kind,
+                        runs.c.status.in_(RESUMABLE),
+                        runs.c.started_at >= now - self.window,
+                    )
+                    .order_by(runs.c.started_at.desc(), runs.c.id.desc())
+                    .limit(1)
+                ).scalar()
+            if run_id is not None:
+                conn.execute(
+                    update(runs)
+                    .where(runs.c.id == run_id)
+                    .values(status="running", finished_at=None, total=total, resumed=runs.c.resumed + 1)
+                )
+            else:
+                run_id = conn.execute(
+                    insert(runs).values(kind=kind, status="running", started_at=now, total=total, resumed=0)
+                ).inserted_primary_key[0]
+        self.run_id = run_id
+        done = sum(1 for status in self.statuses().values() if status in FINISHED)
+        if done:
+            logger.info("⏯️ Wznowiono przebieg %s #%d: %d zadań już zakończonych", kind, run_id, done)
+        else:
+            logger.info("📒 Przebieg %s #%d rozpoczęty", kind, run_id)
+        return run_id
+
+    def statuses(self) -> Dict[str, str]:
+        """Return ``{task: status}`` recorded so far in this run."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(select(items.c.task, items.c.status).where(items.c.run_id == self.run_id))
+            return {task: status for task, status in rows}
+
+    def finished(self) -> set:
+        return {task for task, status in self.statuses().items() if status in FINISHED}
+
+    def mark(self, task: str, status: str, attempts: int = 1, error: Optional[str] = None) -> None:
+        self.mark_many([task], status, attempts, error)
+
+    def mark_many(
+        self, tasks: Iterable[str], status: str, attempts: int = 1, error: Optional[str] = None
+    ) -> None:
+        """Record the final ``status`` of ``tasks`` in a single transaction.
+
+        Journal errors are logged, never raised – losing a journal entry
+        only means the task is repeated after a resume.
+        """
+        tasks = list(dict.fromkeys(tasks))
+        if self.run_id is None or not tasks:
+            return
+        values = {
+            "status": status,
+            "attempts": attempts,
+            "error": str(error)[:2000] if error else None,
+            "updated_at": datetime.utcnow(),
+        }
+        try:
+            with self.engine.begin() as conn:
+                existing = set(
+                    conn.execute(
+                        select(items.c.task).where(items.c.run_id == self.run_id, items.c.task.in_(tasks))
+                    ).scalars()
+                )
+                if existing:
+                    conn.execute(
+                        update(items)
+                        .where(items.c.run_id == self.run_id, items.c.task.in_(existing))
+                        .values(**values)
+                    )
+                new = [{"run_id": self.run_id, "task": task, **values} for task in tasks if task not in existing]
+                if new:
+                    conn.execute(insert(items), new)
+        except SQLAlchemyError as exc:
+            logger.warning("⚠️ Nie zapisano postępu %d zadań w dzienniku: %s", len(tasks), exc)
+
+    def finish(self) -> Dict[str, int]:
+        """Close the run with per-status counts; failures keep it resumable."""
+        with self.engine.begin() as conn:
+            counts = dict(
+                conn.execute(
+                    select(items.c.status, func.count())
+                    .where(items.c.run_id == self.run_id)
+                    .group_by(items.c.status)
+                ).all()
+            )
+            failed = counts.get("failed", 0)
+            conn.execute(
+                update(runs)
+                .where(runs.c.id == self.run_id)
+                .values(
+                    status="partial" if failed else "finished",
+                    finished_at=datetime.utcnow(),
+                    succeeded=sum(counts.get(status, 0) for status in FINISHED),
+                    failed=failed,
+                )
+            )
+        return counts
@@ -0,0 +1,283 @@
+"""Volatility-driven revisit scheduling for products.
+
+Each active product gets a revisit interval derived from its price history:
+
+* how often it changed within the last ``window`` (``pharmacy_prices`` rows
+  are only written when something changed, so every distinct ``fetched_at``
+  burst is one change),
+* how long ago it last changed – recently active products are revisited
+  sooner,
+* how many confirmed ``user_alerts`` subscribe to it.
+
+A product is *due* once the time since its last visit reaches that interval;
+the due list is ordered by how overdue each product is.  Products without
+any history are always due.
+
+:func:`simulate` replays recorded change history to compare a policy with
+visiting every product on every run (see ``python -m scraper.cli.schedule``).
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import text
+
+from scraper.core.config.config import (
+    SCHEDULE_MAX_HOURS,
+    SCHEDULE_MIN_HOURS,
+    SCHEDULE_STABILITY,
+    SCHEDULE_WINDOW_DAYS,
+)
+from scraper.services import db as db_services
+
+logger = logging.getLogger(__name__)
+
+# Wiersze zapisane w odstępie mniejszym niż ta wartość należą do jednej zmiany
+CHANGE_MERGE = timedelta(hours=1)
+
+
+@dataclass
+class SchedulePolicy:
+    min_interval: timedelta = timedelta(hours=SCHEDULE_MIN_HOURS)
+    max_interval: timedelta = timedelta(hours=SCHEDULE_MAX_HOURS)
+    stability: float = SCHEDULE_STABILITY
+    window: timedelta = timedelta(days=SCHEDULE_WINDOW_DAYS)
+
+
+@dataclass
+class ProductStats:
+    slug: str
+    changes: List[datetime] = field(default_factory=list)
+    subscribers: int = 0
+    last_visit: Optional[datetime] = None
+
+
+@dataclass
+class DueProduct:
+    slug: str
+    priority: float
+    interval: timedelta
+
+
+def merge_changes(timestamps: Iterable[datetime], gap: timedelta = CHANGE_MERGE) -> List[datetime]:
+    """Collapse row timestamps closer than ``gap`` into single change events."""
+    merged: List[datetime] = []
+    for ts in sorted(timestamps):
+        if not merged or ts - merged[-1] >= gap:
+            merged.append(ts)
+    return merged
+
+
+def _parse_ts(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        ts = value
+    else:
+        try:
+            ts = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone().replace(tzinfo=None)
+    return ts
+
+
+def revisit_interval(stats: ProductStats, now: datetime, policy: SchedulePolicy) -> timedelta:
+    """Return how long ``stats.slug`` may go without a visit."""
+    start = now - policy.window
+    recent = [c for c in stats.changes if start <= c <= now]
+    expected_gap = policy.window / (len(recent) + 1)
+    interval = expected_gap * policy.stability
+    if recent and now - max(recent) < expected_gap:
+        interval /= 2
+    interval /= 1 + math.log1p(stats.subscribers)
+    return max(policy.min_interval, min(policy.max_interval, interval))
+
+
+def build_due_list(
+    products: Iterable[ProductStats],
+    now: Optional[datetime] = None,
+    policy: Optional[SchedulePolicy] = None,
+) -> List[DueProduct]:
+    """Return the products due at ``now``, most overdue first."""
+    now = now or datetime.now()
+    policy = policy or SchedulePolicy()
+    due: List[DueProduct] = []
+    for stats in products:
+        interval = revisit_interval(stats, now, policy)
+        weight = 1 + math.log1p(stats.subscribers)
+        if stats.last_visit is None:
+            due.append(DueProduct(stats.slug, math.inf, interval))
+            continue
+        overdue = (now - stats.last_visit) / interval
+        if overdue >= 1:
+            due.append(DueProduct(stats.slug, overdue * weight, interval))
+    due.sort(key=lambda d: d.priority, reverse=True)
+    return due
+
+
+def load_product_stats(
+    slugs: Sequence[str],
+    engine=None,
+    now: Optional[datetime] = None,
+    window: timedelta = timedelta(days=SCHEDULE_WINDOW_DAYS),
+) -> List[ProductStats]:
+    """Read change history, subscribers and last visits for ``slugs``."""
+    engine = engine or db_services.ENGINE
+    now = now or datetime.now()
+    stats: Dict[str, ProductStats] = {slug: ProductStats(slug) for slug in slugs}
+    since = (now - window).isoformat(timespec="seconds")
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                """
+                SELECT product_id, fetched_at FROM pharmacy_prices
+                WHERE fetched_at >= :since
+                GROUP BY product_id, fetched_at
+                """
+            ),
+            {"since": since},
+        )
+        raw: Dict[str, List[datetime]] = {}
+        for product_id, fetched_at in rows:
+            ts = _parse_ts(fetched_at)
+            if ts is not None and str(product_id) in stats:
+                raw.setdefault(str(product_id), []).append(ts)
+        for slug, timestamps in raw.items():
+            stats[slug].changes = merge_changes(timestamps)
+            stats[slug].last_visit = stats[slug].changes[-1]
+
+        # Tabele opcjonalne: alerty (backend) i odciski stron (scraper)
+        optional_queries = (
+            (
+                "subscribers",
+                """
+                SELECT p.slug, COUNT(*) FROM user_alerts ua
+                JOIN products p ON ua.product_id = p.id
+                WHERE ua.confirmed = 1
+                GROUP BY p.slug
+                """,
+            ),
+            ("last_visit", "SELECT product_id, last_seen FROM page_fingerprints"),
+        )
+        for attr, query in optional_queries:
+            try:
+                result = conn.execute(text(query)).all()
+            except Exception as exc:
+                logger.debug("Scheduler: %s unavailable (%s)", attr, exc)
+                conn.rollback()
+                continue
+            for key, value in result:
+                # klucze odcisków innych regionów mają postać "slug@region"
+                entry = stats.get(str(key).split("@", 1)[0])
+                if entry is None:
+                    continue
+                if attr == "subscribers":
+                    entry.subscribers = int(value)
+                else:
+                    seen = _parse_ts(value)
+                    if seen and (entry.last_visit is None or seen > entry.last_visit):
+                        entry.last_visit = seen
+    return list(stats.values())
+
+
+def due_slugs(slugs: Sequence[str], engine=None, now: Optional[datetime] = None) -> List[str]:
+    """Return the subset of ``slugs`` due for a visit now, in priority order."""
+    due = build_due_list(load_product_stats(slugs, engine, now), now)
+    logger.info("🗓️ Scheduler: %d/%d products due", len(due), len(slugs))
+    return [d.slug for d in due]
+
+
+# --------------------------------------------------------------------------
+# Simulation
+# --------------------------------------------------------------------------
+
+
+@dataclass
+class SimulationResult:
+    label: str
+    pages: int
+    runs: int
+    products: int
+    freshness: float
+    mean_delay: timedelta
+
+    @property
+    def pages_ratio(self) -> float:
+        total = self.runs * self.products
+        return self.pages / total if total else 0.0
+
+
+def simulate(
+    history: Dict[str, List[datetime]],
+    start: datetime,
+    end: datetime,
+    step: timedelta,
+    policy: Optional[SchedulePolicy] = None,
+    subscribers: Optional[Dict[str, int]] = None,
+    label: str = "",
+) -> SimulationResult:
+    """Replay ``history`` (true change times per product) between runs.
+
+    A run happens every ``step``.  With ``policy=None`` every product is
+    visited on every run (today's behaviour).  Otherwise the scheduler only
+    knows what it observed: a change is recorded at the run that visits the
+    product after it happened.
+
+    ``freshness`` is the share of product-runs whose stored state was
+    current after the run; ``mean_delay`` the average time from a change to
+    its detection.
+    """
+    subscribers = subscribers or {}
+    changes = {slug: sorted(ts) for slug, ts in history.items()}
+    known = {
+        slug: ProductStats(
+            slug,
+            changes=[c for c in ts if c < start],
+            subscribers=subscribers.get(slug, 0),
+            last_visit=start - step,
+        )
+        for slug, ts in changes.items()
+    }
+    pages = runs = fresh = detected = 0
+    delay_total = timedelta(0)
+
+    now = start
+    while now <= end:
+        runs += 1
+        if policy is None:
+            visiting = list(known)
+        else:
+            visiting = [d.slug for d in build_due_list(known.values(), now, policy)]
+        for slug in visiting:
+            stats = known[slug]
+            ts = changes[slug]
+            lo, hi = bisect_right(ts, stats.last_visit), bisect_right(ts, now)
+            for change in ts[lo:hi]:
+                delay_total += now - change
+                detected += 1
+            if hi > lo:
+                stats.changes.append(now)
+            stats.last_visit = now
+            pages += 1
+        for slug, stats in known.items():
+            if bisect_right(changes[slug], now) == bisect_right(changes[slug], stats.last_visit):
+                fresh += 1
+        now += step
+
+    return SimulationResult(
+        label=label or ("all" if policy is None else f"stability={policy.stability:g}"),
+        pages=pages,
+        runs=runs,
+        products=len(known),
+        freshness=fresh / (runs * len(known)) if runs and known else 1.0,
+        mean_delay=delay_total / detected if detected else timedelta(0),
+    )
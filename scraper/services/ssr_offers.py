@@ -0,0 +1,164 @@
+"""Read offers from the state JSON embedded in server-rendered pages.
+
+The product pages are rendered by a Next.js-style React app which embeds its
+initial state in the HTML – ``<script id="__NEXT_DATA__">`` or a
+``window.__APOLLO_STATE__``/``__INITIAL_STATE__`` assignment.
+:class:`SsrOffersFetcher` downloads the page with a pooled ``httpx`` client
+(HTTP/2 when the ``h2`` package is installed), extracts that state, finds the
+offers list in it (:func:`find_offers`) and maps it with
+:func:`_parse_offers_json` to the entry dicts
+:func:`~scraper.services.db.insert_prices` expects – no browser process, no
+rendering.
+
+``None`` from :meth:`SsrOffersFetcher.fetch_entries` means the page carries
+no usable state and the caller falls back to Playwright.  After
+``max_misses`` misses without a single hit the fetcher stops trying for the
+rest of the run, so a site without SSR state costs only a few requests.
+"""
+
+from __future__ import annotations
+
+import html as html_lib
+import json
+import logging
+import re
+from typing import Any, List, Optional
+
+import httpx
+
+from scraper.core.config.config import SCRAPE_HTTP2, SSR_MAX_MISSES
+from scraper.core.constants import DEFAULT_LOCALE, USER_AGENTS
+from scraper.services.offers import _parse_offers_json
+
+try:  # HTTP/2 w httpx wymaga pakietu h2
+    import h2  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+logger = logging.getLogger(__name__)
+
+_NEXT_DATA = re.compile(
+    r"<script[^>]*\bid=[\"']__NEXT_DATA__[\"'][^>]*>(.*?)</script>", re.S | re.I
+)
+_STATE_ASSIGNMENT = re.compile(
+    r"window\.(?:__APOLLO_STATE__|__INITIAL_STATE__|__PRELOADED_STATE__|__NUXT__)\s*=\s*"
+)
+# Tylko klucze apteki – sama para name/price pasuje też do wariantów, produktów
+# powiązanych czy reklam zapisanych w stanie strony
+_PHARMACY_KEYS = ("pharmacy", "pharmacy_name", "pharmacyName")
+
+
+def extract_state(page: str) -> Optional[Any]:
+    """Return the embedded state JSON of ``page`` or ``None``."""
+    match = _NEXT_DATA.search(page)
+    if match:
+        try:
+            return json.loads(html_lib.unescape(match.group(1)))
+        except ValueError:
+            pass
+    decoder = json.JSONDecoder()
+    for match in _STATE_ASSIGNMENT.finditer(page):
+        try:
+            return decoder.raw_decode(page, match.end())[0]
+        except ValueError:
+            continue
+    return None
+
+
+def _is_pharmacy_offer(item: Any) -> bool:
+    """Whether ``item`` carries a price, a pharmacy and the pharmacy address."""
+    if not isinstance(item, dict) or "price" not in item:
+        return False
+    pharmacy = item.get("pharmacy")
+    if isinstance(pharmacy, dict):
+        return bool(pharmacy.get("name")) and bool(pharmacy.get("address") or item.get("address"))
+    return any(item.get(key) for key in _PHARMACY_KEYS) and bool(item.get("address"))
+
+
+def _offer_lists(value: Any):
+    """Yield the pharmacy offers of every list that contains some."""
+    if isinstance(value, list):
+        offers = [item for item in value if _is_pharmacy_offer(item)]
+        if offers:
+            yield offers
+        for item in value:
+            yield from _offer_lists(item)
+    elif isinstance(value, dict):
+        for child in value.values():
+            yield from _offer_lists(child)
+
+
+def find_offers(state: Any) -> List[dict]:
+    """Return the raw offers list of ``state`` – the one yielding most offers."""
+    best: List[dict] = []
+    best_count = 0
+    for items in _offer_lists(state):
+        count = sum(len(e["offers"]) for e in _parse_offers_json(items, ""))
+        if count > best_count:
+            best, best_count = items, count
+    return best
+
+
+class SsrOffersFetcher:
+    """Fetch product pages over plain HTTP and parse their embedded state."""
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        max_connections: int = 10,
+        http2: bool = SCRAPE_HTTP2,
+        max_misses: int = SSR_MAX_MISSES,
+        archive=None,
+    ) -> None:
+        self.archive = archive
+        self.max_misses = max_misses
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            timeout=15.0,
+            follow_redirects=True,
+            http2=http2 and HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={
+                "User-Agent": USER_AGENTS[0],
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": DEFAULT_LOCALE,
+            },
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def disabled(self) -> bool:
+        return not self.hits and self.misses >= self.max_misses
+
+    async def fetch_entries(self, page_url: str, product_id: str) -> Optional[List[dict]]:
+        """Return offer entries of ``page_url`` or ``None`` to use the browser."""
+        if self.disabled:
+            return None
+        try:
+            response = await self.client.get(page_url.split("#", 1)[0])
+            response.raise_for_status()
+            state = extract_state(response.text)
+        except httpx.HTTPError as exc:
+            logger.warning("SSR fetch failed for %s: %s", page_url, exc)
+            state = None
+        items = find_offers(state) if state is not None else []
+        entries = _parse_offers_json(items, product_id)
+        if not entries:
+            self.misses += 1
+            if self.disabled:
+                logger.info("SSR state not found on %d pages – using the browser for this run", self.misses)
+            return None
+        self.hits += 1
+        if self.archive is not None:
+            # w archiwum zapisujemy samą listę ofert – replay parsuje ją jak payload XHR
+            await self.archive.append_async(
+                product_id, page_url, json.dumps(items, ensure_ascii=False), kind="json"
+            )
+        return entries
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self.client.aclose()
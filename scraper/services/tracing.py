@@ -0,0 +1,204 @@
+"""Stage-level tracing spans built on the OpenTelemetry API.
+
+``scraper.cli.main`` opens a root span per run with child spans for
+discovery, sync, scraping and statistics; inside the scrape every product
+fetch (``scrape.fetch``), parse (``scrape.parse``), ``insert_prices`` call
+(``db.insert_prices``/``db.insert_prices_batch``) and – once
+:func:`instrument_engine` is applied – every SQL statement (``db.statement``)
+gets its own span with attributes such as offer counts and payload bytes.
+
+Spans are exported when :func:`init_tracing` configures the SDK according to
+``TRACING_EXPORTER``:
+
+* ``console`` – every finished span as JSON on stderr,
+* ``file`` – one JSON span per line appended to ``TRACING_FILE``.
+
+Without ``opentelemetry-api`` every helper is a no-op; with the API but
+without ``opentelemetry-sdk`` spans are created but not recorded, so an
+application that configures its own tracer provider still receives them.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from scraper.core.config.config import TRACING_EXPORTER, TRACING_FILE
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:  # pragma: no cover - optional dependency
+    trace = None
+
+try:
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+except ImportError:  # pragma: no cover - optional dependency
+    TracerProvider = None
+
+logger = logging.getLogger(__name__)
+
+TRACER_NAME = "scraper"
+# Dłuższe zapytania SQL są obcinane w atrybucie db.statement
+MAX_STATEMENT_LENGTH = 500
+
+_provider = None
+_trace_file = None
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _tracer():
+    return trace.get_tracer(TRACER_NAME)
+
+
+def _attributes(attributes: dict) -> dict:
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Run the block inside a span named ``name``; ``None`` attributes are dropped."""
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    with _tracer().start_as_current_span(name, attributes=_attributes(attributes)) as current:
+        yield current
+
+
+def record_span(name: str, duration: float, **attributes: Any) -> None:
+    """Record a span of ``duration`` seconds that has just ended.
+
+    Used for work measured elsewhere, e.g. parsing in a worker process whose
+    CPU time is reported back to the pipeline.
+    """
+    if trace is None:
+        return
+    end = time.time_ns()
+    current = _tracer().start_span(
+        name, start_time=end - int(duration * 1e9), attributes=_attributes(attributes)
+    )
+    current.end(end_time=end)
+
+
+def capture() -> Optional[Any]:
+    """Return the active context to continue it in another thread."""
+    return otel_context.get_current() if trace is not None else None
+
+
+@contextmanager
+def attached(ctx: Optional[Any]) -> Iterator[None]:
+    """Make ``ctx`` from :func:`capture` the parent of spans opened in the block."""
+    if trace is None or ctx is None:
+        yield
+        return
+    token = otel_context.attach(ctx)
+    try:
+        yield
+    finally:
+        otel_context.detach(token)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    current = _tracer().start_span(
+        "db.statement",
+        attributes={
+            "db.system": conn.engine.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            "db.executemany": bool(executemany),
+        },
+    )
+    context._scraper_span = current
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    current = getattr(context, "_scraper_span", None)
+    if current is None:
+        return
+    if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+        current.set_attribute("db.rows", cursor.rowcount)
+    current.end()
+    context._scraper_span = None
+
+
+def _on_error(exception_context) -> None:
+    context = exception_context.execution_context
+    current = getattr(context, "_scraper_span", None) if context is not None else None
+    if current is None:
+        return
+    current.record_exception(exception_context.original_exception)
+    current.set_status(Status(StatusCode.ERROR))
+    current.end()
+    context._scraper_span = None
+
+
+def instrument_engine(engine) -> None:
+    """Open a ``db.statement`` span around every statement run by ``engine``."""
+    if trace is None or getattr(engine, "_scraper_traced", False):
+        return
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", _before_execute)
+    event.listen(engine, "after_cursor_execute", _after_execute)
+    event.listen(engine, "handle_error", _on_error)
+    engine._scraper_traced = True
+
+
+def init_tracing(exporter: str = TRACING_EXPORTER, path: str = TRACING_FILE) -> bool:
+    """Configure the tracer provider for ``exporter``; return whether spans are exported."""
+    global _provider, _trace_file
+    if not exporter:
+        return False
+    if trace is None or TracerProvider is None:
+        logger.warning("⚠️ TRACING_EXPORTER=%s wymaga pakietów opentelemetry-api i opentelemetry-sdk", exporter)
+        return False
+    if _provider is not None:
+        return True
+    if exporter == "file":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        _trace_file = open(path, "a", encoding="utf-8")
+        span_exporter = ConsoleSpanExporter(
+            out=_trace_file, formatter=lambda finished: finished.to_json(indent=None) + "\n"
+        )
+    elif exporter == "console":
+        span_exporter = ConsoleSpanExporter(out=sys.stderr)
+    else:
+        logger.warning("⚠️ Nieznany TRACING_EXPORTER=%s – śledzenie wyłączone", exporter)
+        return False
+    _provider = TracerProvider(resource=Resource.create({"service.name": TRACER_NAME}))
+    _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    trace.set_tracer_provider(_provider)
+    logger.info("🧭 Śledzenie etapów włączone (%s)", path if exporter == "file" else exporter)
+    return True
+
+
+def shutdown() -> None:
+    """Flush pending spans and close the trace file."""
+    global _provider, _trace_file
+    if _provider is not None:
+        _provider.shutdown()
+    if _trace_file is not None:
+        _trace_file.close()
+        _trace_file = None
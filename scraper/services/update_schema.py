@@ -32,11 +32,33 @@ def update_schema() -> None:
                     availability TEXT,
                     updated TEXT,
                     map_url TEXT,
-                    UNIQUE(product_id, pharmacy_name, price, expiration, fetched_at)
+                    region TEXT DEFAULT 'w-slaskim',
+                    package_grams REAL,
+                    price_per_g REAL,
+                    expiration_date DATE,
+                    UNIQUE(product_id, pharmacy_name, price, expiration, fetched_at, region)
                 );
                 """
             )
 
+            try:
+                c.execute(
+                    "ALTER TABLE pharmacy_prices ADD COLUMN region TEXT DEFAULT 'w-slaskim'"
+                )
+            except sqlite3.OperationalError:
+                pass
+
+            # Wartości znormalizowane przy zapisie (scraper.utils.price_units)
+            for column, column_type in (
+                ("package_grams", "REAL"),
+                ("price_per_g", "REAL"),
+                ("expiration_date", "DATE"),
+            ):
+                try:
+                    c.execute(f"ALTER TABLE pharmacy_prices ADD COLUMN {column} {column_type}")
+                except sqlite3.OperationalError:
+                    pass
+
             # Produkty
             c.execute(
                 """
@@ -107,6 +129,37 @@ def update_schema() -> None:
                 """
             )
 
+            # Dziennik przebiegów scrapowania (wznawianie po awarii)
+            c.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scrape_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    finished_at TEXT,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    succeeded INTEGER,
+                    failed INTEGER,
+                    resumed INTEGER NOT NULL DEFAULT 0
+                );
+                """
+            )
+            c.execute(
+                """
+                CREATE TABLE IF NOT EXISTS scrape_run_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id INTEGER NOT NULL,
+                    task TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 1,
+                    error TEXT,
+                    updated_at TEXT NOT NULL,
+                    UNIQUE(run_id, task)
+                );
+                """
+            )
+
             # Widok najnowszych cen
             c.execute(
                 """
@@ -132,6 +185,15 @@ def update_schema() -> None:
             c.execute(
                 "CREATE INDEX IF NOT EXISTS idx_prices_fetched ON pharmacy_prices(fetched_at DESC);"
             )
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS ix_pharmacy_prices_product_price_per_g ON pharmacy_prices(product_id, price_per_g);"
+            )
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS ix_scrape_runs_kind_started ON scrape_runs(kind, started_at);"
+            )
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS ix_scrape_run_items_run_id ON scrape_run_items(run_id);"
+            )
 
             # Migracja danych produktów z URL-i
             inserted = 0
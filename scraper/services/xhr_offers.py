@@ -0,0 +1,131 @@
+"""Fetch offers straight from the site's JSON (XHR) endpoint.
+
+The product page loads its offers list from an XHR call (see
+``tests/test_xhr_capture.py``).  Once the browser has seen that call for a
+product page, :class:`EndpointStore` remembers its URL and
+:class:`JsonOffersFetcher` requests it directly with a pooled ``httpx``
+client, skipping rendering and HTML parsing entirely.  Any failure makes the
+caller fall back to the browser, which also refreshes the stored endpoint.
+Successful payloads are stored in the optional page ``archive``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from scraper.core.config.config import XHR_ENDPOINTS_FILE
+from scraper.core.constants import DEFAULT_LOCALE, USER_AGENTS
+from scraper.services.offers import _parse_offers_json
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointStore:
+    """Mapping of product page URL to its offers JSON endpoint, kept on disk."""
+
+    def __init__(self, path: Optional[str] = XHR_ENDPOINTS_FILE) -> None:
+        self.path = Path(path) if path else None
+        self._endpoints: Dict[str, str] = {}
+        self._dirty = False
+        if self.path and self.path.exists():
+            try:
+                self._endpoints = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as exc:
+                logger.warning("Ignoring unreadable endpoint cache %s: %s", self.path, exc)
+
+    def __len__(self) -> int:
+        return len(self._endpoints)
+
+    def get(self, page_url: str) -> Optional[str]:
+        return self._endpoints.get(page_url)
+
+    def remember(self, page_url: str, endpoint: str) -> None:
+        if self._endpoints.get(page_url) != endpoint:
+            self._endpoints[page_url] = endpoint
+            self._dirty = True
+
+    def forget(self, page_url: str) -> None:
+        if self._endpoints.pop(page_url, None) is not None:
+            self._dirty = True
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._endpoints, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self.path)
+        self._dirty = False
+
+
+class JsonOffersFetcher:
+    """Request known offers endpoints over a shared HTTP connection pool."""
+
+    def __init__(
+        self,
+        endpoints: Optional[EndpointStore] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        max_connections: int = 10,
+        archive=None,
+    ) -> None:
+        self.archive = archive
+        self.endpoints = endpoints if endpoints is not None else EndpointStore()
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            timeout=10.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections),
+            headers={
+                "User-Agent": USER_AGENTS[0],
+                "Accept": "application/json",
+                "Accept-Language": DEFAULT_LOCALE,
+            },
+        )
+        self.hits = 0
+        self.misses = 0
+
+    async def __aenter__(self) -> "JsonOffersFetcher":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def fetch_entries(self, page_url: str, product_id: str) -> Optional[List[dict]]:
+        """Return offer entries for ``page_url`` or ``None`` to use the browser.
+
+        ``None`` is returned when no endpoint is known, the request fails or
+        the payload yields no offers; failing endpoints are forgotten so the
+        next browser visit can rediscover them.
+        """
+        endpoint = self.endpoints.get(page_url)
+        if not endpoint:
+            self.misses += 1
+            return None
+        try:
+            response = await self.client.get(endpoint, headers={"Referer": page_url})
+            response.raise_for_status()
+            entries = _parse_offers_json(response.json(), product_id)
+        except (httpx.HTTPError, ValueError) as exc:
+            logger.warning("JSON offers endpoint failed for %s: %s", page_url, exc)
+            entries = []
+        if not entries:
+            self.endpoints.forget(page_url)
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.archive is not None:
+            await self.archive.append_async(product_id, page_url, response.content, kind="json")
+        return entries
+
+    def remember(self, page_url: str, endpoint: str) -> None:
+        self.endpoints.remember(page_url, endpoint)
+
+    async def aclose(self) -> None:
+        self.endpoints.save()
+        if self._owns_client:
+            await self.client.aclose()
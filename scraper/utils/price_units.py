@@ -0,0 +1,67 @@
+"""Normalised price values stored with every ``pharmacy_prices`` row.
+
+The API shows prices per gram and flags offers close to expiry.  Deriving
+those from the raw ``unit`` text and ``PACKAGE_SIZES`` on every request cost
+a regex per row, so :func:`price_columns` computes them once at ingest
+(``insert_prices``) and the endpoints read the columns; migration ``0006``
+backfilled older rows with a frozen copy of these helpers.  The same helpers
+back :func:`backend.routes.utils.compute_price_info` for rows whose
+``price_per_g`` is still NULL.
+"""
+
+from __future__ import annotations
+
+import re
+from datetime import date, datetime
+from typing import Dict, Optional, Union
+
+from scraper.core.config.urls import PACKAGE_SIZES
+
+_GRAMS = re.compile(r"(\d+(?:[.,]\d+)?)\s*g")
+
+
+def package_grams(
+    unit: Optional[str], product_id, sizes: Optional[Dict[str, float]] = None
+) -> Optional[float]:
+    """Grams the price refers to: from ``unit`` (``10g``) or the package size in ``sizes``."""
+    match = _GRAMS.search(unit or "")
+    if match:
+        grams = float(match.group(1).replace(",", "."))
+        return grams or None
+    pkg = (PACKAGE_SIZES if sizes is None else sizes).get(str(product_id))
+    return float(pkg) if pkg else None
+
+
+def price_per_gram(price: Optional[float], grams: Optional[float]) -> Optional[float]:
+    if price is None or not grams:
+        return None
+    return float(price) / grams
+
+
+def expiration_date(expiration: Union[str, date, None]) -> Optional[date]:
+    """Parse the scraped expiration (ISO date or datetime); ``None`` if invalid."""
+    if not expiration:
+        return None
+    if isinstance(expiration, datetime):
+        return expiration.date()
+    if isinstance(expiration, date):
+        return expiration
+    try:
+        return datetime.fromisoformat(str(expiration)).date()
+    except ValueError:
+        return None
+
+
+def price_columns(price, unit: Optional[str], product_id, expiration) -> Dict[str, object]:
+    """Values of ``package_grams``, ``price_per_g`` and ``expiration_date`` for one row.
+
+    The date is returned as an ISO string so that the same parameters work
+    with SQLite (text) and PostgreSQL (``DATE``).
+    """
+    grams = package_grams(unit, product_id)
+    exp = expiration_date(expiration)
+    return {
+        "package_grams": grams,
+        "price_per_g": price_per_gram(price, grams),
+        "expiration_date": exp.isoformat() if exp else None,
+    }
@@ -0,0 +1,160 @@
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+
+class RateLimiter:
+    """Space consecutive requests at least ``min_interval`` seconds apart.
+
+    Unlike a fixed sleep after every request, :meth:`wait` only sleeps for
+    whatever remains of the interval since the previous call, so time spent
+    loading and parsing a page already counts towards the politeness delay.
+    ``jitter`` adds a random extra of up to that many seconds.
+    """
+
+    def __init__(
+        self,
+        min_interval: float,
+        jitter: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.min_interval = max(0.0, min_interval)
+        self.jitter = max(0.0, jitter)
+        self._clock = clock
+        self._sleep = sleep
+        self._last: float | None = None
+
+    def wait(self) -> float:
+        """Sleep until the next request is allowed and return the time slept."""
+        now = self._clock()
+        delay = 0.0
+        if self._last is not None:
+            interval = self.min_interval + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+            delay = max(0.0, self._last + interval - now)
+            if delay:
+                self._sleep(delay)
+        self._last = now + delay
+        return delay
+
+
+class SharedTokenBucket:
+    """Token bucket shared by all processes on one host through SQLite.
+
+    Every :meth:`acquire` takes one token from a bucket stored in ``path``;
+    tokens refill at ``rate`` per second up to ``burst``.  The read-modify-write
+    runs in a ``BEGIN IMMEDIATE`` transaction, so concurrent workers are
+    serialised by SQLite's file lock and the combined request rate stays at
+    ``rate`` however many processes are started.
+
+    The rate adapts to the site (AIMD): :meth:`penalize` – called on a 429/503
+    – halves it (not below ``min_rate``), empties the bucket and blocks all
+    workers for ``retry_after`` or ``backoff`` seconds; every :meth:`reward`
+    adds ``recovery * rate`` back until the configured rate is reached.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rate: float,
+        burst: int = 1,
+        min_rate: float = 0.05,
+        backoff: float = 60.0,
+        recovery: float = 0.1,
+        key: str = "default",
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.path = path
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(max(1e-6, min_rate), rate)
+        self.backoff = max(0.0, backoff)
+        self.recovery = max(0.0, recovery)
+        self.key = key
+        self._clock = clock
+        self._sleep = sleep
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS token_bucket ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, "
+                "rate REAL NOT NULL, blocked_until REAL NOT NULL DEFAULT 0)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO token_bucket (key, tokens, updated, rate) VALUES (?, ?, ?, ?)",
+                (key, float(self.burst), self._clock(), rate),
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _state(self, conn: sqlite3.Connection) -> Tuple[float, float, float, float]:
+        tokens, updated, rate, blocked_until = conn.execute(
+            "SELECT tokens, updated, rate, blocked_until FROM token_bucket WHERE key = ?", (self.key,)
+        ).fetchone()
+        # plik mógł zostać utworzony z inną konfiguracją – nie przekraczamy bieżącej
+        rate = min(max(rate, self.min_rate), self.rate)
+        return min(tokens, float(self.burst)), updated, rate, blocked_until
+
+    def _store(self, conn: sqlite3.Connection, tokens: float, updated: float, rate: float, blocked_until: float) -> None:
+        conn.execute(
+            "UPDATE token_bucket SET tokens = ?, updated = ?, rate = ?, blocked_until = ? WHERE key = ?",
+            (tokens, updated, rate, blocked_until, self.key),
+        )
+
+    @property
+    def current_rate(self) -> float:
+        with self._transaction() as conn:
+            return self._state(conn)[2]
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; return the time slept."""
+        slept = 0.0
+        while True:
+            with self._transaction() as conn:
+                tokens, updated, rate, blocked_until = self._state(conn)
+                now = self._clock()
+                tokens = min(float(self.burst), tokens + max(0.0, now - max(updated, blocked_until)) * rate)
+                if now >= blocked_until and tokens >= 1.0:
+                    self._store(conn, tokens - 1.0, now, rate, blocked_until)
+                    return slept
+                self._store(conn, tokens, max(now, updated), rate, blocked_until)
+                wait = max(blocked_until - now, (1.0 - tokens) / rate if tokens < 1.0 else 0.0)
+            # śpimy poza transakcją, żeby nie blokować pozostałych procesów
+            wait = max(wait, 0.001)
+            self._sleep(wait)
+            slept += wait
+
+    def penalize(self, retry_after: Optional[float] = None) -> float:
+        """Slow down after a 429/503; return the new rate."""
+        with self._transaction() as conn:
+            _, _, rate, blocked_until = self._state(conn)
+            now = self._clock()
+            rate = max(self.min_rate, rate / 2)
+            pause = retry_after if retry_after is not None else self.backoff
+            self._store(conn, 0.0, now, rate, max(blocked_until, now + pause))
+        return rate
+
+    def reward(self) -> float:
+        """Record a successful request, recovering the rate; return the new rate."""
+        with self._transaction() as conn:
+            tokens, updated, rate, blocked_until = self._state(conn)
+            if rate < self.rate:
+                rate = min(self.rate, rate + self.recovery * self.rate)
+            self._store(conn, tokens, updated, rate, blocked_until)
+        return rate
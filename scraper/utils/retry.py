@@ -1,5 +1,5 @@
 import logging
-from typing import Callable, TypeVar
+from typing import Awaitable, Callable, TypeVar
 
 from selenium.common.exceptions import TimeoutException as SeleniumTimeout
 
@@ -8,6 +8,11 @@ try:  # Playwright is optional in some environments
 except Exception:  # pragma: no cover - fallback if Playwright missing
     PlaywrightTimeout = TimeoutError  # type: ignore
 
+try:  # The async API raises its own TimeoutError class
+    from playwright.async_api import TimeoutError as AsyncPlaywrightTimeout
+except Exception:  # pragma: no cover - fallback if Playwright missing
+    AsyncPlaywrightTimeout = TimeoutError  # type: ignore
+
 T = TypeVar("T")
 
 logger = logging.getLogger(__name__)
@@ -35,3 +40,24 @@ def retry_on_timeout(func: Callable[..., T], max_attempts: int = 3, *args, **kwa
             return result
     # This line should never be reached but satisfies type checkers
     raise RuntimeError("retry_on_timeout exhausted without result")
+
+
+async def async_retry_on_timeout(
+    func: Callable[..., Awaitable[T]], max_attempts: int = 3, *args, **kwargs
+) -> T:
+    """Asynchronous variant of :func:`retry_on_timeout` for coroutine functions."""
+    for attempt in range(1, max_attempts + 1):
+        func_name = getattr(func, "__name__", repr(func))
+        logger.info("Attempt %s/%s for %s", attempt, max_attempts, func_name)
+        try:
+            result = await func(*args, **kwargs)
+        except (AsyncPlaywrightTimeout, PlaywrightTimeout, TimeoutError) as exc:
+            logger.warning(
+                "Timeout on attempt %s/%s for %s: %s", attempt, max_attempts, func_name, exc
+            )
+            if attempt == max_attempts:
+                raise
+        else:
+            logger.info("Attempt %s for %s succeeded", attempt, func_name)
+            return result
+    raise RuntimeError("async_retry_on_timeout exhausted without result")
@@ -1,19 +1,266 @@
-"""Celery worker for running scraper tasks."""
+"""Celery worker for running scraper tasks.
 
-from celery import Celery
+``scraper.run`` starts a task graph instead of one long task, so products
+are spread over every worker connected to the broker::
+
+    discover ─► sync ─► dispatch ─► chord(scrape_product × N) ─► finalize
+
+* ``scraper.discover`` and ``scraper.sync`` run once and pass the active
+  product slugs on,
+* ``scraper.scrape_product`` scrapes one product in all ``SCRAPE_REGIONS``
+  and stores its offers; it is idempotent (inserts are deduplicated), acked
+  late so a killed container gives it back to the broker, and retried with
+  exponential backoff (``SCRAPE_MAX_ATTEMPTS``, ``SCRAPE_RETRY_BACKOFF``),
+* ``scraper.finalize`` is the chord callback: it deactivates products
+  without offers, updates price statistics and checks price alerts.
+
+Each prefork child keeps one event loop and one Playwright browser pool for
+its whole life (``worker_process_init``/``worker_process_shutdown``), so
+browser contexts are reused across ``scrape_product`` tasks instead of a new
+browser being launched per product.  Payload fingerprints and the page
+archive are used exactly as in :mod:`scraper.cli.main`.
+
+Every product outcome is recorded in the run journal
+(:mod:`scraper.services.run_journal`, kind ``celery``).  A chord needs a
+result backend (``CELERY_RESULT_BACKEND``); with ``task_always_eager`` the
+whole graph runs in-process, which is how the tests drive it.
+"""
+
+import asyncio
+import logging
 import os
+from typing import Any, Dict, List, Optional
+
+from celery import Celery, chain, chord, group
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from scraper.core.config.config import SCRAPE_MAX_ATTEMPTS, SCRAPE_RETRY_BACKOFF
+
+logger = logging.getLogger(__name__)
 
 # Broker URL is required for Celery. Redis is assumed by default but can be
 # overridden via the ``CELERY_BROKER_URL`` environment variable.
 celery = Celery(
     "scraper",
     broker=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+    backend=os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1"),
+)
+celery.conf.update(
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
 )
 
 
+class ProductNotFetched(RuntimeError):
+    """No region of the product page could be fetched."""
+
+
+class _ProcessState:
+    """Event loop, browser pool and page archive of one worker process."""
+
+    def __init__(self) -> None:
+        from scraper.core.config.config import SCRAPE_CONCURRENCY
+        from scraper.services.browser_pool import AsyncBrowserPool
+        from scraper.services.page_archive import get_page_archive
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.pool = AsyncBrowserPool(size=SCRAPE_CONCURRENCY)
+        self.archive = get_page_archive()
+
+    def close(self) -> None:
+        try:
+            self.loop.run_until_complete(self.pool.aclose())
+        finally:
+            self.loop.close()
+            asyncio.set_event_loop(None)
+            if self.archive is not None:
+                self.archive.close()
+
+
+_process: Optional[_ProcessState] = None
+
+
+@worker_process_init.connect
+def _open_process_state(**_: Any) -> None:
+    global _process
+    _process = _ProcessState()
+    logger.info("🧱 Pula przeglądarek procesu %d gotowa", os.getpid())
+
+
+@worker_process_shutdown.connect
+def _close_process_state(**_: Any) -> None:
+    global _process
+    if _process is not None:
+        _process.close()
+        _process = None
+
+
+def _scrape(slug: str, regions: List[str], fingerprints) -> Optional[List[dict]]:
+    """Scrape ``slug`` with the process pool.
+
+    Without one (eager mode, the solo pool) a browser pool and an archive
+    are created just for this call.
+    """
+    from scraper.services import async_scraper
+    from scraper.services.page_archive import get_page_archive
+
+    if _process is not None:
+        coro = async_scraper.scrape_products_async(
+            [slug], regions=regions, fingerprints=fingerprints, archive=_process.archive, pool=_process.pool
+        )
+        return _process.loop.run_until_complete(coro).get(slug)
+    archive = get_page_archive()
+    try:
+        results = async_scraper.scrape_products([slug], regions=regions, fingerprints=fingerprints, archive=archive)
+        return results.get(slug)
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+def _journal(run_id: Optional[int]):
+    if run_id is None:
+        return None
+    from scraper.services.db import ENGINE
+    from scraper.services.run_journal import RunJournal
+
+    return RunJournal(ENGINE, run_id)
+
+
+@celery.task(name="scraper.discover")
+def discover() -> List[Dict[str, str]]:
+    """Discover products listed on the category page."""
+    from scraper.products.discovery import discover_products
+
+    return discover_products()
+
+
+@celery.task(name="scraper.sync")
+def sync(discovered: List[Dict[str, str]]) -> List[str]:
+    """Synchronise the product table and return slugs due for scraping."""
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+
+    from backend.models import Product
+    from scraper.core.config.config import SCHEDULER_ENABLED
+    from scraper.services.db import ENGINE, sync_products
+    from scraper.services.scheduler import due_slugs
+
+    sync_products(discovered)
+    with Session(ENGINE) as session:
+        slugs = list(session.execute(select(Product.slug).where(Product.active)).scalars())
+    if SCHEDULER_ENABLED:
+        slugs = due_slugs(slugs)
+    return slugs
+
+
+@celery.task(name="scraper.dispatch")
+def dispatch(slugs: List[str]) -> Optional[str]:
+    """Fan out one ``scrape_product`` task per slug joined by ``finalize``."""
+    from scraper.products.urls import resolve_regions
+    from scraper.core.config.config import SCRAPE_REGIONS
+    from scraper.services.db import ENGINE
+    from scraper.services.run_journal import RunJournal
+
+    journal = RunJournal(ENGINE)
+    journal.ensure_tables()
+    run_id = journal.start("celery", len(slugs) * len(resolve_regions(SCRAPE_REGIONS)))
+    if not slugs:
+        finalize.delay([], run_id)
+        return None
+    logger.info("📤 Rozsyłam %d produktów (przebieg #%d)", len(slugs), run_id)
+    result = chord(group(scrape_product.s(slug, run_id) for slug in slugs))(finalize.s(run_id))
+    return result.id
+
+
+@celery.task(name="scraper.scrape_product", bind=True, max_retries=max(0, SCRAPE_MAX_ATTEMPTS - 1))
+def scrape_product(self, slug: str, run_id: Optional[int] = None) -> Dict[str, object]:
+    """Scrape and store offers of ``slug`` in every configured region.
+
+    Returns ``{"slug", "status", "offers", "rows"}`` with status ``done``,
+    ``empty`` (no offers anywhere), ``unchanged`` (payload fingerprint
+    unchanged since the last run) or ``failed`` once retries are exhausted –
+    a failure never breaks the chord.
+    """
+    from scraper.core.config.config import SCRAPE_REGIONS
+    from scraper.products.urls import resolve_regions
+    from scraper.services.db import insert_prices_batch
+    from scraper.services.fingerprints import fingerprint_key, get_fingerprint_store
+
+    regions = resolve_regions(SCRAPE_REGIONS)
+    tasks = [fingerprint_key(slug, region) for region in regions]
+    journal = _journal(run_id)
+    fingerprints = get_fingerprint_store()
+    try:
+        entries = _scrape(slug, regions, fingerprints)
+        if entries is None and fingerprints is not None and slug in fingerprints.unchanged_products():
+            fingerprints.save(tasks)
+            if journal is not None:
+                journal.mark_many(tasks, "skipped", self.request.retries + 1)
+            return {"slug": slug, "status": "unchanged", "offers": 0, "rows": 0}
+        if entries is None:
+            raise ProductNotFetched(slug)
+        rows = insert_prices_batch(entries) if entries else 0
+        if fingerprints is not None:
+            # odciski zapisujemy dopiero po udanym zapisie ofert
+            fingerprints.save(tasks)
+    except Exception as exc:
+        if self.request.retries < self.max_retries:
+            countdown = SCRAPE_RETRY_BACKOFF * 2 ** self.request.retries
+            logger.warning("🔁 %s: %s – ponowienie za %.0fs", slug, exc, countdown)
+            raise self.retry(exc=exc, countdown=countdown)
+        logger.error("❌ %s nieudany po %d próbach – %s", slug, self.request.retries + 1, exc)
+        if journal is not None:
+            journal.mark_many(tasks, "failed", self.request.retries + 1, exc)
+        return {"slug": slug, "status": "failed", "offers": 0, "rows": 0}
+
+    status = "done" if entries else "empty"
+    if journal is not None:
+        journal.mark_many(tasks, status, self.request.retries + 1)
+    offers = sum(len(entry.get("offers", [])) for entry in entries)
+    return {"slug": slug, "status": status, "offers": offers, "rows": rows}
+
+
+@celery.task(name="scraper.finalize")
+def finalize(results: List[Dict[str, object]], run_id: Optional[int] = None) -> Dict[str, object]:
+    """Chord callback: deactivate empty products, refresh stats, check alerts."""
+    from sqlalchemy import update
+    from sqlalchemy.orm import Session
+
+    from backend.models import Product
+    from scraper.services.db import ENGINE, update_price_stats
+
+    empty = sorted(r["slug"] for r in results if r["status"] == "empty")
+    if empty:
+        with Session(ENGINE) as session:
+            session.execute(update(Product).where(Product.slug.in_(empty)).values(active=False))
+            session.commit()
+        logger.info("🛑 Deactivated %d products without offers", len(empty))
+    update_price_stats()
+    run_alert_check()
+    journal = _journal(run_id)
+    if journal is not None:
+        journal.finish()
+    summary = {
+        "products": len(results),
+        "offers": sum(r["offers"] for r in results),
+        "rows": sum(r["rows"] for r in results),
+        "failed": sorted(r["slug"] for r in results if r["status"] == "failed"),
+        "deactivated": empty,
+    }
+    logger.info("🏁 Przebieg Celery #%s: %s", run_id, summary)
+    return summary
+
+
+def run_alert_check() -> None:
+    from scraper.cli.check_alerts import run
+
+    run()
+
+
 @celery.task(name="scraper.run")
 def run_scraper() -> None:
-    """Execute the main scraping routine as an asynchronous task."""
-    from scraper.cli.scrape_all import main
-
-    main()
+    """Start the discover → sync → per-product fan-out graph."""
+    chain(discover.s(), sync.s(), dispatch.s()).apply_async()
@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+
+
+@pytest.fixture()
+def client(migrated_db):
+    conn = sqlite3.connect(migrated_db)
+    conn.execute("INSERT INTO products (id, slug, name) VALUES (1, 'p1', 'Stored')")
+    for pharmacy, price, unit, grams, per_g in (
+        ("A", 90.0, "10g", 10.0, 9.0),
+        ("B", 40.0, "2g", 2.0, 20.0),
+        ("C", 15.0, "g", None, None),
+    ):
+        conn.execute(
+            """
+            INSERT INTO pharmacy_prices (
+                product_id, pharmacy_name, address, price, unit, expiration, fetched_at,
+                map_url, package_grams, price_per_g, expiration_date
+            ) VALUES (1, ?, 'Addr', ?, ?, '2099-01-01', '2024-01-01T00:00:00', '', ?, ?, '2099-01-01')
+            """,
+            (pharmacy, price, unit, grams, per_g),
+        )
+    conn.commit()
+    conn.close()
+
+    with TestClient(app) as c:
+        yield c
+
+
+def test_product_offers_sorted_by_stored_price_per_g(client):
+    resp = client.get("/api/product/Stored", params={"sort": "price_per_g"})
+    assert resp.status_code == 200
+    offers = resp.json()["offers"]
+    assert [o["pharmacy"] for o in offers] == ["A", "C", "B"]
+    assert offers[0]["price_per_g"] == pytest.approx(9.0)
+    assert "price_per_g" not in offers[1]
+
+
+def test_alerts_use_stored_price_per_g(client, monkeypatch):
+    # recomputing from ``unit`` would now drop price_per_g
+    monkeypatch.setattr("backend.routes.utils.package_grams", lambda *args: None)
+    resp = client.get("/api/alerts_grouped")
+    assert resp.status_code == 200
+    offers = resp.json()[0]["offers"]
+    assert [o["price"] for o in offers if "price_per_g" in o] == [9.0, 20.0]
@@ -16,6 +16,7 @@ os.environ.setdefault(
     "ADMIN_PASSWORD_HASH", bcrypt.hashpw(b"admin", bcrypt.gensalt()).decode()
 )
 os.environ["DB_URL"] = ""
+os.environ.setdefault("PAGE_ARCHIVE", "false")
 os.environ.setdefault("ALERTS_FERNET_KEY", Fernet.generate_key().decode())
 
 from backend import db as backend_db
@@ -0,0 +1,56 @@
+from sqlalchemy import create_engine, text
+
+from scraper.services import db as db_services
+
+
+def _entry(pharmacy, price, region=None):
+    entry = {
+        "product_id": "p1",
+        "name": pharmacy,
+        "address": "ul. Zielona 1",
+        "offers": [{"price": price, "unit": "g", "expiration": "2026-01-01"}],
+    }
+    if region:
+        entry["region"] = region
+    return entry
+
+
+def test_insert_prices_batch_writes_new_rows_once(migrated_db, monkeypatch):
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    monkeypatch.setattr(db_services, "ENGINE", engine)
+    monkeypatch.setattr(db_services, "API_URL", None)
+
+    batch = [_entry("A", 10.0), _entry("A", 10.0), _entry("B", 11.0), _entry("A", 10.0, "w-opolskim")]
+    assert db_services.insert_prices_batch(batch) == 3
+    assert db_services.insert_prices_batch(batch) == 0
+    assert db_services.insert_prices_batch([_entry("A", 9.5), {"name": "C", "offers": []}]) == 1
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT pharmacy_name, price, region FROM pharmacy_prices ORDER BY pharmacy_name, price, region")
+        ).all()
+        products = conn.execute(text("SELECT slug FROM products")).scalars().all()
+
+    assert rows == [
+        ("A", 9.5, "w-slaskim"),
+        ("A", 10.0, "w-opolskim"),
+        ("A", 10.0, "w-slaskim"),
+        ("B", 11.0, "w-slaskim"),
+    ]
+    assert products == ["p1"]
+
+
+def test_insert_prices_batch_counts_only_rows_written_by_fallback(migrated_db, monkeypatch):
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    monkeypatch.setattr(db_services, "ENGINE", engine)
+    monkeypatch.setattr(db_services, "API_URL", None)
+    fetched_at = "2025-01-01T12:00:00"
+    # a concurrent writer stored the same offer under another address
+    concurrent = dict(_entry("A", 10.0), address="ul. Inna 2", fetched_at=fetched_at)
+    assert db_services.insert_prices(concurrent) == 1
+
+    batch = [dict(_entry("A", 10.0), fetched_at=fetched_at), dict(_entry("B", 11.0), fetched_at=fetched_at)]
+    assert db_services.insert_prices_batch(batch) == 1
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM pharmacy_prices")).scalar() == 2
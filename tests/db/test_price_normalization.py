@@ -0,0 +1,56 @@
+import sqlite3
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, text
+
+from scraper.services import db as db_services
+
+COLUMNS = "SELECT package_grams, price_per_g, expiration_date FROM pharmacy_prices ORDER BY id"
+
+
+def _insert_legacy(db_file, price, unit, expiration, product_id=100241):
+    conn = sqlite3.connect(db_file)
+    conn.execute(
+        """
+        INSERT INTO pharmacy_prices (product_id, pharmacy_name, price, unit, expiration, fetched_at)
+        VALUES (?, 'A', ?, ?, ?, '2024-01-01T00:00:00')
+        """,
+        (product_id, price, unit, expiration),
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_insert_prices_stores_normalized_columns(migrated_db, monkeypatch):
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    monkeypatch.setattr(db_services, "ENGINE", engine)
+    monkeypatch.setattr(db_services, "API_URL", None)
+
+    db_services.insert_prices(
+        {
+            "product_id": "p1",
+            "name": "Apteka A",
+            "address": "ul. Zielona 1",
+            "offers": [{"price": 125.0, "unit": "10 G", "expiration": "2026-01-01"}],
+        }
+    )
+
+    with engine.connect() as conn:
+        assert conn.execute(text(COLUMNS)).all() == [(10.0, 12.5, "2026-01-01")]
+
+
+def test_migration_backfills_existing_rows(migrated_db):
+    cfg = Config("backend/alembic.ini")
+    command.downgrade(cfg, "0005_add_scrape_runs")
+    _insert_legacy(migrated_db, 120.0, "g", "2025-06-30")
+    _insert_legacy(migrated_db, 45.0, "5g", "not a date", product_id=1)
+    _insert_legacy(migrated_db, 30.0, "g", None, product_id=1)
+
+    command.upgrade(cfg, "head")
+
+    conn = sqlite3.connect(migrated_db)
+    rows = conn.execute(COLUMNS).fetchall()
+    conn.close()
+    # 100241 is a 10 g package in PACKAGE_SIZES; product 1 has no known size
+    assert rows == [(10.0, 12.0, "2025-06-30"), (5.0, 9.0, None), (None, None, None)]
@@ -0,0 +1,30 @@
+from sqlalchemy import create_engine, text
+
+from scraper.services import db as db_services
+
+
+def _entry(region=None):
+    entry = {
+        "product_id": "p1",
+        "name": "Apteka A",
+        "address": "ul. Zielona 1",
+        "offers": [{"price": 12.5, "unit": "g", "expiration": "2026-01-01"}],
+    }
+    if region:
+        entry["region"] = region
+    return entry
+
+
+def test_insert_prices_stores_region_and_dedups_per_region(migrated_db, monkeypatch):
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    monkeypatch.setattr(db_services, "ENGINE", engine)
+    monkeypatch.setattr(db_services, "API_URL", None)
+
+    db_services.insert_prices(_entry())
+    db_services.insert_prices(_entry())
+    db_services.insert_prices(_entry("w-mazowieckim"))
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT region FROM pharmacy_prices ORDER BY region")).scalars().all()
+
+    assert rows == ["w-mazowieckim", "w-slaskim"]
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text, update
+
+from scraper.services.pipeline import run_pipeline
+from scraper.services.run_journal import RunJournal, runs
+
+
+def _journal(migrated_db, **kwargs):
+    return RunJournal(create_engine(f"sqlite:///{migrated_db}", future=True), **kwargs)
+
+
+def test_resume_continues_interrupted_run(migrated_db):
+    first = _journal(migrated_db)
+    run_id = first.start("scrape_all", 3)
+    first.mark("a", "done")
+    first.mark("b", "failed", attempts=3, error=RuntimeError("driver died"))
+    # proces zabity – brak finish()
+
+    fresh = _journal(migrated_db)
+    assert fresh.start("scrape_all", 3) != run_id
+    fresh.finish()
+
+    resumed = _journal(migrated_db)
+    assert resumed.start("scrape_all", 3, resume=True) == run_id
+    assert resumed.finished() == {"a"}
+    resumed.mark_many(["b", "c"], "done")
+    assert resumed.finish() == {"done": 3}
+
+    with resumed.engine.connect() as conn:
+        row = conn.execute(text("SELECT status, succeeded, failed, resumed FROM scrape_runs WHERE id = :id"), {"id": run_id}).one()
+    assert tuple(row) == ("finished", 3, 0, 1)
+    # zakończonego przebiegu nie wznawiamy
+    assert _journal(migrated_db).start("scrape_all", 3, resume=True) not in (run_id, None)
+
+
+def test_resume_ignores_runs_outside_window(migrated_db):
+    old = _journal(migrated_db)
+    run_id = old.start("main", 1)
+    with old.engine.begin() as conn:
+        conn.execute(update(runs).where(runs.c.id == run_id).values(started_at=datetime.utcnow() - timedelta(hours=30)))
+    assert _journal(migrated_db, window_hours=24).start("main", 1, resume=True) != run_id
+
+
+def test_pipeline_records_outcomes_in_journal(migrated_db):
+    journal = _journal(migrated_db)
+    journal.start("main", 4)
+
+    def fake_fetch(url: str) -> str:
+        if "broken" in url:
+            raise RuntimeError("network down")
+        if "empty" in url:
+            return "<ul></ul>"
+        return (
+            "<ul><li class=\"offer\"><a class=\"apteka\" href=\"/a1\">Apteka A</a>"
+            "<p class=\"address\">ul. Zielona 1</p>"
+            "<div class=\"offers\"><p><span class=\"priceExp\">12,34 zł / g</span></p></div></li></ul>"
+        )
+
+    def insert_batch(entries):
+        if any(e["product_id"] == "bad" for e in entries):
+            raise RuntimeError("db locked")
+        return len(entries)
+
+    run_pipeline(
+        ["p1", "empty", "broken", "bad"],
+        fetch_page=fake_fetch,
+        parse_workers=0,
+        batch_size=1,
+        insert_batch=insert_batch,
+        host_delay=0,
+        regions=["w-slaskim", "w-opolskim"],
+        journal=journal,
+    )
+
+    assert journal.statuses() == {
+        "p1": "done",
+        "p1@w-opolskim": "done",
+        "empty": "empty",
+        "empty@w-opolskim": "empty",
+        "bad": "failed",
+        "bad@w-opolskim": "failed",
+    }
@@ -37,6 +37,9 @@ def test_launch_uses_headless_env(monkeypatch, env_value, expected) -> None:
             def goto(self, url):
                 pass
 
+            def on(self, event, callback):
+                pass
+
             def locator(self, selector):
                 class DummyLocator:
                     def count(self):
@@ -95,7 +98,87 @@ def test_launch_uses_headless_env(monkeypatch, env_value, expected) -> None:
     discovery = importlib.import_module("scraper.products.discovery")
     monkeypatch.setenv("HEADLESS", env_value)
     monkeypatch.setattr(discovery, "sync_playwright", fake_sync_playwright)
+    monkeypatch.setattr(discovery, "DISCOVERY_CACHE_FILE", "")
 
     items = discovery.discover_products()
     assert items == []
     assert captured["headless"] is expected
+
+
+def test_endpoint_discovery_reuses_unchanged_pages(tmp_path) -> None:
+    if discover_products is None:
+        pytest.skip("Playwright is required for product discovery")
+    import httpx
+
+    from scraper.products.discovery import DiscoveryCache, discover_via_endpoint
+
+    listing = {
+        1: {"items": [{"name": "Jaxx", "url": "/produkty/jaxx"}, {"name": "Aurora", "url": "/produkty/aurora"}]},
+        2: {"items": [{"name": "Tilray", "slug": "tilray"}]},
+        3: {"items": []},
+    }
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        requests.append((page, request.headers.get("If-None-Match")))
+        etag = f'"v{page}"'
+        if request.headers.get("If-None-Match") == etag and page == 1:
+            return httpx.Response(304)
+        return httpx.Response(200, json=listing[page], headers={"ETag": etag})
+
+    cache = DiscoveryCache(str(tmp_path / "cache.json"))
+    assert cache.learn_endpoint("https://www.gdziepolek.pl/api/listing?category=susz&page=2", items=2)
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    first = discover_via_endpoint(cache, client)
+    assert sorted(p["slug"] for p in first) == ["aurora", "jaxx", "tilray"]
+    cache.save()
+
+    reloaded = DiscoveryCache(str(tmp_path / "cache.json"))
+    requests.clear()
+    second = discover_via_endpoint(reloaded, client)
+    assert sorted(p["slug"] for p in second) == ["aurora", "jaxx", "tilray"]
+    assert requests[0] == (1, '"v1"')
+    assert second[0]["regional_url"].startswith("https://www.gdziepolek.pl/produkty/")
+
+
+def test_endpoint_discovery_rejects_truncated_listing(tmp_path) -> None:
+    if discover_products is None:
+        pytest.skip("Playwright is required for product discovery")
+    import httpx
+
+    from scraper.products.discovery import DiscoveryCache, discover_via_endpoint
+
+    def page_items(page):
+        return {"items": [{"name": f"P{page}-{i}", "slug": f"p{page}-{i}"} for i in range(20)]}
+
+    broken = {"page": None}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        page = int(request.url.params["page"])
+        if page > 5 or page == broken["page"]:
+            return httpx.Response(200, json={"items": []})
+        return httpx.Response(200, json=page_items(page))
+
+    path = str(tmp_path / "cache.json")
+    cache = DiscoveryCache(path)
+    assert cache.learn_endpoint("https://www.gdziepolek.pl/api/listing?page=2", items=20)
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    full = discover_via_endpoint(cache, client)
+    assert len(full) == 100
+    cache.count = len(full)
+    cache.save()
+
+    # przejściowo pusta strona 3 nie może skończyć listy po 40 produktach
+    broken["page"] = 3
+    cache = DiscoveryCache(path)
+    assert discover_via_endpoint(cache, client) is None
+    assert cache.pages == {}
+
+    # bez zapamiętanych stron ucięcie wykrywa porównanie z poprzednią liczbą produktów
+    assert discover_via_endpoint(cache, client) is None
+
+    # endpoint bez końca listy nie jest wiarygodny
+    broken["page"] = None
+    assert discover_via_endpoint(DiscoveryCache(path), client, max_pages=3) is None
@@ -3,7 +3,14 @@ from typing import Optional
 import pytest
 
 from scraper.products.pvid import extract_pvid
-from scraper.products.urls import build_regional_url
+from scraper.products.urls import (
+    DEFAULT_REGION,
+    REGIONS,
+    build_regional_url,
+    region_from_url,
+    resolve_regions,
+    with_region,
+)
 
 
 @pytest.mark.parametrize(
@@ -65,3 +72,29 @@ def test_build_regional_url_with_auto_pvid() -> None:
         pvid=pvid,
     )
     assert "?pvid=auto123#stacjonarne" in url
+
+
+def test_with_region_swaps_region_segment() -> None:
+    url = "https://www.gdziepolek.pl/produkty/1/x/apteki/w-slaskim?pvid=ab#stacjonarne"
+    moved = with_region(url, "w-mazowieckim")
+    assert moved == "https://www.gdziepolek.pl/produkty/1/x/apteki/w-mazowieckim?pvid=ab#stacjonarne"
+    assert region_from_url(moved) == "w-mazowieckim"
+    assert region_from_url("https://www.gdziepolek.pl/produkty/1/x") == DEFAULT_REGION
+
+
+def test_resolve_regions() -> None:
+    assert resolve_regions(["all"]) == REGIONS
+    assert resolve_regions(["w-opolskim", "nowhere", "w-opolskim"]) == ("w-opolskim",)
+    assert resolve_regions([]) == (DEFAULT_REGION,)
+
+
+def test_resolve_regions_warns_about_unknown_names(caplog) -> None:
+    with caplog.at_level("WARNING", logger="scraper.products.urls"):
+        assert resolve_regions(["w-opolskim", "w-slaski"]) == ("w-opolskim",)
+    assert "w-slaski" in caplog.text
+
+    caplog.clear()
+    with caplog.at_level("WARNING", logger="scraper.products.urls"):
+        resolve_regions(["w-opolskim", "all"])
+        resolve_regions(["w-slaskim"])
+    assert not caplog.records
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+from scraper.services.async_scraper import HostThrottle, scrape_products
+
+OFFER_HTML = (
+    "<ul>"
+    "<li class=\"offer\">"
+    "<a class=\"apteka\" href=\"/a1\">Apteka A</a>"
+    "<p class=\"address\">ul. Zielona 1</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">12,34 zł / g</span></p></div>"
+    "</li>"
+    "</ul>"
+)
+
+
+def test_scrape_products_respects_concurrency_limit():
+    state = {"active": 0, "peak": 0}
+
+    async def fake_fetch(url: str) -> str:
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        return OFFER_HTML
+
+    slugs = [f"p{i}" for i in range(10)]
+    results = scrape_products(slugs, fetch_page=fake_fetch, concurrency=3, host_delay=0)
+
+    assert set(results) == set(slugs)
+    assert all(len(entries) == 1 for entries in results.values())
+    assert state["peak"] == 3
+
+
+def test_scrape_products_accepts_sync_stub_and_skips_failures():
+    def fake_fetch(url: str) -> str:
+        if "broken" in url:
+            raise RuntimeError("network down")
+        if "empty" in url:
+            return "<ul></ul>"
+        return OFFER_HTML
+
+    results = scrape_products(["ok", "empty", "broken"], fetch_page=fake_fetch, host_delay=0)
+
+    assert results["ok"][0]["name"] == "Apteka A"
+    assert results["empty"] == []
+    assert "broken" not in results
+
+
+def test_host_throttle_spaces_requests_per_host():
+    throttle = HostThrottle(per_host=5, delay=0.05)
+    starts = []
+
+    async def hit(url: str) -> None:
+        async with throttle.slot(url):
+            starts.append((url, time.monotonic()))
+
+    async def run() -> None:
+        await asyncio.gather(
+            hit("https://a.example/1"),
+            hit("https://a.example/2"),
+            hit("https://b.example/1"),
+        )
+
+    asyncio.run(run())
+
+    a_times = [t for url, t in starts if "a.example" in url]
+    b_time = next(t for url, t in starts if "b.example" in url)
+    assert a_times[1] - a_times[0] >= 0.045
+    assert b_time - a_times[0] < 0.045
+
+
+def test_scrape_products_fans_out_regions_with_per_region_budget():
+    state = {"active": {}, "peak": {}}
+
+    async def fake_fetch(url: str) -> str:
+        region = url.split("/apteki/")[1].split("#")[0]
+        state["active"][region] = state["active"].get(region, 0) + 1
+        state["peak"][region] = max(state["peak"].get(region, 0), state["active"][region])
+        await asyncio.sleep(0.01)
+        state["active"][region] -= 1
+        return OFFER_HTML
+
+    regions = ["w-slaskim", "w-mazowieckim"]
+    slugs = [f"p{i}" for i in range(6)]
+    results = scrape_products(
+        slugs, fetch_page=fake_fetch, concurrency=4, region_concurrency=1, regions=regions, host_delay=0
+    )
+
+    assert set(results) == set(slugs)
+    assert all(sorted(e["region"] for e in entries) == sorted(regions) for entries in results.values())
+    assert state["peak"] == {"w-slaskim": 1, "w-mazowieckim": 1}
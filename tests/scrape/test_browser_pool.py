@@ -0,0 +1,143 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+from scraper.services.browser_pool import AsyncBrowserPool
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.pages = []
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    launched = []
+
+    class FakeBrowserType:
+        async def launch(self, headless):
+            browser = FakeBrowser()
+            launched.append(browser)
+            return browser
+
+    class FakePlaywright:
+        firefox = FakeBrowserType()
+
+        async def stop(self):
+            pass
+
+    class FakeManager:
+        async def start(self):
+            return FakePlaywright()
+
+    async_api = types.ModuleType("playwright.async_api")
+    async_api.async_playwright = FakeManager
+    monkeypatch.setitem(sys.modules, "playwright.async_api", async_api)
+    return launched
+
+
+def test_pool_reuses_context_until_max_uses(fake_playwright):
+    async def run():
+        pool = AsyncBrowserPool(size=1, max_uses=2)
+        contexts = []
+        for _ in range(3):
+            async with pool.page() as page:
+                contexts.append(page.context)
+                assert not page.closed
+            assert page.closed
+        await pool.aclose()
+        return pool, contexts
+
+    pool, contexts = asyncio.run(run())
+    assert len(fake_playwright) == 1, "browser should be launched once"
+    assert contexts[0] is contexts[1]
+    assert contexts[2] is not contexts[0]
+    assert contexts[0].closed
+    assert pool.pages_served == 3
+    assert pool.contexts_recycled == 1
+
+
+def test_pool_recycles_context_on_error(fake_playwright):
+    async def run():
+        pool = AsyncBrowserPool(size=1, max_uses=10)
+        with pytest.raises(RuntimeError):
+            async with pool.page() as page:
+                broken = page.context
+                raise RuntimeError("boom")
+        assert broken.closed
+
+        async with pool.page() as page:
+            assert page.context is not broken
+        await pool.aclose()
+
+    asyncio.run(run())
+
+
+def test_pool_relaunches_disconnected_browser(fake_playwright):
+    async def run():
+        pool = AsyncBrowserPool(size=1, max_uses=10)
+        async with pool.page():
+            pass
+        fake_playwright[0].connected = False
+        async with pool.page():
+            pass
+        await pool.aclose()
+        return pool
+
+    pool = asyncio.run(run())
+    assert len(fake_playwright) == 2
+    assert pool.browser_launches == 2
+
+
+def test_pool_installs_blocking_route_on_new_contexts(fake_playwright):
+    from scraper.core.resource_blocking import get_blocking_profile
+
+    async def routes(profile):
+        async with AsyncBrowserPool(size=1, max_uses=10, blocking=get_blocking_profile(profile)) as pool:
+            async with pool.page() as page:
+                return page.context.routes
+
+    (pattern, handler), = asyncio.run(routes("standard"))
+    assert pattern == "**/*"
+    assert asyncio.run(routes("off")) == []
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from sqlalchemy import create_engine, text
+
+from scraper.services import db as db_services
+from scraper.services import offers as offers_mod
+from scraper.services.fingerprints import FingerprintStore, payload_fingerprint
+
+PAGE = (
+    "<ul><li class=\"offer\">"
+    "<a class=\"apteka\" href=\"/a1\">Apteka A</a>"
+    "<p class=\"address\">ul. Zielona 1</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">{price} zł / g</span></p></div>"
+    "<p class=\"updated\">{updated}</p>"
+    "</li></ul>{noise}"
+)
+
+
+def _page(price="12,34", updated="2 godziny temu", noise=""):
+    return PAGE.format(price=price, updated=updated, noise=noise)
+
+
+def test_fingerprint_ignores_page_noise_but_not_prices():
+    base = payload_fingerprint(_page())
+    assert payload_fingerprint(_page(updated="5 minut temu")) == base
+    assert payload_fingerprint(_page(noise="<script>var t=123;</script>\n  <!-- x -->")) == base
+    assert payload_fingerprint(_page(price="11,99")) != base
+
+    entries = [{"name": "A", "offers": [{"price": 1.0}], "updated": "now"}]
+    assert payload_fingerprint(entries) == payload_fingerprint([{"offers": [{"price": 1.0}], "name": "A"}])
+
+
+def test_store_stages_until_saved_and_expires(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fp.sqlite'}", future=True)
+    store = FingerprintStore(engine)
+    assert not store.check("p1", _page())
+    assert not store.check("p1", _page())  # nothing saved yet
+    store.save()
+
+    fresh = FingerprintStore(engine)
+    assert fresh.check("p1", _page(updated="wczoraj"))
+    assert not fresh.check("p1", _page(price="9,99"))
+    assert fresh.unchanged == {"p1"}
+    fresh.save([])  # staged change not confirmed by the caller
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT hash FROM page_fingerprints")).scalar_one()
+    assert stored == payload_fingerprint(_page())
+
+    expired = FingerprintStore(engine, max_age=timedelta(0))
+    assert not expired.check("p1", _page())
+
+
+def test_unchanged_page_skips_parsing_and_keeps_product_active(migrated_db, monkeypatch):
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    db_services.ENGINE = engine
+    offers_mod.ENGINE = engine
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO products (slug, name, active) VALUES ('1', 'Prod1', 1)"))
+
+    parsed = []
+    real_parse = offers_mod._parse_offers
+
+    def counting_parse(html, product_id):
+        parsed.append(product_id)
+        return real_parse(html, product_id)
+
+    monkeypatch.setattr("scraper.services.async_scraper._parse_offers", counting_parse)
+    monkeypatch.setattr(offers_mod, "get_fingerprint_store", lambda: FingerprintStore(engine))
+    monkeypatch.setattr(offers_mod, "SCHEDULER_ENABLED", False)
+    insert_calls = []
+    monkeypatch.setattr(offers_mod, "insert_prices", lambda entry: insert_calls.append(entry))
+
+    offers_mod.scrape_offers_once(fetch_page=lambda url: _page())
+    offers_mod.scrape_offers_once(fetch_page=lambda url: _page(updated="3 minuty temu"))
+
+    assert parsed == ["1"]
+    assert len(insert_calls) == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT active FROM products WHERE slug='1'")).scalar_one() == 1
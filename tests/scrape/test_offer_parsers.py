@@ -0,0 +1,57 @@
+import pytest
+
+from scraper.services import offer_parsers
+from scraper.services.offer_parsers import RegexOfferParser, get_offer_parser, parse_offers
+
+HTML = (
+    "<ul>"
+    "<li class=\"offer\">"
+    "<a class=\"apteka\" href=\"/a1\">Apteka   A</a>"
+    "<p class=\"address\">ul. Zielona 1</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">12,34 zł / g</span></p></div>"
+    "<p class=\"updated\">dziś</p>"
+    "</li>"
+    "<li class=\"offer\">"
+    "<a class=\"apteka\" href=\"/a2\">Apteka B</a>"
+    "<p class=\"address\">ul. Polna 2</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">50 zł / 10g</span></p></div>"
+    "</li>"
+    "</ul>"
+)
+
+
+def test_lxml_and_regex_backends_agree():
+    pytest.importorskip("lxml")
+    lxml_entries = get_offer_parser("lxml").parse(HTML, "p1")
+    regex_entries = get_offer_parser("regex").parse(HTML, "p1")
+
+    assert lxml_entries == regex_entries
+    assert [e["name"] for e in lxml_entries] == ["Apteka A", "Apteka B"]
+    assert lxml_entries[0]["updated"] == "dziś"
+    assert lxml_entries[1]["updated"] is None
+    assert lxml_entries[1]["offers"] == [{"price": 50.0, "unit": "10g", "expiration": ""}]
+
+
+def test_lxml_backend_tolerates_extra_classes_and_nesting():
+    pytest.importorskip("lxml")
+    html = (
+        "<li data-x=\"1\" class=\"offer highlighted\">"
+        "<a href=\"/a1\" class=\"apteka link\"><b>Apteka</b> C</a>"
+        "<p class=\"address muted\">ul. Długa 3</p>"
+        "<span class=\"priceExp\">9,99 zł / g</span>"
+        "</li>"
+    )
+    entries = get_offer_parser("lxml").parse(html, "p1")
+
+    assert entries[0]["name"] == "Apteka C"
+    assert entries[0]["offers"][0]["price"] == 9.99
+
+
+def test_parse_offers_falls_back_to_regex_on_parser_error():
+    class BrokenParser(offer_parsers.OfferParser):
+        name = "broken"
+
+        def parse(self, html, product_id):
+            raise ValueError("bad document")
+
+    assert parse_offers(HTML, "p1", parser=BrokenParser()) == RegexOfferParser().parse(HTML, "p1")
@@ -0,0 +1,115 @@
+import json
+import os
+import time
+
+from scraper.services.page_archive import PageArchive, iter_index, prune_segments, read_payload, replay
+
+OFFER_HTML = (
+    "<ul>"
+    "<li class=\"offer\">"
+    "<a class=\"apteka\" href=\"/a1\">Apteka A</a>"
+    "<p class=\"address\">ul. Zielona 1</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">{price} zł / g</span></p></div>"
+    "</li>"
+    "</ul>"
+)
+URL = "https://www.gdziepolek.pl/produkty/{slug}/apteki/{region}#stacjonarne"
+
+
+def test_archive_round_trip_rotates_segments_and_filters(tmp_path):
+    with PageArchive(tmp_path, codec="gzip", segment_bytes=1) as archive:
+        archive.append("p1", URL.format(slug="p1", region="w-slaskim"), "<html>1</html>", fetched_at="2025-05-01T10:00:00")
+        archive.append("p2", URL.format(slug="p2", region="w-opolskim"), "<html>2</html>", fetched_at="2025-05-02T10:00:00")
+        archive.append("p1", URL.format(slug="p1", region="w-slaskim"), b"[]", kind="json", fetched_at="2025-05-03T10:00:00")
+
+    records = list(iter_index(tmp_path))
+    assert len({r.segment for r in records}) == 3
+    assert [r.region for r in records if r.product_id == "p2"] == ["w-opolskim"]
+    assert [read_payload(tmp_path, r) for r in iter_index(tmp_path, ["p1"])] == [b"<html>1</html>", b"[]"]
+    assert [r.product_id for r in iter_index(tmp_path, since="2025-05-02", until="2025-05-03")] == ["p2"]
+
+
+def test_index_skips_truncated_line(tmp_path):
+    with PageArchive(tmp_path, codec="gzip") as archive:
+        archive.append("p1", URL.format(slug="p1", region="w-slaskim"), "<html></html>")
+    index = next(tmp_path.glob("*.idx"))
+    with open(index, "a", encoding="utf-8") as fh:
+        fh.write('{"segment": "pages-')
+    assert [r.product_id for r in iter_index(tmp_path)] == ["p1"]
+
+
+def test_replay_parses_archive_in_chronological_order(tmp_path):
+    with PageArchive(tmp_path, codec="gzip") as archive:
+        archive.append("p1", URL.format(slug="p1", region="w-slaskim"), OFFER_HTML.format(price="13,00"), fetched_at="2025-05-02T08:00:00")
+        archive.append("p1", URL.format(slug="p1", region="w-slaskim"), OFFER_HTML.format(price="12,00"), fetched_at="2025-05-01T08:00:00")
+        payload = json.dumps([{"pharmacy": "Apteka B", "address": "Rynek 1", "price": 9.5, "unit": "g"}])
+        archive.append("p2", URL.format(slug="p2", region="w-opolskim"), payload, kind="json", fetched_at="2025-05-01T09:00:00")
+        archive.append("p3", URL.format(slug="p3", region="w-slaskim"), "not json", kind="json", fetched_at="2025-05-01T09:30:00")
+
+    inserted = []
+    stats = replay(iter_index(tmp_path), tmp_path, insert=inserted.append)
+
+    assert (stats.pages, stats.failed, stats.entries, stats.offers) == (4, 1, 3, 3)
+    assert [(e["product_id"], e["fetched_at"], e["offers"][0]["price"]) for e in inserted] == [
+        ("p1", "2025-05-01T08:00:00", 12.0),
+        ("p2", "2025-05-01T09:00:00", 9.5),
+        ("p1", "2025-05-02T08:00:00", 13.0),
+    ]
+    assert inserted[1]["region"] == "w-opolskim"
+
+
+def test_async_engine_archives_fetched_pages(tmp_path):
+    from scraper.services.async_scraper import scrape_products
+
+    with PageArchive(tmp_path, codec="gzip") as archive:
+        results = scrape_products(
+            ["p1", "p2"], fetch_page=lambda url: OFFER_HTML.format(price="10,00"), host_delay=0, archive=archive
+        )
+
+    assert set(results) == {"p1", "p2"}
+    assert sorted(r.product_id for r in iter_index(tmp_path)) == ["p1", "p2"]
+
+
+SELENIUM_HTML = (
+    "<html><body><ul>"
+    "<li class=\"MuiListItem-root MuiListItem-gutters\">"
+    "<a class=\"MuiTypography-root\" href=\"/apteki/apteka-a\">Apteka A</a>"
+    "<p>Otwarta</p><p>ul. Zielona 1, Katowice</p>"
+    "<div class=\"tss-1oxhpw5-offers\">"
+    "<p><span class=\"tss-1u6comz-priceExp\">{price} zł / g</span></p>"
+    "<p>2 godziny temu</p>"
+    "</div></li>"
+    "<li class=\"MuiListItem-root\"><p>Reklama</p></li>"
+    "</ul></body></html>"
+)
+
+
+def test_replay_parses_archived_selenium_pages(tmp_path):
+    url = URL.format(slug="100241", region="w-slaskim")
+    with PageArchive(tmp_path, codec="gzip") as archive:
+        archive.append("100241", url, SELENIUM_HTML.format(price="45,50"), kind="selenium", fetched_at="2025-05-01T08:00:00")
+
+    inserted = []
+    stats = replay(iter_index(tmp_path), tmp_path, insert=inserted.append)
+
+    assert (stats.pages, stats.failed, stats.entries, stats.offers) == (1, 0, 1, 1)
+    entry = inserted[0]
+    assert (entry["name"], entry["address"], entry["updated"]) == ("Apteka A", "ul. Zielona 1, Katowice", "2 godziny temu")
+    assert entry["href"] == "https://www.gdziepolek.pl/apteki/apteka-a"
+    assert entry["offers"] == [{"expiration": "", "price": 45.5, "unit": "g"}]
+    assert (entry["region"], entry["fetched_at"]) == ("w-slaskim", "2025-05-01T08:00:00")
+
+
+def test_prune_segments_removes_only_old_segments(tmp_path):
+    with PageArchive(tmp_path, codec="gzip", segment_bytes=1) as archive:
+        archive.append("old", URL.format(slug="old", region="w-slaskim"), "<html>old</html>")
+        archive.append("new", URL.format(slug="new", region="w-slaskim"), "<html>new</html>")
+    old = next(r for r in iter_index(tmp_path) if r.product_id == "old")
+    stale = time.time() - 40 * 86400
+    for name in (old.segment, old.segment + ".idx"):
+        os.utime(tmp_path / name, (stale, stale))
+
+    assert prune_segments(str(tmp_path), max_age_days=0) == 0
+    assert prune_segments(str(tmp_path), max_age_days=30) == 1
+    assert [r.product_id for r in iter_index(tmp_path)] == ["new"]
+    assert not (tmp_path / old.segment).exists()
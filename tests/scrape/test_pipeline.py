@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from scraper.services.pipeline import run_pipeline
+
+OFFER_HTML = (
+    "<ul>"
+    "<li class=\"offer\">"
+    "<a class=\"apteka\" href=\"/a1\">Apteka A</a>"
+    "<p class=\"address\">ul. Zielona 1</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">12,34 zł / g</span></p></div>"
+    "</li>"
+    "</ul>"
+)
+
+
+@pytest.mark.parametrize("parse_workers", [0, 2])
+def test_pipeline_parses_and_batches_entries(parse_workers):
+    batches = []
+
+    def fake_fetch(url: str) -> str:
+        if "broken" in url:
+            raise RuntimeError("network down")
+        return "<ul></ul>" if "empty" in url else OFFER_HTML
+
+    slugs = [f"p{i}" for i in range(5)] + ["empty", "broken"]
+    report = run_pipeline(
+        slugs,
+        fetch_page=fake_fetch,
+        parse_workers=parse_workers,
+        batch_size=2,
+        insert_batch=lambda entries: batches.append(entries) or len(entries),
+        host_delay=0,
+        regions=["w-slaskim"],
+    )
+
+    stored = [e for batch in batches for e in batch]
+    assert sorted(e["product_id"] for e in stored) == [f"p{i}" for i in range(5)]
+    assert all(e["region"] == "w-slaskim" for e in stored)
+    assert all(len(batch) <= 2 for batch in batches)
+    assert report.offers == report.rows == 5
+    assert report.without_offers == {"empty"}
+    assert "broken" not in report.fetched
+    assert report.stages["parse"].items == 6
+
+
+def test_pipeline_overlaps_stages_under_backpressure():
+    async def slow_fetch(url: str) -> str:
+        await asyncio.sleep(0.05)
+        return OFFER_HTML
+
+    def slow_insert(entries):
+        time.sleep(0.05)
+        return len(entries)
+
+    started = time.perf_counter()
+    report = run_pipeline(
+        [f"p{i}" for i in range(10)],
+        fetch_page=slow_fetch,
+        parse_workers=0,
+        queue_size=1,
+        batch_size=1,
+        insert_batch=slow_insert,
+        concurrency=1,
+        host_delay=0,
+        regions=["w-slaskim"],
+    )
+    elapsed = time.perf_counter() - started
+
+    assert report.rows == 10
+    # sequential fetch + insert would take ~1.0 s
+    assert elapsed < 0.85
+    assert report.stages["parse"].max_depth <= 1
+    assert report.stages["persist"].max_depth <= 1
+
+
+def test_failed_batch_leaves_fingerprint_unsaved(tmp_path):
+    from sqlalchemy import create_engine
+
+    from scraper.services.fingerprints import FingerprintStore
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'fp.sqlite'}", future=True)
+    store = FingerprintStore(engine)
+
+    def failing_insert(entries):
+        raise RuntimeError("database is locked")
+
+    report = run_pipeline(
+        ["p1"],
+        fetch_page=lambda url: OFFER_HTML,
+        fingerprints=store,
+        parse_workers=0,
+        insert_batch=failing_insert,
+        host_delay=0,
+        regions=["w-slaskim"],
+    )
+    store.save()
+
+    assert report.rows == 0
+    # the next run must parse and store the same page again
+    assert not FingerprintStore(engine).check("p1", OFFER_HTML)
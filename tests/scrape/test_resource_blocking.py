@@ -0,0 +1,114 @@
+import json
+
+from scraper.core.resource_blocking import (
+    ESTIMATED_BYTES,
+    BlockStats,
+    apply_cdp_blocking,
+    collect_cdp_blocked,
+    firefox_preferences,
+    get_blocking_profile,
+    install_route,
+)
+
+
+class FakeRequest:
+    def __init__(self, url, resource_type):
+        self.url = url
+        self.resource_type = resource_type
+
+
+class FakeRoute:
+    def __init__(self):
+        self.action = None
+
+    def abort(self):
+        self.action = "abort"
+
+    def continue_(self):
+        self.action = "continue"
+
+
+class FakeContext:
+    def __init__(self):
+        self.handler = None
+
+    def route(self, pattern, handler):
+        self.handler = handler
+
+    def request(self, url, resource_type):
+        route = FakeRoute()
+        self.handler(route, FakeRequest(url, resource_type))
+        return route.action
+
+
+def test_standard_profile_blocks_assets_but_allows_offers_xhr():
+    profile = get_blocking_profile("standard", allow=[r"offers"])
+    assert profile.should_block("https://cdn.example/logo.png", "image")
+    assert profile.should_block("https://www.google-analytics.com/collect", "xhr")
+    assert profile.should_block("https://maps.googleapis.com/maps/vt?x=1", "fetch")
+    assert not profile.should_block("https://www.gdziepolek.pl/produkty/x", "document")
+    assert not profile.should_block("https://www.gdziepolek.pl/static/app.css", "stylesheet")
+    # allow-list wins even for blocked types and hosts
+    assert not profile.should_block("https://maps.googleapis.com/offers.png", "image")
+
+
+def test_strict_profile_adds_stylesheets_and_off_blocks_nothing():
+    assert get_blocking_profile("strict").should_block("https://x/app.css", "stylesheet")
+    off = get_blocking_profile("off")
+    assert not off.enabled
+    assert not off.should_block("https://x/logo.png", "image")
+    assert get_blocking_profile("bogus").name == "off"
+
+
+def test_route_handler_aborts_and_records_estimated_bytes():
+    context = FakeContext()
+    stats = BlockStats()
+    install_route(context, get_blocking_profile("standard", allow=[r"offers"]), stats)
+
+    assert context.request("https://cdn/a.woff2", "font") == "abort"
+    assert context.request("https://cdn/b.jpg", "image") == "abort"
+    assert context.request("https://www.gdziepolek.pl/api/offers?id=1", "xhr") == "continue"
+
+    assert stats.requests == 2
+    assert stats.bytes_saved == ESTIMATED_BYTES["font"] + ESTIMATED_BYTES["image"]
+    assert stats.by_type == {"font": 1, "image": 1}
+
+
+def test_cdp_blocking_and_performance_log_accounting():
+    class FakeDriver:
+        def __init__(self):
+            self.commands = []
+            self.log = [
+                {"message": json.dumps({"message": {"method": "Network.requestWillBeSent", "params": {"requestId": "1", "type": "Image"}}})},
+                {"message": json.dumps({"message": {"method": "Network.loadingFailed", "params": {"requestId": "1", "blockedReason": "inspector"}}})},
+                {"message": json.dumps({"message": {"method": "Network.loadingFailed", "params": {"requestId": "2", "type": "Font"}}})},
+                {"message": "not json"},
+            ]
+
+        def execute_cdp_cmd(self, cmd, params):
+            self.commands.append((cmd, params))
+
+        def get_log(self, kind):
+            entries, self.log = self.log, []
+            return entries
+
+    driver = FakeDriver()
+    profile = get_blocking_profile("standard")
+    apply_cdp_blocking(driver, profile)
+    (enable, _), (blocked, params) = driver.commands
+    assert (enable, blocked) == ("Network.enable", "Network.setBlockedURLs")
+    assert "*.png*" in params["urls"] and "*google-analytics.com*" in params["urls"]
+
+    stats = BlockStats()
+    collect_cdp_blocked(driver, stats)
+    assert stats.by_type == {"image": 1}
+
+    total = BlockStats()
+    total.merge(stats.as_dict())
+    total.merge(stats)
+    assert total.requests == 2 and total.bytes_saved == 2 * ESTIMATED_BYTES["image"]
+
+
+def test_firefox_preferences_follow_profile():
+    assert firefox_preferences(get_blocking_profile("standard"))["permissions.default.image"] == 2
+    assert firefox_preferences(get_blocking_profile("off")) == {}
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from scraper.services.fingerprints import FingerprintStore
+from scraper.services.scheduler import (
+    ProductStats,
+    SchedulePolicy,
+    build_due_list,
+    load_product_stats,
+    merge_changes,
+    revisit_interval,
+    simulate,
+)
+
+NOW = datetime(2026, 6, 1, 12, 0)
+POLICY = SchedulePolicy(
+    min_interval=timedelta(hours=6),
+    max_interval=timedelta(days=7),
+    stability=0.5,
+    window=timedelta(days=60),
+)
+
+
+def _daily_changes(days):
+    return [NOW - timedelta(days=d) for d in range(days, 0, -1)]
+
+
+def test_volatile_and_subscribed_products_are_revisited_sooner():
+    stable = ProductStats("stable", changes=[NOW - timedelta(days=50)])
+    volatile = ProductStats("volatile", changes=_daily_changes(30))
+    watched = ProductStats("watched", changes=[NOW - timedelta(days=50)], subscribers=5)
+
+    assert revisit_interval(stable, NOW, POLICY) == timedelta(days=7)  # capped
+    assert revisit_interval(volatile, NOW, POLICY) < timedelta(days=1)
+    assert revisit_interval(ProductStats("hot", changes=[NOW - timedelta(hours=h) for h in range(1, 1440, 4)]), NOW, POLICY) == timedelta(hours=6)
+    assert revisit_interval(watched, NOW, POLICY) < revisit_interval(stable, NOW, POLICY)
+
+
+def test_due_list_orders_by_overdue_ratio_and_includes_new_products():
+    products = [
+        ProductStats("fresh-visit", changes=_daily_changes(30), last_visit=NOW - timedelta(hours=1)),
+        ProductStats("volatile", changes=_daily_changes(30), last_visit=NOW - timedelta(days=1)),
+        ProductStats("stable", changes=[NOW - timedelta(days=50)], last_visit=NOW - timedelta(days=8)),
+        ProductStats("stable-recent", changes=[NOW - timedelta(days=50)], last_visit=NOW - timedelta(days=1)),
+        ProductStats("new"),
+    ]
+    due = [d.slug for d in build_due_list(products, NOW, POLICY)]
+    assert due == ["new", "volatile", "stable"]
+
+
+def test_merge_changes_collapses_rows_of_one_run():
+    t = NOW
+    assert merge_changes([t, t + timedelta(seconds=30), t + timedelta(hours=2)]) == [t, t + timedelta(hours=2)]
+
+
+def test_load_product_stats_reads_history_alerts_and_visits(migrated_db):
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO products (id, slug, name, active) VALUES (7, 'p7', 'P7', 1)"))
+        for days in (3, 2, 1):
+            conn.execute(
+                text(
+                    "INSERT INTO pharmacy_prices (product_id, pharmacy_name, price, fetched_at) "
+                    "VALUES ('p7', 'A', 10, :ts)"
+                ),
+                {"ts": (NOW - timedelta(days=days)).isoformat(timespec="seconds")},
+            )
+        conn.execute(text("INSERT INTO user_alerts (product_id, threshold, confirmed) VALUES (7, 40, 1)"))
+        conn.execute(text("INSERT INTO user_alerts (product_id, threshold, confirmed) VALUES (7, 40, 0)"))
+
+    stats, other = load_product_stats(["p7", "other"], engine, now=NOW)
+    assert len(stats.changes) == 3
+    assert stats.subscribers == 1
+    assert stats.last_visit == NOW - timedelta(days=1)
+    assert other.changes == [] and other.last_visit is None
+
+    FingerprintStore(engine)  # creates page_fingerprints
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO page_fingerprints VALUES ('p7', 'h', :ts, :ts)"),
+            {"ts": (NOW - timedelta(hours=2)).isoformat()},
+        )
+    stats, _ = load_product_stats(["p7", "other"], engine, now=NOW)
+    assert stats.last_visit == NOW - timedelta(hours=2)
+
+
+def test_simulation_trades_pages_for_freshness():
+    start = NOW - timedelta(days=30)
+    history = {
+        "volatile": [start + timedelta(days=d, hours=3) for d in range(-30, 30)],
+        **{f"stable{i}": [start - timedelta(days=40)] for i in range(9)},
+    }
+    step = timedelta(days=1)
+    everything = simulate(history, start, NOW, step)
+    adaptive = simulate(history, start, NOW, step, POLICY)
+
+    assert everything.label == "all" and everything.pages_ratio == 1.0
+    assert adaptive.pages < everything.pages / 3
+    assert everything.freshness == 1.0
+    assert adaptive.freshness > 0.9
+    assert adaptive.mean_delay < timedelta(days=1)
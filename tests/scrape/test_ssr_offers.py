@@ -0,0 +1,104 @@
+import json
+
+import httpx
+
+from scraper.services.async_scraper import scrape_products
+from scraper.services.ssr_offers import SsrOffersFetcher, extract_state, find_offers
+
+OFFERS = [
+    {"pharmacy": {"name": "Apteka A", "address": "ul. Zielona 1"}, "price": "12,34 zł / g", "expiresAt": "2026-01-01"},
+    {"pharmacy": {"name": "Apteka B", "address": "ul. Polna 2"}, "price": 15.5, "unit": "g"},
+]
+STATE = {
+    "props": {
+        "pageProps": {
+            "product": {"name": "Jaxx", "variants": [{"name": "10 g", "price": 99}]},
+            "offers": OFFERS,
+        }
+    }
+}
+
+
+def _next_page(state) -> str:
+    return (
+        "<html><head><script src='/app.js'></script></head><body><div id='__next'></div>"
+        f"<script id=\"__NEXT_DATA__\" type=\"application/json\">{json.dumps(state)}</script></body></html>"
+    )
+
+
+def test_extract_state_from_next_data_and_window_assignment():
+    assert extract_state(_next_page(STATE)) == STATE
+    page = f"<script>window.__APOLLO_STATE__ = {json.dumps(STATE)};window.x=1</script>"
+    assert extract_state(page) == STATE
+    assert extract_state("<ul><li class='offer'></li></ul>") is None
+
+
+def test_find_offers_picks_the_largest_offers_list():
+    assert find_offers(STATE) == OFFERS
+    assert find_offers({"props": {}}) == []
+
+
+def _fetcher(handler, **kwargs):
+    return SsrOffersFetcher(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs)
+
+
+def test_ssr_state_skips_browser_and_missing_state_falls_back():
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        if "p1" in request.url.path:
+            return httpx.Response(200, text=_next_page(STATE))
+        return httpx.Response(200, text="<html><body>client-side only</body></html>")
+
+    fetcher = _fetcher(handler)
+    fetched = []
+
+    def fake_fetch(url: str) -> str:
+        fetched.append(url)
+        return "<ul></ul>"
+
+    results = scrape_products(
+        ["p1", "p2"], fetch_page=fake_fetch, host_delay=0, ssr_fetcher=fetcher, regions=["w-slaskim"]
+    )
+
+    assert [e["name"] for e in results["p1"]] == ["Apteka A", "Apteka B"]
+    assert results["p1"][0]["offers"] == [{"price": 12.34, "unit": "g", "expiration": "2026-01-01"}]
+    assert all(e["region"] == "w-slaskim" for e in results["p1"])
+    assert results["p2"] == []
+    assert fetched == ["https://www.gdziepolek.pl/produkty/p2/apteki/w-slaskim#stacjonarne"]
+    assert "#" not in "".join(requested)
+    assert (fetcher.hits, fetcher.misses) == (1, 1)
+
+
+def test_fetcher_gives_up_after_repeated_misses():
+    calls = []
+    fetcher = _fetcher(lambda request: calls.append(request) or httpx.Response(404), max_misses=2)
+    fetched = []
+
+    scrape_products(
+        ["a", "b", "c", "d"],
+        fetch_page=lambda url: fetched.append(url) or "<ul></ul>",
+        host_delay=0,
+        concurrency=1,
+        ssr_fetcher=fetcher,
+        regions=["w-slaskim"],
+    )
+
+    assert len(calls) == 2
+    assert len(fetched) == 4
+    assert fetcher.disabled
+
+
+def test_find_offers_ignores_product_lists_without_pharmacies():
+    decoy = {
+        "props": {
+            "pageProps": {
+                "related": [{"name": f"Produkt {i}", "price": 50 + i, "unit": "g"} for i in range(5)],
+                "ads": [{"pharmacy": "Apteka X", "price": 1}],
+            }
+        }
+    }
+    assert find_offers(decoy) == []
+    mixed = {"offers": OFFERS + [{"name": "Wariant 10 g", "price": 99}]}
+    assert find_offers(mixed) == OFFERS
@@ -0,0 +1,87 @@
+import httpx
+
+from scraper.services.async_scraper import scrape_products
+from scraper.services.offers import _parse_offers_json
+from scraper.services.xhr_offers import EndpointStore, JsonOffersFetcher
+
+PAYLOAD = {
+    "offers": [
+        {"pharmacy": "Apteka A", "address": "ul. Zielona 1", "price": "12,34 zł / g", "expires_at": "2025-01-01"},
+        {"pharmacy": "Apteka A", "address": "ul. Zielona 1", "price": 10.5, "unit": "g"},
+        {"pharmacy": {"name": "Apteka B", "address": "ul. Polna 2"}, "price": 20, "unit": "g"},
+        {"pharmacy": {"name": "Apteka C", "address": "ul. Leśna 3"}, "price": 150},
+    ]
+}
+
+
+def test_parse_offers_json_groups_offers_by_pharmacy():
+    entries = _parse_offers_json(PAYLOAD, "p1")
+
+    # cena liczbowa bez jednostki (Apteka C) jest pomijana
+    assert [e["name"] for e in entries] == ["Apteka A", "Apteka B"]
+    first = entries[0]
+    assert first["product_id"] == "p1"
+    assert first["address"] == "ul. Zielona 1"
+    assert first["map_url"].endswith("ul.%20Zielona%201")
+    assert first["offers"] == [
+        {"price": 12.34, "unit": "g", "expiration": "2025-01-01"},
+        {"price": 10.5, "unit": "g", "expiration": ""},
+    ]
+    assert entries[1]["address"] == "ul. Polna 2"
+
+
+def test_endpoint_store_round_trip(tmp_path):
+    path = tmp_path / "endpoints.json"
+    store = EndpointStore(str(path))
+    store.remember("https://page", "https://api/offers")
+    store.save()
+
+    assert EndpointStore(str(path)).get("https://page") == "https://api/offers"
+
+
+def _fetcher(tmp_path, handler, endpoints=None):
+    store = EndpointStore(str(tmp_path / "endpoints.json"))
+    for page, endpoint in (endpoints or {}).items():
+        store.remember(page, endpoint)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return JsonOffersFetcher(endpoints=store, client=client)
+
+
+def test_json_shortcut_skips_browser_fetch(tmp_path):
+    page_url = "https://www.gdziepolek.pl/produkty/p1/apteki/w-slaskim#stacjonarne"
+    fetcher = _fetcher(
+        tmp_path,
+        lambda request: httpx.Response(200, json=PAYLOAD),
+        {page_url: "https://api.example/offers?p=1"},
+    )
+    fetched = []
+
+    def fake_fetch(url: str) -> str:
+        fetched.append(url)
+        return "<ul></ul>"
+
+    results = scrape_products(["p1", "p2"], fetch_page=fake_fetch, host_delay=0, json_fetcher=fetcher)
+
+    assert len(results["p1"]) == 2
+    assert results["p2"] == []
+    assert fetched == ["https://www.gdziepolek.pl/produkty/p2/apteki/w-slaskim#stacjonarne"]
+    assert (fetcher.hits, fetcher.misses) == (1, 1)
+
+
+def test_failing_endpoint_falls_back_and_is_forgotten(tmp_path):
+    page_url = "https://www.gdziepolek.pl/produkty/p1/apteki/w-slaskim#stacjonarne"
+    fetcher = _fetcher(
+        tmp_path,
+        lambda request: httpx.Response(503),
+        {page_url: "https://api.example/offers?p=1"},
+    )
+    fetched = []
+
+    def fake_fetch(url: str) -> str:
+        fetched.append(url)
+        return "<ul></ul>"
+
+    scrape_products(["p1"], fetch_page=fake_fetch, host_delay=0, json_fetcher=fetcher)
+
+    assert fetched == [page_url]
+    assert fetcher.endpoints.get(page_url) is None
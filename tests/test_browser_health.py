@@ -0,0 +1,70 @@
+import os
+
+from scraper.core.browser_health import LATENCY_WINDOW, BrowserHealth, process_tree_rss
+
+
+class FakeDriver:
+    class service:
+        class process:
+            pid = 4242
+
+
+def _health(**kwargs):
+    params = dict(max_rss_mb=0, latency_factor=0, max_errors=0, max_pages=0)
+    params.update(kwargs)
+    return BrowserHealth(**params)
+
+
+def test_healthy_browser_is_not_restarted():
+    health = _health(max_rss_mb=500, latency_factor=2, max_errors=3, rss_probe=lambda pid: 100 * 1024 * 1024)
+    for _ in range(50):
+        health.record(1.0, ok=True)
+        assert health.restart_reason(FakeDriver()) is None
+
+
+def test_consecutive_errors_trigger_restart():
+    health = _health(max_errors=2)
+    health.record(1.0, ok=False)
+    health.record(1.0, ok=True)
+    health.record(1.0, ok=False)
+    assert health.restart_reason() is None
+    health.record(1.0, ok=False)
+    assert health.restart_reason() == "errors"
+
+
+def test_latency_trend_against_baseline():
+    health = _health(latency_factor=2)
+    for _ in range(LATENCY_WINDOW):
+        health.record(1.0, ok=True)
+    assert health.baseline == 1.0
+    for _ in range(LATENCY_WINDOW - 1):
+        health.record(3.0, ok=True)
+    assert health.restart_reason() is None  # window not full yet
+    health.record(3.0, ok=True)
+    assert health.restart_reason() == "latency"
+
+    health.restarted("latency")
+    assert health.restarts == {"latency": 1}
+    assert health.baseline is None and health.pages == 0
+
+
+def test_memory_and_page_cap():
+    probed = []
+
+    def probe(pid):
+        probed.append(pid)
+        return 2048 * 1024 * 1024
+
+    assert _health(max_rss_mb=1024, rss_probe=probe).restart_reason(FakeDriver()) == "memory"
+    assert probed == [4242]
+
+    health = _health(max_pages=2)
+    health.record(1.0, ok=True)
+    health.record(1.0, ok=True)
+    assert health.restart_reason() == "max pages"
+
+
+def test_process_tree_rss_measures_current_process():
+    rss = process_tree_rss(os.getpid())
+    if rss is not None:  # unavailable outside Linux without psutil
+        assert rss > 0
@@ -0,0 +1,74 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+from sqlalchemy import create_engine
+
+from scraper.core import main as core_main
+from scraper.core.data_extractor import OFFERS_DATA_SCRIPT
+from scraper.core.proxy_pool import PAGE_STATE_SCRIPT
+from scraper.services.fingerprints import FingerprintStore, fingerprint_key
+
+URL = "https://www.gdziepolek.pl/produkty/1/x/apteki/w-slaskim"
+RAW_OFFERS = [
+    {
+        "name": "Apteka A",
+        "href": "/apteki/a",
+        "address": "ul. Zielona 1, Katowice",
+        "lines": [{"text": "12,34 zł / g", "price": "12,34 zł / g"}],
+    }
+]
+
+
+class FakeDriver:
+    page_source = "<html></html>"
+
+    def get(self, url):
+        self.url = url
+
+    def execute_script(self, script, *args):
+        if script == PAGE_STATE_SCRIPT:
+            return [self.url, "Produkt"]
+        if script == OFFERS_DATA_SCRIPT:
+            return RAW_OFFERS
+        return None
+
+    def set_script_timeout(self, timeout):
+        pass
+
+    def execute_async_script(self, script, *args):
+        return {"ready": True, "items": 1, "elapsed": 10}
+
+    def find_elements(self, by, selector):
+        return [object()]
+
+
+def test_failed_insert_leaves_fingerprint_unsaved(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fp.sqlite'}", future=True)
+    store = FingerprintStore(engine)
+    monkeypatch.setattr(core_main, "EXTRACTION_MODE", "script")
+
+    def failing_insert(entry):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(core_main, "insert_prices", failing_insert)
+    offers = core_main.scrape_product(FakeDriver(), URL, "1", fingerprints=store)
+    store.save()
+
+    assert len(offers) == 1
+    assert not FingerprintStore(engine).check(fingerprint_key("1", "w-slaskim"), RAW_OFFERS)
+
+
+def test_missing_offers_list_raises_retryable_timeout(monkeypatch):
+    class NoOffersWait:
+        def __init__(self, driver, timeout):
+            pass
+
+        def until(self, condition):
+            raise TimeoutException("no offers")
+
+    timeouts = []
+    monkeypatch.setattr(core_main, "WebDriverWait", NoOffersWait)
+    monkeypatch.setattr(core_main, "count_timeout", lambda source, product: timeouts.append(product))
+
+    with pytest.raises(core_main.OffersTimeout):
+        core_main.scrape_product(FakeDriver(), URL, "1")
+    assert timeouts == ["1"]
@@ -1,8 +1,14 @@
 from unittest.mock import MagicMock
 
+import pytest
 from selenium.webdriver.common.by import By
 
-from scraper.core.data_extractor import extract_pharmacy_data
+from scraper.core.data_extractor import (
+    OFFERS_DATA_SCRIPT,
+    collect_offers_data,
+    extract_pharmacy_data,
+    parse_offer_data,
+)
 
 
 def _mock_span(text: str) -> MagicMock:
@@ -62,3 +68,40 @@ def test_extract_pharmacy_data_returns_dict():
     assert data["offers"][0]["price"] == 12.34
     assert data["offers"][0]["unit"] == "szt"
 
+
+def test_collect_offers_data_uses_single_script_call():
+    """The script mode should issue one execute_script for all elements."""
+
+    raw = [
+        {
+            "name": "Apteka Testowa",
+            "href": "https://example.com/apteki/test",
+            "address": "ul. Testowa 1",
+            "lines": [
+                {"text": "3 sztuk", "price": None},
+                {"text": "➔ 2025-06-30 45,00 zł / g", "price": "45,00 zł / g"},
+                {"text": "12,34 zł / szt", "price": "12,34 zł / szt"},
+                {"text": "5 minut temu", "price": None},
+            ],
+        },
+        {"error": "missing offers block"},
+    ]
+    driver = MagicMock()
+    driver.execute_script.return_value = raw
+    elements = [MagicMock(), MagicMock()]
+
+    collected = collect_offers_data(driver, elements)
+
+    driver.execute_script.assert_called_once_with(OFFERS_DATA_SCRIPT, elements)
+    for el in elements:
+        el.find_element.assert_not_called()
+
+    data = parse_offer_data(collected[0], product_id=123)
+    assert data["availability"] == "3 sztuk"
+    assert data["updated"] == "5 minut temu"
+    assert data["offers"] == [
+        {"expiration": "2025-06-30", "price": 45.0, "unit": "g"},
+        {"expiration": "", "price": 12.34, "unit": "szt"},
+    ]
+    with pytest.raises(ValueError):
+        parse_offer_data(collected[1], product_id=123)
@@ -0,0 +1,47 @@
+import json
+import random
+import zipfile
+
+from scraper.core.debug_capture import DebugCapture
+
+
+def test_capture_samples_snippets_and_counts_every_failure(tmp_path):
+    capture = DebugCapture(tmp_path, rate=0.0, first=2, rng=random.Random(0))
+    calls = []
+
+    def snippet(i):
+        def build():
+            calls.append(i)
+            return f"<li>{i}</li>"
+
+        return build
+
+    for i in range(10):
+        capture.record("p1", i, "invalid", "li.MuiListItem-root", snippet(i))
+    capture.record("p2", 1, "exception", "li.MuiListItem-root", lambda: {"error": "missing offers block"})
+    capture.close()
+
+    assert calls == [0, 1]
+    assert capture.failures[("li.MuiListItem-root", "invalid")] == 10
+    with zipfile.ZipFile(capture.path) as archive:
+        names = sorted(archive.namelist())
+        summary = json.loads(archive.read("summary.json"))
+        raw = archive.read("p2/oferta_1_exception_1.html").decode()
+    assert names == [
+        "p1/oferta_0_invalid_1.html",
+        "p1/oferta_1_invalid_2.html",
+        "p2/oferta_1_exception_1.html",
+        "summary.json",
+    ]
+    assert summary["failures"][0] == {"selector": "li.MuiListItem-root", "reason": "invalid", "count": 10}
+    assert summary["captured"] == 3
+    assert json.loads(raw) == {"error": "missing offers block"}
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_capture_without_failures_writes_nothing(tmp_path):
+    capture = DebugCapture(tmp_path)
+    capture.close()
+    assert capture.path is None
+    assert list(tmp_path.iterdir()) == []
+    assert capture.record("p1", 1, "invalid", "li", lambda: "<li/>") is False
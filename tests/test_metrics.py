@@ -0,0 +1,76 @@
+import importlib
+import multiprocessing
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from scraper.services import metrics
+from scraper.services.async_scraper import scrape_products
+
+OFFER_HTML = (
+    "<ul><li class=\"offer\"><a class=\"apteka\" href=\"/a1\">Apteka A</a>"
+    "<p class=\"address\">ul. Zielona 1</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">12,34 zł / g</span></p></div></li></ul>"
+)
+
+
+def _sample(name, **labels):
+    return metrics.REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_async_engine_records_fetch_parse_and_offers():
+    labels = {"engine": "playwright", "product": "metrics-p1"}
+    before = _sample("scraper_fetch_seconds_count", **labels)
+
+    scrape_products(["metrics-p1"], fetch_page=lambda url: OFFER_HTML, host_delay=0, regions=["w-slaskim"])
+
+    assert _sample("scraper_fetch_seconds_count", **labels) == before + 1
+    assert _sample("scraper_parse_seconds_count", **labels) == before + 1
+    assert _sample("scraper_offers_per_page_sum", **labels) >= 1
+
+
+def test_export_writes_textfile(tmp_path, monkeypatch):
+    path = tmp_path / "prom" / "scraper.prom"
+    monkeypatch.setattr(metrics, "METRICS_TEXTFILE", str(path))
+    metrics.count_timeout("selenium", "metrics-timeout")
+    metrics.count_retry("selenium", "metrics-timeout")
+
+    metrics.export()
+
+    text = path.read_text()
+    assert 'scraper_timeouts_total{engine="selenium",product="metrics-timeout"} 1.0' in text
+    assert 'scraper_retries_total{engine="selenium",product="metrics-timeout"} 1.0' in text
+    assert "# TYPE scraper_fetch_seconds histogram" in text
+
+
+def _worker_observes(product):
+    from scraper.services import metrics as worker_metrics
+
+    worker_metrics.observe_page("selenium", product, fetch=0.2, offers=3)
+
+
+def test_multiprocess_mode_aggregates_worker_processes(tmp_path, monkeypatch):
+    path = tmp_path / "scraper.prom"
+    monkeypatch.setattr(metrics, "METRICS_TEXTFILE", str(path))
+    monkeypatch.delenv(metrics.MULTIPROC_ENV, raising=False)
+    values = importlib.import_module("prometheus_client.values")
+    monkeypatch.setattr(values, "ValueClass", values.ValueClass)
+    directory = metrics.enable_multiprocess()
+    try:
+        ctx = multiprocessing.get_context("fork")
+        procs = [ctx.Process(target=_worker_observes, args=("shared",)) for _ in range(2)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join(30)
+        metrics.export()
+    finally:
+        os.environ.pop(metrics.MULTIPROC_ENV, None)
+        shutil.rmtree(directory, ignore_errors=True)
+
+    text = path.read_text()
+    assert 'scraper_fetch_seconds_count{engine="selenium",product="shared"} 2.0' in text
+    assert 'scraper_offers_per_page_sum{engine="selenium",product="shared"} 6.0' in text
@@ -0,0 +1,99 @@
+import random
+from collections import Counter
+
+from scraper.core.proxy_pool import ProxyPool, page_failure
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _pool(tmp_path, clock, proxies=("http://a:1", "http://b:1")):
+    return ProxyPool(
+        proxies,
+        state_file=str(tmp_path / "proxy_state.json"),
+        max_failures=2,
+        cooldown=60,
+        max_cooldown=200,
+        clock=clock,
+        rng=random.Random(1),
+    )
+
+
+def test_selection_prefers_healthy_fast_proxies(tmp_path):
+    pool = _pool(tmp_path, Clock())
+    for _ in range(20):
+        pool.report("http://a:1", True, latency=1.0)
+        pool.report("http://b:1", True, latency=12.0)
+    pool.report("http://b:1", False)
+
+    picks = Counter(pool.choose() for _ in range(500))
+    assert picks["http://a:1"] > 2 * picks["http://b:1"]
+
+
+def test_quarantine_backs_off_exponentially_and_recovers(tmp_path):
+    clock = Clock()
+    pool = _pool(tmp_path, clock)
+
+    assert pool.report("http://a:1", False) is False
+    assert pool.report("http://a:1", False) is True
+    assert set(pool.available()) == {"http://b:1"}
+    assert pool.stats["http://a:1"].quarantined_until == clock.now + 60
+    assert all(pool.choose() == "http://b:1" for _ in range(20))
+
+    clock.now += 61
+    assert pool.report("http://a:1", False, banned=True) is True
+    assert pool.stats["http://a:1"].quarantined_until == clock.now + 120
+    clock.now += 121
+    pool.report("http://a:1", False, banned=True)
+    assert pool.stats["http://a:1"].quarantined_until == clock.now + 200  # max_cooldown
+
+    clock.now += 201
+    pool.report("http://a:1", True, latency=2.0)
+    assert pool.stats["http://a:1"].cooldown_level == 0
+
+
+def test_all_quarantined_uses_the_one_released_first(tmp_path):
+    clock = Clock()
+    pool = _pool(tmp_path, clock)
+    pool.report("http://a:1", False, banned=True)
+    clock.now += 10
+    pool.report("http://b:1", False, banned=True)
+    assert pool.choose() == "http://a:1"
+
+
+def test_state_survives_restart_and_drops_removed_proxies(tmp_path):
+    clock = Clock()
+    pool = _pool(tmp_path, clock)
+    pool.report("http://a:1", True, latency=3.0)
+    pool.report("http://b:1", False, banned=True)
+    pool.save()
+
+    reloaded = _pool(tmp_path, clock, proxies=("http://b:1", "http://c:1"))
+    assert set(reloaded.stats) == {"http://b:1", "http://c:1"}
+    assert reloaded.stats["http://b:1"].bans == 1
+    assert set(reloaded.available()) == {"http://c:1"}
+
+
+def test_no_proxies_configured(tmp_path):
+    pool = ProxyPool([], state_file=None)
+    assert pool.choose() is None
+    assert pool.report(None, False) is False
+
+
+def test_page_failure_detects_error_and_block_pages():
+    class Driver:
+        def __init__(self, href, title):
+            self.state = [href, title]
+
+        def execute_script(self, script):
+            return self.state
+
+    assert page_failure(Driver("chrome-error://chromewebdata/", "")) == "network"
+    assert page_failure(Driver("https://www.gdziepolek.pl/x", "Just a moment... Cloudflare")) == "ban"
+    assert page_failure(Driver("https://www.gdziepolek.pl/x", "429 Too Many Requests")) == "throttled"
+    assert page_failure(Driver("https://www.gdziepolek.pl/x", "Jaxx Cannabis – Gdzie po lek")) is None
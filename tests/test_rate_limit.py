@@ -0,0 +1,80 @@
+import multiprocessing
+import time
+
+import pytest
+
+from scraper.utils.rate_limit import SharedTokenBucket
+
+
+class FakeTime:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _bucket(tmp_path, fake, **kwargs):
+    params = dict(rate=2.0, burst=2, min_rate=0.25, backoff=10.0, recovery=0.5)
+    params.update(kwargs)
+    return SharedTokenBucket(str(tmp_path / "bucket.sqlite"), clock=fake.clock, sleep=fake.sleep, **params)
+
+
+def test_burst_then_sustained_rate(tmp_path):
+    fake = FakeTime()
+    bucket = _bucket(tmp_path, fake)
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+    fake.now += 10  # długa przerwa nie daje więcej niż burst
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_state_is_shared_between_instances(tmp_path):
+    fake = FakeTime()
+    first, second = _bucket(tmp_path, fake), _bucket(tmp_path, fake)
+    first.acquire()
+    first.acquire()
+    assert second.acquire() == pytest.approx(0.5)
+
+
+def test_penalize_blocks_and_halves_rate_then_recovers(tmp_path):
+    fake = FakeTime()
+    bucket = _bucket(tmp_path, fake)
+    assert bucket.penalize() == 1.0
+    other = _bucket(tmp_path, fake)
+    assert other.acquire() == pytest.approx(10 + 1.0)
+    assert bucket.penalize(retry_after=0) == 0.5
+    assert bucket.penalize(retry_after=0) == 0.25
+    assert bucket.penalize(retry_after=0) == 0.25  # nie schodzimy poniżej min_rate
+    assert bucket.reward() == 1.25
+    assert bucket.reward() == 2.0
+    assert bucket.reward() == 2.0
+
+
+def _take(path, count, rate):
+    bucket = SharedTokenBucket(path, rate=rate, burst=1)
+    for _ in range(count):
+        bucket.acquire()
+
+
+def test_rate_holds_across_processes(tmp_path):
+    path = str(tmp_path / "bucket.sqlite")
+    SharedTokenBucket(path, rate=20.0, burst=1).acquire()  # pusty bucket na start
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_take, args=(path, 4, 20.0)) for _ in range(2)]
+    started = time.monotonic()
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(30)
+        assert proc.exitcode == 0
+    # 8 żetonów po 0.05 s niezależnie od liczby procesów
+    assert time.monotonic() - started >= 8 / 20.0 - 0.05
@@ -0,0 +1,58 @@
+import pytest
+from selenium.common.exceptions import JavascriptException, TimeoutException
+
+from scraper.core.readiness import OFFERS_STABLE_SCRIPT, wait_for_offers_stable
+from scraper.utils.rate_limit import RateLimiter
+
+
+class FakeDriver:
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = []
+        self.script_timeout = None
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def execute_async_script(self, script, *args):
+        self.calls.append((script, args))
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_wait_for_offers_stable_passes_selector_and_limits():
+    driver = FakeDriver({"ready": True, "items": 3, "elapsed": 320})
+    result = wait_for_offers_stable(driver, "li.offer", quiet_ms=250, timeout=4)
+    assert result["items"] == 3
+    (script, args), = driver.calls
+    assert script is OFFERS_STABLE_SCRIPT
+    assert args == ("li.offer", 250, 4000)
+    assert driver.script_timeout > 4
+
+
+@pytest.mark.parametrize(
+    "driver",
+    [FakeDriver({"ready": False, "items": 0}), FakeDriver(error=JavascriptException("boom"))],
+)
+def test_wait_for_offers_stable_raises_timeout(driver):
+    with pytest.raises(TimeoutException):
+        wait_for_offers_stable(driver, "li.offer", quiet_ms=10, timeout=1)
+
+
+def test_rate_limiter_only_sleeps_remaining_interval():
+    now = [100.0]
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(2.0, clock=lambda: now[0], sleep=sleep)
+    assert limiter.wait() == 0  # first request goes immediately
+    now[0] += 0.5  # page took 0.5 s
+    assert limiter.wait() == pytest.approx(1.5)
+    now[0] += 3.0  # slow page: interval already elapsed
+    assert limiter.wait() == 0
+    assert slept == [pytest.approx(1.5)]
@@ -0,0 +1,144 @@
+import queue
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from scraper.cli.scrape_all import (
+    BrowserUnavailable,
+    fill_queue,
+    format_worker_report,
+    record_page_outcome,
+    run_queue,
+)
+from scraper.core.browser_health import BrowserHealth
+from scraper.core.proxy_pool import ProxyPool
+
+
+def _run_workers(products, scrape_one, workers=2, max_attempts=3, backoff=0.0):
+    tasks = queue.Queue()
+    fill_queue(tasks, products)
+    outstanding = SimpleNamespace(value=len(products))
+    lock = threading.Lock()
+    reports = []
+
+    def target(worker_id):
+        reports.append(run_queue(worker_id, tasks, outstanding, lock, scrape_one, max_attempts, backoff))
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    return reports
+
+
+def test_slow_product_does_not_hold_up_the_rest():
+    def scrape_one(idx, name):
+        time.sleep(0.3 if name == "slow" else 0.01)
+
+    reports = _run_workers(["slow", "a", "b", "c", "d", "e"], scrape_one)
+    by_worker = {r["worker"]: r["scraped"] for r in reports}
+    slow_worker = next(w for w, names in by_worker.items() if "slow" in names)
+    other = 1 - slow_worker
+    # the idle worker drains the queue while the slow product is running
+    assert sorted(by_worker[other]) == ["a", "b", "c", "d", "e"]
+    assert by_worker[slow_worker] == ["slow"]
+
+
+def test_failed_product_is_retried_then_reported():
+    calls = {}
+
+    def scrape_one(idx, name):
+        calls[name] = calls.get(name, 0) + 1
+        if name == "flaky" and calls[name] < 2:
+            raise RuntimeError("timeout")
+        if name == "broken":
+            raise RuntimeError("always")
+        if name == "missing":
+            return False
+
+    reports = _run_workers(["flaky", "broken", "ok", "missing"], scrape_one, max_attempts=3)
+    scraped = sorted(n for r in reports for n in r["scraped"])
+    failed = [n for r in reports for n in r["failed"]]
+    assert scraped == ["flaky", "ok"]
+    assert failed == ["broken"]
+    assert [n for r in reports for n in r["skipped"]] == ["missing"]
+    assert calls == {"flaky": 2, "broken": 3, "ok": 1, "missing": 1}
+    assert sum(r["retries"] for r in reports) == 3
+    assert "failed: broken" in format_worker_report(reports)
+
+
+def test_retry_waits_for_backoff():
+    attempts = []
+
+    def scrape_one(idx, name):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+
+    _run_workers(["p"], scrape_one, workers=1, backoff=0.2)
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 0.2
+
+
+def test_fill_queue_adds_one_task_per_region():
+    tasks = queue.Queue()
+    count = fill_queue(tasks, ["a", "b"], ("w-slaskim", "w-opolskim"))
+    names = [tasks.get_nowait()[1] for _ in range(count)]
+    assert count == 4
+    assert names == ["a", "a@w-opolskim", "b", "b@w-opolskim"]
+
+
+def test_fill_queue_skips_tasks_finished_in_resumed_run():
+    tasks = queue.Queue()
+    count = fill_queue(tasks, ["a", "b"], ("w-slaskim", "w-opolskim"), skip={"a", "b@w-opolskim"})
+    names = [tasks.get_nowait()[1] for _ in range(count)]
+    assert names == ["a@w-opolskim", "b"]
+
+
+def test_throttled_page_does_not_count_against_proxy_or_browser(tmp_path):
+    proxies = ProxyPool(
+        ["http://a:1"], state_file=str(tmp_path / "proxy_state.json"), max_failures=2, rng=random.Random(1)
+    )
+    health = BrowserHealth(max_rss_mb=0, latency_factor=0, max_errors=2, max_pages=0)
+    driver = type("Driver", (), {"scraper_proxy": "http://a:1"})()
+
+    for _ in range(3):
+        assert record_page_outcome(proxies, health, driver, False, 1.0, "throttled") is None
+    assert proxies.stats["http://a:1"].failures == 0
+    assert health.consecutive_errors == 0
+
+    record_page_outcome(proxies, health, driver, False, 1.0, "network")
+    assert record_page_outcome(proxies, health, driver, False, 1.0, "network") == "proxy"
+
+
+def test_worker_without_browser_returns_task_and_stops():
+    handled = []
+
+    def scrape_one(idx, name):
+        if threading.current_thread().name == "dead":
+            raise BrowserUnavailable("firefox did not start")
+        handled.append(name)
+        time.sleep(0.01)
+
+    tasks = queue.Queue()
+    fill_queue(tasks, ["a", "b", "c"])
+    outstanding = SimpleNamespace(value=3)
+    lock = threading.Lock()
+    reports = {}
+
+    def target(worker_id):
+        reports[worker_id] = run_queue(worker_id, tasks, outstanding, lock, scrape_one, 3, 0.0)
+
+    dead = threading.Thread(target=target, args=(0,), name="dead")
+    dead.start()
+    dead.join(timeout=5)
+    alive = threading.Thread(target=target, args=(1,))
+    alive.start()
+    alive.join(timeout=5)
+
+    assert reports[0] == {"worker": 0, "scraped": [], "skipped": [], "failed": [], "retries": 0}
+    assert sorted(handled) == ["a", "b", "c"]
+    assert sorted(reports[1]["scraped"]) == ["a", "b", "c"]
+    assert outstanding.value == 0
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from scraper.services import tracing
+from scraper.services.async_scraper import scrape_products
+
+OFFER_HTML = (
+    "<ul><li class=\"offer\"><a class=\"apteka\" href=\"/a1\">Apteka A</a>"
+    "<p class=\"address\">ul. Zielona 1</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">12,34 zł / g</span></p></div></li></ul>"
+)
+
+
+def test_helpers_work_without_exporter():
+    assert tracing.init_tracing(exporter="") is False
+    with tracing.span("noop", offers=None) as current:
+        current.set_attribute("offers", 1)
+    tracing.record_span("noop.parse", 0.01, offers=1)
+    with tracing.attached(tracing.capture()):
+        pass
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "_tracer", lambda: provider.get_tracer(tracing.TRACER_NAME))
+    return exporter
+
+
+def test_fetch_and_parse_spans_carry_offers_and_bytes(spans):
+    with tracing.span("scrape"):
+        scrape_products(["trace-p1"], fetch_page=lambda url: OFFER_HTML, host_delay=0, regions=["w-slaskim"])
+
+    by_name = {span.name: span for span in spans.get_finished_spans()}
+    fetch, parse = by_name["scrape.fetch"], by_name["scrape.parse"]
+    assert fetch.attributes["product"] == "trace-p1"
+    assert fetch.attributes["source"] == "playwright"
+    assert fetch.attributes["bytes"] == len(OFFER_HTML)
+    assert parse.attributes["offers"] == 1
+    assert fetch.parent.span_id == by_name["scrape"].context.span_id
+
+
+def test_engine_statements_are_traced(spans):
+    engine = create_engine("sqlite://", future=True)
+    tracing.instrument_engine(engine)
+    tracing.instrument_engine(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (:x)"), [{"x": 1}, {"x": 2}])
+        with pytest.raises(Exception):
+            conn.execute(text("SELECT * FROM missing"))
+
+    statements = [span for span in spans.get_finished_spans() if span.name == "db.statement"]
+    assert [span.attributes["db.statement"].split()[0] for span in statements] == ["CREATE", "INSERT", "SELECT"]
+    assert statements[1].attributes["db.executemany"] is True
+    assert not statements[2].status.is_ok
@@ -0,0 +1,134 @@
+import sys
+import types
+
+import pytest
+from sqlalchemy import create_engine, text
+
+pytest.importorskip("celery")
+
+from scraper import worker
+from scraper.services import async_scraper
+from scraper.services import db as db_services
+from scraper.services.run_journal import RunJournal
+
+
+@pytest.fixture()
+def eager(monkeypatch):
+    monkeypatch.setattr(worker.celery.conf, "task_always_eager", True)
+    # lokalny zamiennik Redisa: broker i wyniki w pamięci
+    monkeypatch.setattr(worker.celery.conf, "broker_url", "memory://")
+    monkeypatch.setattr(worker.celery.conf, "result_backend", "cache+memory://")
+    monkeypatch.setattr(worker, "SCRAPE_RETRY_BACKOFF", 0)
+
+
+def _entry(slug, price):
+    return {
+        "product_id": slug,
+        "name": "Apteka A",
+        "address": "ul. Zielona 1",
+        "region": "w-slaskim",
+        "offers": [{"price": price, "unit": "g", "expiration": "2026-01-01"}],
+    }
+
+
+def test_task_graph_fans_out_products_and_aggregates(eager, monkeypatch, migrated_db):
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    monkeypatch.setattr(db_services, "ENGINE", engine)
+    monkeypatch.setattr(db_services, "API_URL", None)
+    discovery = types.ModuleType("scraper.products.discovery")
+    discovery.discover_products = lambda: [{"slug": s, "name": s.upper()} for s in ("p1", "p2", "empty", "broken")]
+    monkeypatch.setitem(sys.modules, "scraper.products.discovery", discovery)
+    monkeypatch.setattr("scraper.core.config.config.SCHEDULER_ENABLED", False)
+    monkeypatch.setattr("scraper.core.config.config.SCRAPE_REGIONS", ["w-slaskim"])
+    calls = []
+
+    def fake_scrape(slugs, **kwargs):
+        slug = slugs[0]
+        calls.append(slug)
+        if slug == "broken" or (slug == "p2" and calls.count("p2") == 1):
+            return {}  # strona nie została pobrana
+        return {slug: [] if slug == "empty" else [_entry(slug, 10.0)]}
+
+    monkeypatch.setattr(async_scraper, "scrape_products", fake_scrape)
+    alerts = []
+    monkeypatch.setattr(worker, "run_alert_check", lambda: alerts.append(True))
+
+    worker.run_scraper.delay()
+
+    assert sorted(set(calls)) == ["broken", "empty", "p1", "p2"]
+    assert calls.count("p2") == 2  # jedno ponowienie
+    assert calls.count("broken") == worker.scrape_product.max_retries + 1
+    assert alerts == [True]
+    with engine.connect() as conn:
+        prices = conn.execute(text("SELECT product_id FROM pharmacy_prices ORDER BY product_id")).scalars().all()
+        active = dict(conn.execute(text("SELECT slug, active FROM products")).all())
+        run = conn.execute(text("SELECT id, kind, status, failed FROM scrape_runs")).one()
+        stats = conn.execute(text("SELECT COUNT(*) FROM price_statistics")).scalar()
+    assert prices == ["p1", "p2"]
+    assert active == {"p1": 1, "p2": 1, "empty": 0, "broken": 1}
+    assert tuple(run)[1:] == ("celery", "partial", 1)
+    assert stats == 2
+    assert RunJournal(engine, run[0]).statuses() == {
+        "p1": "done",
+        "p2": "done",
+        "empty": "empty",
+        "broken": "failed",
+    }
+
+
+def test_scrape_product_is_idempotent(eager, monkeypatch, migrated_db):
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    monkeypatch.setattr(db_services, "ENGINE", engine)
+    monkeypatch.setattr(db_services, "API_URL", None)
+    monkeypatch.setattr("scraper.core.config.config.SCRAPE_REGIONS", ["w-slaskim"])
+    monkeypatch.setattr(async_scraper, "scrape_products", lambda slugs, **kw: {"p1": [_entry("p1", 10.0)]})
+
+    first = worker.scrape_product.delay("p1").get()
+    second = worker.scrape_product.delay("p1").get()
+    assert (first["rows"], second["rows"]) == (1, 0)
+
+
+OFFER_HTML = (
+    "<ul><li class=\"offer\"><a class=\"apteka\" href=\"/a1\">Apteka A</a>"
+    "<p class=\"address\">ul. Zielona 1</p>"
+    "<div class=\"offers\"><p><span class=\"priceExp\">12,34 zł / g</span></p></div></li></ul>"
+)
+
+
+def test_worker_process_reuses_one_pool_with_fingerprints_and_archive(eager, monkeypatch, migrated_db, tmp_path):
+    from scraper.services import fingerprints as fingerprints_mod
+    from scraper.services import page_archive
+
+    engine = create_engine(f"sqlite:///{migrated_db}", future=True)
+    monkeypatch.setattr(db_services, "ENGINE", engine)
+    monkeypatch.setattr(db_services, "API_URL", None)
+    monkeypatch.setattr(fingerprints_mod, "PAGE_FINGERPRINTS", True)
+    monkeypatch.setattr(fingerprints_mod, "API_URL", None)
+    monkeypatch.setattr(page_archive, "get_page_archive", lambda: page_archive.PageArchive(root=str(tmp_path)))
+    monkeypatch.setattr("scraper.core.config.config.SCRAPE_REGIONS", ["w-slaskim"])
+    pools = []
+    real_scrape = async_scraper.scrape_products_async
+
+    async def fake_scrape(slugs, **kwargs):
+        pools.append(kwargs["pool"])
+        return await real_scrape(slugs, fetch_page=lambda url: OFFER_HTML, host_delay=0, **kwargs)
+
+    monkeypatch.setattr(async_scraper, "scrape_products_async", fake_scrape)
+
+    worker._open_process_state()
+    try:
+        state = worker._process
+        first = worker.scrape_product.delay("p1").get()
+        second = worker.scrape_product.delay("p1").get()
+    finally:
+        worker._close_process_state()
+
+    assert pools == [state.pool, state.pool]
+    assert state.loop.is_closed() and worker._process is None
+    assert (first["status"], first["rows"]) == ("done", 1)
+    assert second["status"] == "unchanged"
+    assert state.archive.pages == 2
+    assert list(page_archive.iter_index(str(tmp_path)))
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT product_id FROM page_fingerprints")).scalars().all()
+    assert stored == ["p1"]